@@ -10,6 +10,11 @@ echo "Postgres is ready."
 echo "Applying migrations (if any)..."
 poetry run flask db upgrade || true
 
-echo "Starting Flask dev server..."
-exec poetry run flask run --host=0.0.0.0 --port=5000 --debug
-# exec poetry run gunicorn -w 3 -b 0.0.0.0:5000 wsgi:application
\ No newline at end of file
+# APP_SERVER=dev: Flask dev server with the reloader (compose sets it for local work)
+if [ "${APP_SERVER:-gunicorn}" = "dev" ]; then
+  echo "Starting Flask dev server..."
+  exec poetry run flask run --host=0.0.0.0 --port=5000 --debug
+fi
+
+echo "Starting gunicorn (src/app/serving.py)..."
+exec poetry run python -m src.app.serving
\ No newline at end of file
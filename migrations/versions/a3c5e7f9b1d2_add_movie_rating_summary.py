@@ -0,0 +1,73 @@
+"""add movie_rating_summary
+
+Revision ID: a3c5e7f9b1d2
+Revises: 8b8dd892822e
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c5e7f9b1d2'
+down_revision = '8b8dd892822e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('movie_rating_summary',
+    sa.Column('movie_id', sa.Integer(), nullable=False),
+    sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('count_1', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('count_2', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('count_3', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('count_4', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('count_5', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.CheckConstraint('rating_count >= 0', name='ck_rating_summary_count_nonneg'),
+    sa.ForeignKeyConstraint(['movie_id'], ['movies.movie_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('movie_id')
+    )
+
+    # one review per user and movie from now on: keep each pair's newest, so the constraint can be added
+    op.execute("""
+        DELETE FROM reviews
+        WHERE review_id IN (
+            SELECT review_id FROM (
+                SELECT review_id,
+                       ROW_NUMBER() OVER (PARTITION BY user_id, movie_id
+                                          ORDER BY created_at DESC, review_id DESC) AS rn
+                FROM reviews
+            ) ranked
+            WHERE rn > 1
+        )
+    """)
+
+    with op.batch_alter_table('reviews', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_reviews_user_movie', ['user_id', 'movie_id'])
+
+    # backfill from the reviews that remain
+    op.execute("""
+        INSERT INTO movie_rating_summary
+            (movie_id, rating_count, rating_sum, count_1, count_2, count_3, count_4, count_5)
+        SELECT movie_id,
+               COUNT(*),
+               SUM(rating),
+               COUNT(*) FILTER (WHERE rating = 1),
+               COUNT(*) FILTER (WHERE rating = 2),
+               COUNT(*) FILTER (WHERE rating = 3),
+               COUNT(*) FILTER (WHERE rating = 4),
+               COUNT(*) FILTER (WHERE rating = 5)
+        FROM reviews
+        GROUP BY movie_id
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('reviews', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_reviews_user_movie', type_='unique')
+
+    op.drop_table('movie_rating_summary')
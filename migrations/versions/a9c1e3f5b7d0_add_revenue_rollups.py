@@ -0,0 +1,65 @@
+"""add revenue_hourly / revenue_daily rollup tables
+
+Revision ID: a9c1e3f5b7d0
+Revises: f8b0d2e4a6c9
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9c1e3f5b7d0'
+down_revision = 'f8b0d2e4a6c9'
+branch_labels = None
+depends_on = None
+
+
+def _totals():
+    return [
+        sa.Column('bookings', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('tickets', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('revenue_cents', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    ]
+
+
+def upgrade():
+    op.create_table('revenue_hourly',
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('movie_id', sa.Integer(), nullable=False),
+    sa.Column('auditorium_id', sa.Integer(), nullable=False),
+    *_totals(),
+    sa.ForeignKeyConstraint(['movie_id'], ['movies.movie_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['auditorium_id'], ['auditoriums.auditorium_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('bucket_start', 'movie_id', 'auditorium_id')
+    )
+    with op.batch_alter_table('revenue_hourly', schema=None) as batch_op:
+        batch_op.create_index('ix_revenue_hourly_movie_bucket', ['movie_id', 'bucket_start'], unique=False)
+
+    op.create_table('revenue_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('movie_id', sa.Integer(), nullable=False),
+    sa.Column('auditorium_id', sa.Integer(), nullable=False),
+    *_totals(),
+    sa.ForeignKeyConstraint(['movie_id'], ['movies.movie_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['auditorium_id'], ['auditoriums.auditorium_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('day', 'movie_id', 'auditorium_id')
+    )
+    with op.batch_alter_table('revenue_daily', schema=None) as batch_op:
+        batch_op.create_index('ix_revenue_daily_movie_day', ['movie_id', 'day'], unique=False)
+        batch_op.create_index('ix_revenue_daily_auditorium_day', ['auditorium_id', 'day'], unique=False)
+
+    # populate with: python src/app/jobs/rebuild_revenue_rollups.py
+
+
+def downgrade():
+    with op.batch_alter_table('revenue_daily', schema=None) as batch_op:
+        batch_op.drop_index('ix_revenue_daily_auditorium_day')
+        batch_op.drop_index('ix_revenue_daily_movie_day')
+    op.drop_table('revenue_daily')
+
+    with op.batch_alter_table('revenue_hourly', schema=None) as batch_op:
+        batch_op.drop_index('ix_revenue_hourly_movie_bucket')
+    op.drop_table('revenue_hourly')
@@ -0,0 +1,43 @@
+"""add job_runs history table
+
+Revision ID: b0d2f4a6c8e1
+Revises: a9c1e3f5b7d0
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b0d2f4a6c8e1'
+down_revision = 'a9c1e3f5b7d0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('job_runs',
+    sa.Column('run_id', sa.Integer(), nullable=False),
+    sa.Column('job_name', sa.Text(), nullable=False),
+    sa.Column('node', sa.Text(), nullable=False),
+    sa.Column('trigger', sa.Enum('SCHEDULE', 'MANUAL', name='job_trigger_enum'), server_default='SCHEDULE', nullable=False),
+    sa.Column('status', sa.Enum('OK', 'FAILED', 'SKIPPED', name='job_run_status_enum'), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('duration_ms', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('rows', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('batches', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('detail', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('run_id')
+    )
+    with op.batch_alter_table('job_runs', schema=None) as batch_op:
+        batch_op.create_index('ix_job_runs_job_started', ['job_name', 'started_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('job_runs', schema=None) as batch_op:
+        batch_op.drop_index('ix_job_runs_job_started')
+
+    op.drop_table('job_runs')
+    sa.Enum(name='job_run_status_enum').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='job_trigger_enum').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,38 @@
+"""add jwt_blacklist
+
+Revision ID: b4d6f8a0c2e4
+Revises: a3c5e7f9b1d2
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4d6f8a0c2e4'
+down_revision = 'a3c5e7f9b1d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('jwt_blacklist',
+    sa.Column('jti', sa.String(length=64), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('jti')
+    )
+    with op.batch_alter_table('jwt_blacklist', schema=None) as batch_op:
+        batch_op.create_index('ix_jwt_blacklist_created_at', ['created_at'], unique=False)
+        batch_op.create_index('ix_jwt_blacklist_expires_at', ['expires_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('jwt_blacklist', schema=None) as batch_op:
+        batch_op.drop_index('ix_jwt_blacklist_expires_at')
+        batch_op.drop_index('ix_jwt_blacklist_created_at')
+
+    op.drop_table('jwt_blacklist')
@@ -0,0 +1,229 @@
+"""partition bookings, tickets and seat_holds by month
+
+Revision ID: c2e4a6b8d0f3
+Revises: b0d2f4a6c8e1
+Create Date: 2026-10-19 18:00:00.000000
+
+Postgres only. The old tables are renamed out of the way, the partitioned
+ones created with a partition per month from the oldest row to three months
+ahead (plus a default partition each), the rows copied across and the old
+tables dropped. Indexes on the new parents are built after the copy. Takes
+the tables offline for the duration of the copy; run it in a maintenance
+window. Later months are created by the maintain_partitions job.
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2e4a6b8d0f3'
+down_revision = 'b0d2f4a6c8e1'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+_INDEXES = {
+    'bookings': [('ix_bookings_showtime_id', ['showtime_id']), ('ix_bookings_user_id', ['user_id'])],
+    'seat_holds': [('ix_seat_holds_showtime_id', ['showtime_id']), ('ix_seat_holds_user_id', ['user_id'])],
+    'tickets': [('ix_tickets_seat_id', ['seat_id']), ('ix_tickets_showtime_id', ['showtime_id'])],
+}
+
+# indexes backing constraints, which live in the same namespace as the new tables' ones
+_CONSTRAINT_INDEXES = {
+    'bookings': ['bookings_pkey'],
+    'seat_holds': ['seat_holds_pkey'],
+    'tickets': ['tickets_pkey', 'uq_ticket_per_seat_in_booking'],
+}
+
+
+def _status():
+    return postgresql.ENUM('PENDING', 'CONFIRMED', 'CANCELLED', 'EXPIRED',
+                           name='booking_status_enum', create_type=False)
+
+
+def _add_months(month, n):
+    index = month.year * 12 + month.month - 1 + n
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _month(ts):
+    return ts.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _set_aside(table, suffix):
+    """Rename `table` (and the indexes whose names would clash) to <name>_<suffix>."""
+    for name, _ in _INDEXES[table]:
+        op.drop_index(name, table_name=table)
+    for name in _CONSTRAINT_INDEXES[table]:
+        op.execute(f'ALTER INDEX {name} RENAME TO {name}_{suffix}')
+    op.rename_table(table, f'{table}_{suffix}')
+
+
+def _create_indexes():
+    for table, indexes in _INDEXES.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for name, columns in indexes:
+                batch_op.create_index(name, columns, unique=False)
+
+
+def upgrade():
+    conn = op.get_bind()
+    oldest = conn.execute(sa.text(
+        'SELECT least((SELECT min(created_at) FROM bookings), (SELECT min(created_at) FROM seat_holds))'
+    )).scalar()
+
+    for table in ('tickets', 'seat_holds', 'bookings'):
+        _set_aside(table, 'unpartitioned')
+
+    op.create_table('bookings',
+    sa.Column('booking_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('showtime_id', sa.UUID(), nullable=False),
+    sa.Column('status', _status(), nullable=False),
+    sa.Column('total_cents', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.CheckConstraint('total_cents >= 0', name='ck_booking_total_nonneg'),
+    sa.ForeignKeyConstraint(['showtime_id'], ['showtimes.showtime_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('booking_id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+    op.create_table('seat_holds',
+    sa.Column('hold_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('showtime_id', sa.UUID(), nullable=False),
+    sa.Column('seat_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('hold_expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('released_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['seat_id'], ['seats.seat_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['showtime_id'], ['showtimes.showtime_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('hold_id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+    op.create_table('tickets',
+    sa.Column('ticket_id', sa.UUID(), nullable=False),
+    sa.Column('booking_id', sa.UUID(), nullable=False),
+    sa.Column('booking_created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('showtime_id', sa.UUID(), nullable=False),
+    sa.Column('seat_id', sa.Integer(), nullable=False),
+    sa.Column('price_cents', sa.Integer(), nullable=False),
+    sa.CheckConstraint('price_cents >= 0', name='ck_ticket_price_nonneg'),
+    sa.ForeignKeyConstraint(['booking_id', 'booking_created_at'], ['bookings.booking_id', 'bookings.created_at'],
+                            name='fk_tickets_booking', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['seat_id'], ['seats.seat_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['showtime_id'], ['showtimes.showtime_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ticket_id', 'booking_created_at'),
+    sa.UniqueConstraint('booking_id', 'booking_created_at', 'seat_id', name='uq_ticket_per_seat_in_booking'),
+    postgresql_partition_by='RANGE (booking_created_at)'
+    )
+
+    now = _month(datetime.now(timezone.utc))
+    month = _month(oldest) if oldest is not None else now
+    last = _add_months(now, MONTHS_AHEAD)
+    while month <= last:
+        upper = _add_months(month, 1)
+        for table in ('bookings', 'seat_holds', 'tickets'):
+            op.execute(
+                f"CREATE TABLE {table}_p{month.year:04d}_{month.month:02d} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+        month = upper
+    for table in ('bookings', 'seat_holds', 'tickets'):
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+    op.execute(
+        'INSERT INTO bookings (booking_id, user_id, showtime_id, status, total_cents, created_at, expires_at) '
+        'SELECT booking_id, user_id, showtime_id, status, total_cents, created_at, expires_at '
+        'FROM bookings_unpartitioned'
+    )
+    op.execute(
+        'INSERT INTO seat_holds (hold_id, user_id, showtime_id, seat_id, created_at, hold_expires_at, released_at) '
+        'SELECT hold_id, user_id, showtime_id, seat_id, created_at, hold_expires_at, released_at '
+        'FROM seat_holds_unpartitioned'
+    )
+    op.execute(
+        'INSERT INTO tickets (ticket_id, booking_id, booking_created_at, showtime_id, seat_id, price_cents) '
+        'SELECT t.ticket_id, t.booking_id, b.created_at, t.showtime_id, t.seat_id, t.price_cents '
+        'FROM tickets_unpartitioned t JOIN bookings_unpartitioned b ON b.booking_id = t.booking_id'
+    )
+
+    op.drop_table('tickets_unpartitioned')
+    op.drop_table('seat_holds_unpartitioned')
+    op.drop_table('bookings_unpartitioned')
+    _create_indexes()
+    for table in ('bookings', 'seat_holds', 'tickets'):
+        op.execute(f'ANALYZE {table}')
+
+
+def downgrade():
+    # rows in detached partitions are not brought back
+    for table in ('tickets', 'seat_holds', 'bookings'):
+        _set_aside(table, 'partitioned')
+
+    op.create_table('bookings',
+    sa.Column('booking_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('showtime_id', sa.UUID(), nullable=False),
+    sa.Column('status', _status(), nullable=False),
+    sa.Column('total_cents', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.CheckConstraint('total_cents >= 0', name='ck_booking_total_nonneg'),
+    sa.ForeignKeyConstraint(['showtime_id'], ['showtimes.showtime_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('booking_id')
+    )
+    op.create_table('seat_holds',
+    sa.Column('hold_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('showtime_id', sa.UUID(), nullable=False),
+    sa.Column('seat_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('hold_expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('released_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['seat_id'], ['seats.seat_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['showtime_id'], ['showtimes.showtime_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('hold_id')
+    )
+    op.create_table('tickets',
+    sa.Column('ticket_id', sa.UUID(), nullable=False),
+    sa.Column('booking_id', sa.UUID(), nullable=False),
+    sa.Column('showtime_id', sa.UUID(), nullable=False),
+    sa.Column('seat_id', sa.Integer(), nullable=False),
+    sa.Column('price_cents', sa.Integer(), nullable=False),
+    sa.CheckConstraint('price_cents >= 0', name='ck_ticket_price_nonneg'),
+    sa.ForeignKeyConstraint(['booking_id'], ['bookings.booking_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['seat_id'], ['seats.seat_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['showtime_id'], ['showtimes.showtime_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ticket_id'),
+    sa.UniqueConstraint('booking_id', 'seat_id', name='uq_ticket_per_seat_in_booking')
+    )
+
+    op.execute(
+        'INSERT INTO bookings (booking_id, user_id, showtime_id, status, total_cents, created_at, expires_at) '
+        'SELECT booking_id, user_id, showtime_id, status, total_cents, created_at, expires_at '
+        'FROM bookings_partitioned'
+    )
+    op.execute(
+        'INSERT INTO seat_holds (hold_id, user_id, showtime_id, seat_id, created_at, hold_expires_at, released_at) '
+        'SELECT hold_id, user_id, showtime_id, seat_id, created_at, hold_expires_at, released_at '
+        'FROM seat_holds_partitioned'
+    )
+    op.execute(
+        'INSERT INTO tickets (ticket_id, booking_id, showtime_id, seat_id, price_cents) '
+        'SELECT ticket_id, booking_id, showtime_id, seat_id, price_cents FROM tickets_partitioned'
+    )
+
+    # dropping a partitioned table drops its partitions
+    op.drop_table('tickets_partitioned')
+    op.drop_table('seat_holds_partitioned')
+    op.drop_table('bookings_partitioned')
+    _create_indexes()
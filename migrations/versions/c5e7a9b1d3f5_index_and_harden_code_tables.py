@@ -0,0 +1,46 @@
+"""index verification/reset code tables for their access pattern
+
+Revision ID: c5e7a9b1d3f5
+Revises: b4d6f8a0c2e4
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e7a9b1d3f5'
+down_revision = 'b4d6f8a0c2e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # is_used was nullable on verification_tokens; the consume UPDATE matches on "is_used IS false"
+    op.execute("UPDATE verification_tokens SET is_used = false WHERE is_used IS NULL")
+    with op.batch_alter_table('verification_tokens', schema=None) as batch_op:
+        batch_op.alter_column('is_used',
+               existing_type=sa.Boolean(),
+               server_default=sa.text('false'),
+               nullable=False)
+        batch_op.create_index('ix_verification_tokens_user_token', ['user_id', 'token'], unique=False)
+        batch_op.create_index('ix_verification_tokens_expires_at', ['expires_at'], unique=False)
+
+    with op.batch_alter_table('password_reset_tokens', schema=None) as batch_op:
+        batch_op.create_index('ix_password_reset_tokens_user_token', ['user_id', 'token'], unique=False)
+        batch_op.create_index('ix_password_reset_tokens_expires_at', ['expires_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('password_reset_tokens', schema=None) as batch_op:
+        batch_op.drop_index('ix_password_reset_tokens_expires_at')
+        batch_op.drop_index('ix_password_reset_tokens_user_token')
+
+    with op.batch_alter_table('verification_tokens', schema=None) as batch_op:
+        batch_op.drop_index('ix_verification_tokens_expires_at')
+        batch_op.drop_index('ix_verification_tokens_user_token')
+        batch_op.alter_column('is_used',
+               existing_type=sa.Boolean(),
+               server_default=None,
+               nullable=True)
@@ -0,0 +1,45 @@
+"""add promotion_campaigns
+
+Revision ID: e7a9c1d3f5b8
+Revises: d6f8b0c2e4a7
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a9c1d3f5b8'
+down_revision = 'd6f8b0c2e4a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('promotion_campaigns',
+    sa.Column('campaign_id', sa.UUID(), nullable=False),
+    sa.Column('promotion_id', sa.UUID(), nullable=False),
+    sa.Column('subject', sa.Text(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'PAUSED', 'DONE', 'CANCELLED', name='promotion_campaign_status_enum'), server_default='PENDING', nullable=False),
+    sa.Column('last_user_id', sa.UUID(), nullable=True),
+    sa.Column('sent_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('failed_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['promotion_id'], ['promotions.promotion_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('campaign_id')
+    )
+    with op.batch_alter_table('promotion_campaigns', schema=None) as batch_op:
+        batch_op.create_index('ix_promotion_campaigns_status', ['status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('promotion_campaigns', schema=None) as batch_op:
+        batch_op.drop_index('ix_promotion_campaigns_status')
+
+    op.drop_table('promotion_campaigns')
+    sa.Enum(name='promotion_campaign_status_enum').drop(op.get_bind(), checkfirst=True)
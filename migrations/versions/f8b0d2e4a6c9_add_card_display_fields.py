@@ -0,0 +1,64 @@
+"""add non-sensitive card display fields to billing_info
+
+Revision ID: f8b0d2e4a6c9
+Revises: e7a9c1d3f5b8
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f8b0d2e4a6c9'
+down_revision = 'e7a9c1d3f5b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('billing_info', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('card_last4', sa.String(length=4), nullable=True))
+        batch_op.add_column(sa.Column('card_exp_month', sa.SmallInteger(), nullable=True))
+        batch_op.add_column(sa.Column('card_exp_year', sa.SmallInteger(), nullable=True))
+
+    # Backfill from the encrypted columns. Without a key the rows are left NULL (the API
+    # shows them masked) until `python -m src.app.jobs run backfill_card_display_fields`.
+    key = os.getenv("ENCRYPTION_KEY")
+    if not key:
+        print("ENCRYPTION_KEY not set; skipping billing_info display field backfill, "
+              "run the backfill_card_display_fields job once it is")
+        return
+    from cryptography.fernet import Fernet
+    cipher = Fernet(key.encode())
+
+    conn = op.get_bind()
+    billing = sa.table('billing_info',
+        sa.column('billing_info_id', sa.UUID()),
+        sa.column('card_number', sa.String()),
+        sa.column('card_exp', sa.String()),
+        sa.column('card_last4', sa.String()),
+        sa.column('card_exp_month', sa.SmallInteger()),
+        sa.column('card_exp_year', sa.SmallInteger()),
+    )
+    rows = conn.execute(sa.select(billing.c.billing_info_id, billing.c.card_number, billing.c.card_exp)).fetchall()
+    for billing_info_id, card_number, card_exp in rows:
+        try:
+            number = cipher.decrypt(card_number.encode()).decode()
+            mm, yy = cipher.decrypt(card_exp.encode()).decode().split("/")
+        except Exception:
+            continue
+        conn.execute(
+            billing.update()
+            .where(billing.c.billing_info_id == billing_info_id)
+            .values(card_last4=number[-4:], card_exp_month=int(mm), card_exp_year=2000 + int(yy))
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('billing_info', schema=None) as batch_op:
+        batch_op.drop_column('card_exp_year')
+        batch_op.drop_column('card_exp_month')
+        batch_op.drop_column('card_last4')
@@ -0,0 +1,76 @@
+"""
+Concurrent connections one worker process can carry on the catalog reads:
+the Flask app under gunicorn (sync, gthread) versus the async app
+(src/app/aio).
+
+    poetry run python scripts/bench_async.py --levels 1,8,32,128,512 --duration 10 --slo-ms 250
+
+Each mode runs as a single worker process (--workers) against
+SQLALCHEMY_DATABASE_URI (the async app swaps in asyncpg), and is driven at
+each concurrency level in turn with keep-alive clients cycling through
+--paths (scripts/bench_serving.py does the starting and driving). A level
+counts as carried while p99 stays under --slo-ms and nothing fails; the last
+such level is the mode's capacity. The async advantage is in waiting on the
+database, so use a seeded Postgres on another host, or with added latency
+(`tc qdisc add dev eth0 root netem delay 2ms`), for numbers that mean
+anything; on a local SQLite file all modes are CPU-bound.
+"""
+import argparse
+import os
+import statistics
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+
+from bench_serving import _drive, _start, _stop
+
+PATHS = ("/api/v1/movies?limit=20,/api/v1/movies?sort=rating.desc&limit=20,"
+         "/api/v1/showtimes?limit=50,/api/v1/auditorium")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", default="sync,gthread,async")
+    parser.add_argument("--levels", default="1,8,32,128,512", help="concurrent connections, comma-separated")
+    parser.add_argument("--paths", default=PATHS)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--warmup", type=float, default=2)
+    parser.add_argument("--slo-ms", type=float, default=250, help="p99 a level must stay under to count")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--client-procs", type=int, default=max((os.cpu_count() or 2) // 2, 1))
+    parser.add_argument("--port", type=int, default=5078)
+    args = parser.parse_args()
+
+    paths = args.paths.split(",")
+    levels = [int(n) for n in args.levels.split(",")]
+    print(f"{args.workers} worker(s) per mode; paths: {', '.join(paths)}; p99 limit {args.slo_ms:.0f} ms")
+    capacity = {}
+    for mode in args.modes.split(","):
+        proc = _start(mode, args.port, args.workers)
+        try:
+            _drive(args.port, paths, levels[0], 1, args.warmup)
+            for level in levels:
+                procs = min(args.client_procs, level)
+                latencies, errors = _drive(args.port, paths, level, procs, args.duration)
+                if not latencies:
+                    print(f"{mode:8s} {level:5d} conns   no successful requests ({errors} errors)")
+                    break
+                ms = [l * 1000 for l in latencies]
+                p99 = ms[int(len(ms) * .99)]
+                print(f"{mode:8s} {level:5d} conns {len(ms) / args.duration:9.0f} req/s   "
+                      f"p50 {statistics.median(ms):8.2f} ms   p99 {p99:8.2f} ms   errors {errors}")
+                if p99 >= args.slo_ms or errors:
+                    break
+                capacity[mode] = level
+        finally:
+            _stop(proc)
+
+    print()
+    for mode in args.modes.split(","):
+        carried = capacity.get(mode)
+        print(f"{mode:8s} capacity: " + (f"{carried} connections, {carried // args.workers} per worker"
+                                         if carried else f"under {levels[0]} connections"))
+
+
+if __name__ == "__main__":
+    main()
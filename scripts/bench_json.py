@@ -0,0 +1,130 @@
+"""
+Serialize the list endpoints' real payloads with Flask's default provider
+(stdlib json) versus the app's provider (src/app/json_provider.py), buffered
+and streamed.
+
+    poetry run python scripts/bench_json.py --rows 100,1000 --iterations 50
+
+Runs against a throwaway database (in-memory SQLite unless --database-url is
+given; the schema is created and seeded there, so never point it at real data).
+Each payload is a page of model rows as the endpoint loads them, turned into
+the response body by the endpoint's own serializer: movies (movie.card
+profile), showtimes, reviews of one movie and admin user rows. 100 is the
+largest page the API serves; larger counts show where streaming pays off.
+Rows are loaded once, so the timings are dict building plus encoding only.
+Reports time per body, body size and the peak memory allocated while
+building one body.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--rows", default="20,100,1000", help="rows per payload, comma-separated")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    os.environ["SQLALCHEMY_DATABASE_URI"] = args.database_url
+    os.environ.setdefault("ENCRYPTION_KEY", "x2TjmiwVK0Cq7b3Y3M3uJ1gW2lOzZk0F0Zk8fL0w0hQ=")
+
+    from flask.json.provider import DefaultJSONProvider
+    from src.app import create_app, db
+    from src.app.models import Auditorium, Category, Movie, Review, Showtime, User
+    from src.app.models.loaders import with_profile
+    from src.app.controllers.admin_controller import _to_user_row
+    from src.app.controllers.movie_controller import _movie_to_dict
+    from src.app.controllers.review_controller import _review_to_dict
+    from src.app.controllers.showtime_controller import _to_dict as _showtime_to_dict
+    from src.app.json_provider import _stream, encoder, orjson
+
+    counts = [int(n) for n in args.rows.split(",")]
+    most = max(counts)
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        rnd = random.Random(7)
+        cats = [Category(name=f"Genre {i}") for i in range(12)]
+        db.session.add_all(cats)
+        movies = [Movie(title=f"Movie {i}", director="A. Director", producer="A. Producer", cast="Lead, Support",
+                        synopsis="x" * 500, film_rating_code="PG-13", trailer_picture="https://cdn.example.com/p.jpg",
+                        video="https://cdn.example.com/v.mp4", categories=rnd.sample(cats, 3))
+                  for i in range(most)]
+        db.session.add_all(movies)
+        aud = Auditorium(name="Auditorium 1")
+        db.session.add(aud)
+        db.session.flush()
+        start = datetime(2030, 1, 1, tzinfo=timezone.utc)
+        for i in range(most):
+            db.session.add(Showtime(movie_id=movies[i % len(movies)].movie_id, auditorium_id=aud.auditorium_id,
+                                    starts_at=start + timedelta(hours=3 * i), child_price_cents=900,
+                                    adult_price_cents=1400, senior_price_cents=1100))
+            user = User(user_id=uuid.uuid4(), first_name="Bench", last_name=f"User {i}",
+                        email=f"bench{i}@example.com", password_hash="x", is_verified=True)
+            db.session.add(user)
+            db.session.add(Review(user_id=user.user_id, movie_id=movies[0].movie_id, rating=rnd.randint(1, 5),
+                                  comment="A fine film. " * 8))
+        db.session.commit()
+
+        payloads = [
+            ("movies", with_profile(Movie.query, "movie.card").order_by(Movie.movie_id), _movie_to_dict),
+            ("showtimes", Showtime.query.order_by(Showtime.starts_at), _showtime_to_dict),
+            ("reviews", Review.query.filter_by(movie_id=movies[0].movie_id).order_by(Review.created_at),
+             _review_to_dict),
+            ("admin users", User.query.order_by(User.created_at), _to_user_row),
+        ]
+
+        flask_default = DefaultJSONProvider(app)
+        dumpb_stdlib = encoder("stdlib")
+        dumpb_orjson = encoder("orjson")
+
+        def page(rows):
+            return {"limit": len(rows), "offset": 0, "total": len(rows)}
+
+        def variants(rows, to_dict):
+            yield "flask default", lambda: flask_default.dumps(
+                {"data": [to_dict(r) for r in rows], "page": page(rows)}).encode()
+            yield "stdlib", lambda: dumpb_stdlib({"data": [to_dict(r) for r in rows], "page": page(rows)})
+            if orjson is not None:
+                yield "orjson", lambda: dumpb_orjson({"data": [to_dict(r) for r in rows], "page": page(rows)})
+                yield "orjson streamed", lambda: sum(
+                    len(chunk) for chunk in _stream(dumpb_orjson, rows, to_dict, {"page": page(rows)}))
+
+        def measure(fn):
+            fn()
+            tracemalloc.start()
+            out = fn()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            size = out if isinstance(out, int) else len(out)
+            start = time.perf_counter()
+            for _ in range(args.iterations):
+                fn()
+            return (time.perf_counter() - start) / args.iterations * 1000, size, peak
+
+        if orjson is None:
+            print("orjson is not installed: only the stdlib encoders are measured\n")
+        print(f"the app streams lists of more than JSON_STREAM_MIN_ITEMS = {app.config['JSON_STREAM_MIN_ITEMS']} rows\n")
+        print(f"{'payload':14} {'rows':>6} {'encoder':16} {'ms/body':>9} {'speedup':>8} {'KiB':>8} {'peak KiB':>9}")
+        for name, query, to_dict in payloads:
+            for count in counts:
+                rows = query.limit(count).all()
+                baseline = None
+                for n, (label, fn) in enumerate(variants(rows, to_dict)):
+                    ms, size, peak = measure(fn)
+                    baseline = baseline or ms
+                    print(f"{name if n == 0 else '':14} {len(rows) if n == 0 else '':>6} {label:16} {ms:>9.3f} "
+                          f"{baseline / ms:>7.1f}x {size / 1024:>8.1f} {peak / 1024:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Compare what common lookups fetch under the old eager relationship defaults
+(Movie.categories joined, Category.movies / User.billing_infos selectin) versus
+lazy defaults plus the loader profiles in src/app/models/loaders.py.
+
+    poetry run python scripts/bench_loader_profiles.py --movies 2000 --categories 12
+
+Runs against a throwaway database (in-memory SQLite unless --database-url is
+given; the schema is created and seeded there, so never point it at real data).
+The old defaults are reproduced with explicit loader options along the same paths.
+Reports statements, ORM rows loaded and time per call.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--movies", type=int, default=2000)
+    parser.add_argument("--categories", type=int, default=12)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    os.environ["SQLALCHEMY_DATABASE_URI"] = args.database_url
+    os.environ.setdefault("ENCRYPTION_KEY", "x2TjmiwVK0Cq7b3Y3M3uJ1gW2lOzZk0F0Zk8fL0w0hQ=")
+
+    from sqlalchemy import event
+    from sqlalchemy.orm import joinedload, selectinload
+    from src.app import create_app, db
+    from src.app.models import Movie, Category, User, BillingInfo
+    from src.app.models.loaders import with_profile
+    from src.app.middleware.sql_stats import count_statements
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        rnd = random.Random(7)
+        cats = [Category(name=f"Genre {i}") for i in range(args.categories)]
+        db.session.add_all(cats)
+        for i in range(args.movies):
+            db.session.add(Movie(title=f"Movie {i}", synopsis="x" * 500, categories=rnd.sample(cats, 3)))
+        user = User(user_id=uuid.uuid4(), first_name="Bench", last_name="User", email="bench@example.com",
+                    password_hash="x", is_verified=True)
+        db.session.add(user)
+        for _ in range(4):
+            db.session.add(BillingInfo(user_id=user.user_id, first_name="B", last_name="U", billing_city="A",
+                                       card_type="credit", card_number="x", card_exp="x", cardholder_name="x",
+                                       billing_street="1", billing_state="GA", billing_zip_code="30301",
+                                       card_last4="1234", card_exp_month=1, card_exp_year=2030))
+        db.session.commit()
+        user_id = user.user_id
+
+        loaded = [0]
+
+        @event.listens_for(db.Model, "load", propagate=True)
+        def _count_load(target, context):
+            loaded[0] += 1
+
+        old_movie = (joinedload(Movie.categories).selectinload(Category.movies), joinedload(Movie.rating_summary))
+        scenarios = [
+            ("user lookup (auth / card checks)",
+             lambda: User.query.options(selectinload(User.billing_infos)).filter_by(user_id=user_id).first(),
+             lambda: User.query.filter_by(user_id=user_id).first()),
+            ("category lookup (create_movie)",
+             lambda: Category.query.options(
+                 selectinload(Category.movies).joinedload(Movie.categories),
+                 selectinload(Category.movies).joinedload(Movie.rating_summary),
+             ).filter_by(name="Genre 1").first(),
+             lambda: Category.query.filter_by(name="Genre 1").first()),
+            ("movie list, 20 per page",
+             lambda: Movie.query.options(*old_movie).order_by(Movie.movie_id).limit(20).all(),
+             lambda: with_profile(Movie.query, "movie.card").order_by(Movie.movie_id).limit(20).all()),
+            ("movie detail",
+             lambda: Movie.query.options(*old_movie).filter_by(movie_id=1).one(),
+             lambda: with_profile(Movie.query.filter_by(movie_id=1), "movie.detail").one()),
+            ("user profile with cards",
+             lambda: (User.query.options(selectinload(User.billing_infos)).filter_by(user_id=user_id).first(),
+                      BillingInfo.query.filter_by(user_id=user_id).all()),
+             lambda: with_profile(User.query.filter_by(user_id=user_id), "user.profile").first().billing_infos),
+        ]
+
+        def measure(fn):
+            db.session.expunge_all()
+            loaded[0] = 0
+            with count_statements() as stats:
+                fn()
+            rows, statements = loaded[0], stats.count
+            start = time.perf_counter()
+            for _ in range(args.iterations):
+                db.session.expunge_all()
+                fn()
+            return statements, rows, (time.perf_counter() - start) / args.iterations * 1000
+
+        print(f"{args.movies} movies, {args.categories} categories, 3 categories per movie\n")
+        print(f"{'scenario':34} {'':6} {'stmts':>6} {'rows':>7} {'ms/call':>9}")
+        for name, old, new in scenarios:
+            for label, fn in (("eager", old), ("lazy", new)):
+                statements, rows, ms = measure(fn)
+                print(f"{name if label == 'eager' else '':34} {label:6} {statements:>6} {rows:>7} {ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
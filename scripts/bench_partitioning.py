@@ -0,0 +1,222 @@
+"""
+Compare the plain and the monthly-partitioned layouts of bookings/tickets
+(src/app/services/partitions.py): insert latency at the newest month,
+lookup latency, index size and the cost of removing the oldest month.
+
+    poetry run python scripts/bench_partitioning.py --database-url postgresql://... --rows 100000000
+
+Postgres only. Works in two throwaway schemas (bench_plain, bench_part) that
+it drops and recreates, so it never touches the app's tables, but use a
+scratch database all the same: 100M ticket rows need ~25 GB of disk per
+layout and take a while to load. Tickets are spread evenly over --months of
+bookings, --tickets-per-booking each; the tables carry the app's keys and
+indexes but no foreign keys to users/showtimes/seats.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import create_engine, text
+
+from src.app.services.partitions import add_months, create_partition_sql, partition_name
+
+LAYOUTS = ("plain", "part")
+
+
+def _ddl(layout):
+    partitioned = layout == "part"
+    booking_pk = "(booking_id, created_at)" if partitioned else "(booking_id)"
+    ticket_pk = "(ticket_id, booking_created_at)" if partitioned else "(ticket_id)"
+    booking_fk = ("(booking_id, booking_created_at) REFERENCES bookings (booking_id, created_at)"
+                  if partitioned else "(booking_id) REFERENCES bookings (booking_id)")
+    unique = "(booking_id, booking_created_at, seat_id)" if partitioned else "(booking_id, seat_id)"
+    return [
+        f"CREATE TABLE bookings (booking_id uuid NOT NULL, user_id uuid NOT NULL, showtime_id uuid NOT NULL, "
+        f"status text NOT NULL, total_cents integer NOT NULL, created_at timestamptz NOT NULL, "
+        f"expires_at timestamptz, PRIMARY KEY {booking_pk})"
+        + (" PARTITION BY RANGE (created_at)" if partitioned else ""),
+        f"CREATE TABLE tickets (ticket_id uuid NOT NULL, booking_id uuid NOT NULL, "
+        f"booking_created_at timestamptz NOT NULL, showtime_id uuid NOT NULL, seat_id integer NOT NULL, "
+        f"price_cents integer NOT NULL, PRIMARY KEY {ticket_pk}, "
+        f"FOREIGN KEY {booking_fk} ON DELETE CASCADE, UNIQUE {unique})"
+        + (" PARTITION BY RANGE (booking_created_at)" if partitioned else ""),
+    ]
+
+
+_INDEXES = [
+    "CREATE INDEX ix_bookings_showtime_id ON bookings (showtime_id)",
+    "CREATE INDEX ix_bookings_user_id ON bookings (user_id)",
+    "CREATE INDEX ix_tickets_showtime_id ON tickets (showtime_id)",
+    "CREATE INDEX ix_tickets_seat_id ON tickets (seat_id)",
+]
+
+# booking i: id md5('b'||i), created at start + i * step_ms, showtime i / 100, user i % 1M
+_LOAD_BOOKINGS = """
+INSERT INTO bookings (booking_id, user_id, showtime_id, status, total_cents, created_at)
+SELECT md5('b' || i)::uuid, md5('u' || (i % 1000000))::uuid, md5('s' || (i / 100))::uuid,
+       'CONFIRMED', :per * 1200, :start + (i::bigint * :step_ms) * interval '1 millisecond'
+FROM generate_series(:lo, :hi - 1) AS i
+"""
+_LOAD_TICKETS = """
+INSERT INTO tickets (ticket_id, booking_id, booking_created_at, showtime_id, seat_id, price_cents)
+SELECT md5('t' || i || '-' || k)::uuid, md5('b' || i)::uuid, :start + (i::bigint * :step_ms) * interval '1 millisecond',
+       md5('s' || (i / 100))::uuid, (i * :per + k) % 200, 1200
+FROM generate_series(:lo, :hi - 1) AS i, generate_series(1, :per) AS k
+"""
+
+
+def _setup(engine, layout, args, start, step_ms, bookings):
+    schema = f"bench_{layout}"
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+        conn.execute(text(f"SET LOCAL search_path = {schema}"))
+        for stmt in _ddl(layout):
+            conn.execute(text(stmt))
+        if layout == "part":
+            for i in range(args.months + 1):
+                for table in ("bookings", "tickets"):
+                    conn.execute(text(create_partition_sql(table, add_months(start, i))))
+
+    t = time.perf_counter()
+    batch = 1_000_000
+    for lo in range(0, bookings, batch):
+        params = {"lo": lo, "hi": min(lo + batch, bookings), "start": start, "step_ms": step_ms,
+                  "per": args.tickets_per_booking}
+        with engine.begin() as conn:
+            conn.execute(text(f"SET LOCAL search_path = {schema}"))
+            conn.execute(text(_LOAD_BOOKINGS), params)
+            conn.execute(text(_LOAD_TICKETS), params)
+        print(f"  {layout}: loaded {params['hi']:,}/{bookings:,} bookings", flush=True)
+    with engine.begin() as conn:
+        conn.execute(text(f"SET LOCAL search_path = {schema}"))
+        for stmt in _INDEXES:
+            conn.execute(text(stmt))
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f"SET search_path = {schema}"))
+        conn.execute(text("VACUUM ANALYZE bookings"))
+        conn.execute(text("VACUUM ANALYZE tickets"))
+    print(f"  {layout}: load + index {time.perf_counter() - t:.0f}s", flush=True)
+
+
+def _pct(timings):
+    timings = sorted(timings)
+    return (f"p50 {statistics.median(timings):8.3f} ms   p99 {timings[int(len(timings) * .99)]:8.3f} ms   "
+            f"max {timings[-1]:8.3f} ms")
+
+
+def _time(conn, sql, params_list):
+    timings = []
+    for params in params_list:
+        t = time.perf_counter()
+        conn.execute(text(sql), params).all()
+        timings.append((time.perf_counter() - t) * 1000)
+    return timings
+
+
+def _measure(engine, layout, args, start, step_ms, bookings):
+    schema = f"bench_{layout}"
+    rnd = random.Random(7)
+    # inserts land mid-way through the last loaded month, which is as full as any other
+    last_month = add_months(start, args.months - 1)
+    newest = last_month + timedelta(days=15)
+    print(f"\n{layout}")
+    with engine.connect() as conn:
+        conn.execute(text(f"SET search_path = {schema}"))
+        conn.commit()
+
+        # on-sale inserts: one booking and its tickets per transaction, at the newest month
+        timings = []
+        for n in range(args.inserts):
+            booking_id, created_at = uuid.uuid4(), newest + timedelta(milliseconds=n)
+            showtime_id = uuid.uuid4()
+            t = time.perf_counter()
+            conn.execute(text(
+                "INSERT INTO bookings (booking_id, user_id, showtime_id, status, total_cents, created_at) "
+                "VALUES (:b, :u, :s, 'PENDING', 3600, :c)"
+            ), {"b": booking_id, "u": uuid.uuid4(), "s": showtime_id, "c": created_at})
+            conn.execute(text(
+                "INSERT INTO tickets (ticket_id, booking_id, booking_created_at, showtime_id, seat_id, price_cents) "
+                "VALUES " + ", ".join(f"(:t{k}, :b, :c, :s, {k}, 1200)" for k in range(args.tickets_per_booking))
+            ), {"b": booking_id, "c": created_at, "s": showtime_id,
+                **{f"t{k}": uuid.uuid4() for k in range(args.tickets_per_booking)}})
+            conn.commit()
+            timings.append((time.perf_counter() - t) * 1000)
+        print(f"  insert booking+{args.tickets_per_booking} tickets   {_pct(timings)}")
+
+        picks = [rnd.randrange(bookings) for _ in range(args.lookups)]
+        with_key = [{"b": f"b{i}", "c": start + timedelta(milliseconds=i * step_ms)} for i in picks]
+        print("  tickets by booking + created_at  " + _pct(_time(
+            conn, "SELECT * FROM tickets WHERE booking_id = md5(:b)::uuid AND booking_created_at = :c", with_key)))
+        print("  tickets by booking only          " + _pct(_time(
+            conn, "SELECT * FROM tickets WHERE booking_id = md5(:b)::uuid", with_key)))
+        recent = [{"s": f"s{rnd.randrange(bookings - bookings // args.months, bookings) // 100}"}
+                  for _ in range(args.lookups)]
+        print("  tickets by recent showtime       " + _pct(_time(
+            conn, "SELECT * FROM tickets WHERE showtime_id = md5(:s)::uuid", recent)))
+
+        sizes = conn.execute(text(
+            "SELECT c.relname, pg_relation_size(c.oid) FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE n.nspname = :schema AND c.relkind = 'i' AND c.relname LIKE 'tickets%'"
+        ), {"schema": schema}).all()
+        hot = partition_name("tickets", last_month)
+        total = sum(s for _, s in sizes)
+        hot_size = sum(s for name, s in sizes if name.startswith(hot))
+        print(f"  ticket index size: {total / 2**20:,.0f} MiB"
+              + (f" total, {hot_size / 2**20:,.0f} MiB in the month being inserted into" if layout == "part" else ""))
+        conn.rollback()
+
+    # retention: remove the oldest month
+    cutoff = add_months(start, 1)
+    t = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(text(f"SET LOCAL search_path = {schema}"))
+        if layout == "plain":
+            conn.execute(text("DELETE FROM bookings WHERE created_at < :c"), {"c": cutoff})
+        else:
+            for table in ("tickets", "bookings"):
+                name = partition_name(table, start)
+                conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                conn.execute(text(f"DROP TABLE {name}"))
+    how = "DELETE ... CASCADE" if layout == "plain" else "DETACH + DROP"
+    print(f"  remove oldest month ({how}): {time.perf_counter() - t:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="ticket rows per layout")
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--tickets-per-booking", type=int, default=3)
+    parser.add_argument("--inserts", type=int, default=2000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--skip-load", action="store_true", help="reuse the schemas from a previous run")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    if engine.dialect.name != "postgresql":
+        sys.exit("needs Postgres")
+
+    now = datetime.now(timezone.utc)
+    start = add_months(now.replace(day=1, hour=0, minute=0, second=0, microsecond=0), -args.months)
+    bookings = args.rows // args.tickets_per_booking
+    step_ms = int((add_months(start, args.months) - start).total_seconds() * 1000) // bookings
+    print(f"{bookings:,} bookings / {bookings * args.tickets_per_booking:,} tickets over {args.months} months "
+          f"from {start:%Y-%m}")
+
+    for layout in LAYOUTS:
+        if not args.skip_load:
+            _setup(engine, layout, args, start, step_ms, bookings)
+    for layout in LAYOUTS:
+        _measure(engine, layout, args, start, step_ms, bookings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark login password checks: inline (current request-thread behaviour)
+versus the bounded process pool in src/app/services/password_hashing.py.
+
+    poetry run python scripts/bench_password_hashing.py --method scrypt:32768:8:1 --logins 200
+
+Reports logins/sec overall and per core for each mode.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from werkzeug.security import generate_password_hash, check_password_hash
+from src.app.services.password_hashing import PasswordHasher
+
+
+def bench_inline(pwhash: str, logins: int) -> float:
+    start = time.perf_counter()
+    for _ in range(logins):
+        check_password_hash(pwhash, "correct horse battery staple")
+    return logins / (time.perf_counter() - start)
+
+
+def bench_pool(pwhash: str, logins: int, workers: int, method: str) -> float:
+    hasher = PasswordHasher(method=method, workers=workers, max_pending=logins)
+    hasher.verify(pwhash, "warm up the pool")  # spawn processes outside the timed region
+    # request threads: enough to keep every pool process busy
+    with ThreadPoolExecutor(max_workers=workers * 2) as threads:
+        start = time.perf_counter()
+        list(threads.map(lambda _: hasher.verify(pwhash, "correct horse battery staple"), range(logins)))
+        elapsed = time.perf_counter() - start
+    hasher.shutdown()
+    return logins / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--method", default=os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1"))
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    pwhash = generate_password_hash("correct horse battery staple", args.method)
+    print(f"method={args.method} logins={args.logins} cores={os.cpu_count()} pool_workers={args.workers}")
+
+    inline = bench_inline(pwhash, args.logins)
+    print(f"inline : {inline:8.1f} logins/s   {inline:8.1f} logins/s/core (1 core)")
+
+    cores = min(args.workers, os.cpu_count() or 1)
+    pooled = bench_pool(pwhash, args.logins, args.workers, args.method)
+    print(f"pool   : {pooled:8.1f} logins/s   {pooled / cores:8.1f} logins/s/core ({cores} cores)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Throughput of the API under the current dev server (`flask run --debug`, what
+entrypoint.sh used to start) versus src/app/serving.py with sync and gthread
+workers, and the async catalog app (src/app/aio, `async`; serves only the
+catalog GETs and the health check).
+
+    poetry run python scripts/bench_serving.py --modes dev,sync,gthread --duration 15 --concurrency 32
+
+Each mode is started as a subprocess against whatever SQLALCHEMY_DATABASE_URI
+is set (default sqlite:///dev.db; point it at a seeded Postgres for
+meaningful numbers), warmed up, then driven by --client-procs client
+processes holding --concurrency keep-alive connections in total, each
+cycling through --paths. Reports requests/s, latency percentiles, errors and
+the server's total proportional memory (PSS, Linux only: shared copy-on-write
+pages are split between the processes sharing them).
+"""
+import argparse
+import http.client
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+COMMANDS = {
+    "dev": lambda port: [sys.executable, "-m", "flask", "--app", "src.app:create_app", "run",
+                         "--host=127.0.0.1", f"--port={port}", "--debug"],
+    "sync": lambda port: [sys.executable, "-m", "src.app.serving"],
+    "gthread": lambda port: [sys.executable, "-m", "src.app.serving"],
+    "async": lambda port: [sys.executable, "-m", "src.app.aio"],
+}
+
+
+def _start(mode, port, workers):
+    env = dict(os.environ, SERVE_BIND=f"127.0.0.1:{port}", ASYNC_SERVE_BIND=f"127.0.0.1:{port}",
+               SERVE_ACCESS_LOG="0", SERVE_WORKER_CLASS=mode)
+    if workers:
+        env["SERVE_WORKERS"] = env["ASYNC_SERVE_WORKERS"] = str(workers)
+    proc = subprocess.Popen(COMMANDS[mode](port), cwd=ROOT, env=env, start_new_session=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            if conn.getresponse().status == 200:
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    _stop(proc)
+    raise RuntimeError(f"{mode} server did not come up on :{port}")
+
+
+def _stop(proc):
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+        proc.wait(timeout=30)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(proc.pid, signal.SIGKILL)
+
+
+def _pss_mib(root_pid):
+    """Summed PSS of root_pid and its descendants, or None where /proc can't tell."""
+    try:
+        children = {}
+        for pid in os.listdir("/proc"):
+            if pid.isdigit():
+                with open(f"/proc/{pid}/stat") as f:
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+                children.setdefault(ppid, []).append(int(pid))
+        total, todo = 0, [root_pid]
+        while todo:
+            pid = todo.pop()
+            todo.extend(children.get(pid, []))
+            with open(f"/proc/{pid}/smaps_rollup") as f:
+                total += next(int(line.split()[1]) for line in f if line.startswith("Pss:"))
+        return total / 1024
+    except (OSError, StopIteration):
+        return None
+
+
+def _client(port, paths, connections, duration):
+    """One client process: `connections` threads, each with one keep-alive connection."""
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def run(offset):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        mine, failed, i = [], 0, offset
+        while time.monotonic() < stop_at:
+            path = paths[i % len(paths)]
+            i += 1
+            t = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status >= 500:
+                    failed += 1
+                if resp.getheader("Connection", "").lower() == "close":
+                    conn.close()
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                continue
+            mine.append(time.perf_counter() - t)
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=run, args=(n,)) for n in range(connections)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, errors[0]
+
+
+def _drive(port, paths, concurrency, procs, duration):
+    per_proc = [concurrency // procs + (1 if n < concurrency % procs else 0) for n in range(procs)]
+    with ProcessPoolExecutor(max_workers=procs) as pool:
+        results = list(pool.map(_client, [port] * procs, [paths] * procs, per_proc, [duration] * procs))
+    latencies = sorted(l for r in results for l in r[0])
+    return latencies, sum(r[1] for r in results)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", default="dev,sync,gthread")
+    parser.add_argument("--paths", default="/,/api/v1/health,/api/v1/movies?limit=20")
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--client-procs", type=int, default=max((os.cpu_count() or 2) // 2, 1))
+    parser.add_argument("--workers", type=int, default=0, help="SERVE_WORKERS / ASYNC_SERVE_WORKERS (0 = auto)")
+    parser.add_argument("--port", type=int, default=5077)
+    args = parser.parse_args()
+
+    paths = args.paths.split(",")
+    print(f"paths: {', '.join(paths)}; {args.concurrency} connections from {args.client_procs} client processes, "
+          f"{args.duration:.0f}s per mode")
+    for mode in args.modes.split(","):
+        proc = _start(mode, args.port, args.workers)
+        try:
+            _drive(args.port, paths, args.concurrency, args.client_procs, args.warmup)
+            latencies, errors = _drive(args.port, paths, args.concurrency, args.client_procs, args.duration)
+            pss = _pss_mib(proc.pid)
+        finally:
+            _stop(proc)
+        if not latencies:
+            print(f"{mode:8s} no successful requests ({errors} errors)")
+            continue
+        ms = [l * 1000 for l in latencies]
+        print(f"{mode:8s} {len(ms) / args.duration:9.0f} req/s   p50 {statistics.median(ms):7.2f} ms   "
+              f"p99 {ms[int(len(ms) * .99)]:7.2f} ms   errors {errors}"
+              + (f"   server PSS {pss:.0f} MiB" if pss is not None else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark the typeahead prefix index in src/app/services/suggest.py:
+build time, memory and lookup latency over a synthetic catalogue.
+
+    poetry run python scripts/bench_suggest.py --movies 50000 --lookups 20000
+
+No database needed; the index is loaded from generated rows. Each movie gets
+a director, two producers and five cast members drawn from a shared pool
+of names, so people repeat across movies as they do in real data.
+"""
+import argparse
+import os
+import random
+import statistics
+import string
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.app.services.suggest import SuggestIndex
+
+
+def _word(rnd, lo=3, hi=9):
+    return rnd.choice(string.ascii_uppercase) + "".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(lo, hi)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--movies", type=int, default=50000)
+    parser.add_argument("--people", type=int, default=40000)
+    parser.add_argument("--auditoriums", type=int, default=50)
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--max-entries", type=int, default=50000)
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    people = [f"{_word(rnd)} {_word(rnd)}" for _ in range(args.people)]
+    movies = [
+        (i, " ".join(_word(rnd) for _ in range(rnd.randint(1, 4))),
+         rnd.choice(people), ", ".join(rnd.sample(people, 2)), ", ".join(rnd.sample(people, 5)))
+        for i in range(args.movies)
+    ]
+    auditoriums = [(i, f"Auditorium {_word(rnd)}") for i in range(args.auditoriums)]
+
+    index = SuggestIndex(max_entries=args.max_entries)
+    start = time.perf_counter()
+    index.load(movies, auditoriums)
+    build_s = time.perf_counter() - start
+
+    # memory from a second, traced load (tracing slows it down too much to time)
+    tracemalloc.start()
+    traced = SuggestIndex(max_entries=args.max_entries)
+    traced.load(movies, auditoriums)
+    mem = tracemalloc.get_traced_memory()[0]
+    del traced
+    tracemalloc.stop()
+
+    labels = [m[1] for m in movies] + people
+    queries = []
+    for _ in range(args.lookups):
+        word = rnd.choice(rnd.choice(labels).split())
+        queries.append(word[: rnd.randint(1, min(len(word), 5))])
+
+    timings = []
+    hits = 0
+    for q in queries:
+        t = time.perf_counter_ns()
+        hits += bool(index.lookup(q, 10))
+        timings.append((time.perf_counter_ns() - t) / 1000)
+    timings.sort()
+
+    print(f"entries={len(index):,} keys={len(index._keys):,} dropped={index.dropped:,}")
+    print(f"build: {build_s:.2f}s, index memory ~{mem / 1024 / 1024:.1f} MiB")
+    print(f"lookups: {args.lookups:,} ({hits / args.lookups:.0%} with results)")
+    print(f"  p50 {statistics.median(timings):.1f} us   p90 {timings[int(len(timings) * .9)]:.1f} us   "
+          f"p99 {timings[int(len(timings) * .99)]:.1f} us   max {timings[-1]:.1f} us")
+    for n in (1, 2, 3, 5):
+        sample = [q for q in queries if len(q) == n][:2000]
+        if not sample:
+            continue
+        t = time.perf_counter()
+        for q in sample:
+            index.lookup(q, 10)
+        print(f"  {n}-char prefixes: {(time.perf_counter() - t) / len(sample) * 1e6:.1f} us avg")
+
+
+if __name__ == "__main__":
+    main()
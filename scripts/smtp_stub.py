@@ -0,0 +1,102 @@
+"""
+Minimal SMTP server for exercising the email outbox workers locally.
+
+    poetry run python scripts/smtp_stub.py --port 1025 --delay 0.5 --fail-rate 0.1
+
+Point the app at it with MAIL_SERVER=localhost MAIL_PORT=1025 MAIL_USE_TLS=0.
+Accepts every message (no TLS, no auth), optionally sleeping `--delay` seconds
+per message to imitate a slow provider and answering 451 for `--fail-rate` of
+them. Prints one line per delivered message and counts per connection, which
+shows whether workers are reusing connections.
+"""
+import argparse
+import random
+import socketserver
+import threading
+import time
+
+_lock = threading.Lock()
+_stats = {"connections": 0, "messages": 0, "rejected": 0}
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write((line + "\r\n").encode())
+
+    def handle(self):
+        opts = self.server.opts
+        with _lock:
+            _stats["connections"] += 1
+            conn_no = _stats["connections"]
+        sent_here = 0
+        mail_from, rcpts = None, []
+        self.reply("220 smtp-stub ready")
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                break
+            line = raw.decode(errors="replace").rstrip("\r\n")
+            verb = line[:4].upper()
+            if verb in ("EHLO", "HELO"):
+                self.reply("250 smtp-stub")
+            elif verb == "MAIL":
+                mail_from, rcpts = line[10:].strip(), []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                rcpts.append(line[8:].strip())
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b".\n", b""):
+                    pass
+                if opts.delay:
+                    time.sleep(opts.delay)
+                if random.random() < opts.fail_rate:
+                    with _lock:
+                        _stats["rejected"] += 1
+                    self.reply("451 Temporary failure, try again later")
+                    continue
+                sent_here += 1
+                with _lock:
+                    _stats["messages"] += 1
+                    total = _stats["messages"]
+                print(f"[conn {conn_no}] #{total} from {mail_from} to {', '.join(rcpts)}", flush=True)
+                self.reply("250 OK: queued")
+            elif verb == "RSET":
+                mail_from, rcpts = None, []
+                self.reply("250 OK")
+            elif verb == "NOOP":
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                break
+            else:
+                self.reply("502 Command not implemented")
+        print(f"[conn {conn_no}] closed after {sent_here} messages", flush=True)
+
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to stall before accepting each message")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of messages answered with 451")
+    args = parser.parse_args()
+
+    with SMTPServer((args.host, args.port), SMTPHandler) as server:
+        server.opts = args
+        print(f"smtp stub listening on {args.host}:{args.port}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    print(f"connections={_stats['connections']} messages={_stats['messages']} rejected={_stats['rejected']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,59 @@
 # app/__init__.py
-from flask import Flask
+from flask import Flask, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_cors import CORS
 from .config import Config
 from .services.email_service import mail
+from .services.user_cache import principal_cache
+from .services.password_hashing import password_hasher, HashingOverloaded
+from .services.throttling import throttler
+from .middleware.sql_stats import sql_stats
+from .json_provider import FastJSONProvider
+from .services.replicas import RoutingSession, replicas
+from .services import db_pool
+from .services.db_pool import pool_telemetry
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 migrate = Migrate()
 
-def create_app():
-    app = Flask(__name__)
+def _init_core(app, role="web"):
+    """Config, database and the shared services; everything but the HTTP layer."""
     app.config.from_object(Config)
 
+    replicas.configure(app)    # adds the replica binds db.init_app creates engines for
+    db_pool.configure(app, role)    # pool and driver options of the primary and those binds
     db.init_app(app)
     migrate.init_app(app, db)
     mail.init_app(app)
+    principal_cache.init_app(app)
+    password_hasher.init_app(app)
+    throttler.init_app(app)
+    sql_stats.init_app(app)
+    replicas.init_app(app)
+    pool_telemetry.init_app(app)
+
+    from .services.token_revocation import revocation_filter
+    revocation_filter.init_app(app)
+    from .services.email_outbox import outbox_workers
+    outbox_workers.init_app(app)
+    from .services.campaigns import campaign_runner
+    campaign_runner.init_app(app)
+    from .services.suggest import suggest_index
+    suggest_index.init_app(app)
+
+
+def create_job_app():
+    """App for background jobs (python -m src.app.jobs): no blueprints, CORS or error handlers."""
+    app = Flask(__name__)
+    _init_core(app, role="job")
+    return app
+
+
+def create_app():
+    app = Flask(__name__)
+    _init_core(app)
+    app.json = FastJSONProvider(app)
 
     # If CORS_ORIGINS is "", make it None (no cross-site CORS in dev)
     origins = app.config.get("CORS_ORIGINS") or None
@@ -32,4 +70,10 @@ def create_app():
     def index():
         return {"status": "ok"}
 
+    @app.errorhandler(HashingOverloaded)
+    def hashing_overloaded(_e):
+        resp = jsonify({"error": {"code": "SERVICE_UNAVAILABLE", "message": "Server is busy, please retry shortly"}})
+        resp.headers["Retry-After"] = "1"
+        return resp, 503
+
     return app
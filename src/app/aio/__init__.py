@@ -0,0 +1,118 @@
+"""Async read path: the catalog GET endpoints on SQLAlchemy's asyncio extension.
+
+    poetry run python -m src.app.aio
+
+A Starlette app served by uvicorn, next to the Flask app rather than inside
+it. A request waiting on Postgres holds a coroutine, not a worker thread, so
+one process keeps many catalog reads in flight at once. It serves the same
+paths and response shapes as the Flask views (aio/catalog.py), built from
+the same models, loader profiles, query helpers and serializers, so a proxy
+can send
+
+    GET /api/v1/movies[/<id>], /api/v1/showtimes[/<id>], /api/v1/auditorium[/<id>]
+
+here and everything else to the Flask app.
+
+The database is ASYNC_DATABASE_URI, by default SQLALCHEMY_DATABASE_URI with
+its driver swapped for asyncpg (aiosqlite for SQLite). Each worker process
+has one pool of ASYNC_DB_POOL_SIZE (+ DB_MAX_OVERFLOW) connections. The
+"web" role's timeouts and DB_POOLER_MODE apply as in services/db_pool.py.
+Reads go to that one database: it does not pick replicas or honour the
+read-your-writes pin.
+"""
+from contextlib import asynccontextmanager
+from http import HTTPStatus
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from starlette import responses
+from starlette.applications import Starlette
+from starlette.exceptions import HTTPException
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+
+from ..config import Config
+from ..json_provider import encoder
+from ..services.db_pool import ROLES, _pooler_connect_args
+
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+class JSONResponse(responses.JSONResponse):
+    """Encoded by the Flask app's encoder (json_provider.py), with the same trailing newline."""
+
+    _dumpb = staticmethod(encoder(Config.JSON_ENCODER))
+
+    def render(self, content) -> bytes:
+        return self._dumpb(content) + b"\n"
+
+
+def error(code: str, message: str, status: int):
+    return JSONResponse({"error": {"code": code, "message": message}}, status_code=status)
+
+
+def async_database_uri(config: dict) -> str:
+    url = make_url(config.get("ASYNC_DATABASE_URI") or config["SQLALCHEMY_DATABASE_URI"])
+    backend = url.get_backend_name()
+    if backend in ASYNC_DRIVERS and url.get_driver_name() != ASYNC_DRIVERS[backend]:
+        url = url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    return url.render_as_string(hide_password=False)
+
+
+def create_engine(config: dict):
+    uri = async_database_uri(config)
+    if uri.startswith("sqlite"):
+        return create_async_engine(uri)
+    transaction_mode = config.get("DB_POOLER_MODE") == "transaction"
+    statement_ms, idle_ms = (int(config.get(key, 0)) for key in ROLES["web"])
+    connect_args = _pooler_connect_args(uri) if transaction_mode else {}
+    if not transaction_mode and uri.startswith("postgresql+asyncpg"):
+        # sent once, with the connection's startup packet
+        connect_args["server_settings"] = {
+            "statement_timeout": str(statement_ms),
+            "idle_in_transaction_session_timeout": str(idle_ms),
+        }
+    engine = create_async_engine(
+        uri,
+        pool_size=config.get("ASYNC_DB_POOL_SIZE", 10),
+        max_overflow=config.get("DB_MAX_OVERFLOW", 5),
+        pool_timeout=config.get("DB_POOL_TIMEOUT", 10),
+        pool_recycle=config.get("DB_POOL_RECYCLE", 1800),
+        pool_pre_ping=config.get("DB_POOL_PRE_PING", True),
+        connect_args=connect_args,
+    )
+    if transaction_mode and engine.dialect.name == "postgresql":
+        @event.listens_for(engine.sync_engine, "begin")
+        def _set_local_timeouts(conn):
+            # one statement each: asyncpg prepares what it runs, and a prepared statement holds one command
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {statement_ms}")
+            conn.exec_driver_sql(f"SET LOCAL idle_in_transaction_session_timeout = {idle_ms}")
+    return engine
+
+
+async def _http_error(request, exc: HTTPException):
+    return error(HTTPStatus(exc.status_code).name, exc.detail, exc.status_code)
+
+
+def create_async_app(overrides: dict = None) -> Starlette:
+    from .catalog import routes
+
+    config = {key: getattr(Config, key) for key in dir(Config) if key.isupper()}
+    config.update(overrides or {})
+    engine = create_engine(config)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        await engine.dispose()
+
+    # as the Flask app: no CORS_ORIGINS means any origin
+    middleware = [Middleware(CORSMiddleware, allow_origins=config["CORS_ORIGINS"] or ["*"],
+                             allow_credentials=True, allow_methods=["GET"], allow_headers=["*"])]
+    app = Starlette(routes=routes, middleware=middleware, lifespan=lifespan,
+                    exception_handlers={HTTPException: _http_error})
+    app.state.config = config
+    app.state.engine = engine
+    app.state.sessions = async_sessionmaker(engine, expire_on_commit=False)
+    return app
@@ -0,0 +1,44 @@
+"""
+python -m src.app.aio [--print-config]
+
+Serves the async catalog app (src/app/aio) with uvicorn on ASYNC_SERVE_BIND:
+ASYNC_SERVE_WORKERS processes (0 = one per usable CPU, as in serving.py), each
+running one event loop. Keep-alive, graceful shutdown and access logging
+follow the SERVE_* settings of the Flask server.
+"""
+import argparse
+
+import uvicorn
+
+from ..config import Config
+from ..serving import available_cpus
+
+
+def settings(config=Config) -> dict:
+    host, port = config.ASYNC_SERVE_BIND.rsplit(":", 1)
+    return {
+        "host": host,
+        "port": int(port),
+        "workers": config.ASYNC_SERVE_WORKERS or available_cpus(),
+        "timeout_keep_alive": config.SERVE_KEEPALIVE,
+        "timeout_graceful_shutdown": config.SERVE_GRACEFUL_TIMEOUT,
+        "limit_max_requests": config.SERVE_MAX_REQUESTS or None,
+        "access_log": config.SERVE_ACCESS_LOG,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the async catalog reads with uvicorn (ASYNC_SERVE_* settings)")
+    parser.add_argument("--print-config", action="store_true", help="show the effective settings and exit")
+    args = parser.parse_args()
+
+    options = settings()
+    if args.print_config:
+        for key, value in options.items():
+            print(f"{key} = {value}")
+        return
+    uvicorn.run("src.app.aio:create_async_app", factory=True, **options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Async versions of the catalog GET views.
+
+Each builds its statement with the sync controller's list-query helper (on
+`select(...)` rather than `Model.query`) and serializes with the same
+`_*_to_dict`, so both apps answer a request identically. The handlers only
+touch attributes their loader profile loads: a lazy load cannot run on an
+async session.
+"""
+import uuid
+
+from sqlalchemy import desc, func, select
+from starlette.routing import Route
+
+from ..controllers.auditorium_controller import _aud_to_dict, auditorium_list_query
+from ..controllers.movie_controller import _movie_to_dict, movie_list_query
+from ..controllers.showtime_controller import _to_dict as _showtime_to_dict, showtime_list_query
+from ..models.auditorium import Auditorium
+from ..models.loaders import with_profile
+from ..models.movie import Movie
+from ..models.showtimes import Showtime
+from . import JSONResponse, error
+
+
+def _bad_request(message, details=None):
+    return JSONResponse({"error": {"code": "BAD_REQUEST", "message": message, "details": details or {}}},
+                        status_code=400)
+
+
+async def _page(request, stmt, order_by, limit, offset, to_dict):
+    async with request.app.state.sessions() as session:
+        total = await session.scalar(select(func.count()).select_from(stmt.subquery()))
+        rows = (await session.scalars(stmt.order_by(*order_by).offset(offset).limit(limit))).all()
+    return JSONResponse({
+        "data": [to_dict(row) for row in rows],
+        "page": {"limit": limit, "offset": offset, "total": total},
+    })
+
+
+# GET /api/v1/movies
+async def get_movies(request):
+    stmt, order_clause, limit, offset = movie_list_query(select(Movie), request.query_params)
+    return await _page(request, stmt, (order_clause, desc(Movie.movie_id)), limit, offset, _movie_to_dict)
+
+
+# GET /api/v1/movies/{movie_id}
+async def get_movie(request):
+    movie_id = request.path_params["movie_id"]
+    async with request.app.state.sessions() as session:
+        result = await session.execute(with_profile(select(Movie).filter_by(movie_id=movie_id), "movie.detail"))
+        movie = result.unique().scalar_one_or_none()
+    if not movie:
+        return error("NOT_FOUND", f"Movie {movie_id} not found", 404)
+    return JSONResponse(_movie_to_dict(movie))
+
+
+# GET /api/v1/showtimes
+async def get_showtimes(request):
+    try:
+        stmt, order_clause, limit, offset = showtime_list_query(select(Showtime), request.query_params)
+    except ValueError as e:
+        return _bad_request(str(e))
+    return await _page(request, stmt, (order_clause,), limit, offset, _showtime_to_dict)
+
+
+# GET /api/v1/showtimes/{showtime_id}
+async def get_showtime(request):
+    try:
+        showtime_id = uuid.UUID(request.path_params["showtime_id"])
+    except ValueError:
+        showtime_id = None
+    s = None
+    if showtime_id is not None:
+        async with request.app.state.sessions() as session:
+            s = await session.scalar(select(Showtime).filter_by(showtime_id=showtime_id))
+    if not s:
+        return error("NOT_FOUND", "Showtime not found", 404)
+    return JSONResponse(_showtime_to_dict(s))
+
+
+# GET /api/v1/auditorium
+async def get_auditoriums(request):
+    stmt, order_clause, limit, offset = auditorium_list_query(select(Auditorium), request.query_params)
+    return await _page(request, stmt, (order_clause,), limit, offset, _aud_to_dict)
+
+
+# GET /api/v1/auditorium/{auditorium_id}
+async def get_auditorium(request):
+    async with request.app.state.sessions() as session:
+        a = await session.scalar(select(Auditorium).filter_by(auditorium_id=request.path_params["auditorium_id"]))
+    if not a:
+        return error("NOT_FOUND", "Auditorium not found", 404)
+    return JSONResponse(_aud_to_dict(a))
+
+
+async def health(request):
+    return JSONResponse({"ok": True})
+
+
+async def index(request):
+    return JSONResponse({"status": "ok"})
+
+
+routes = [
+    Route("/", index),
+    Route("/api/v1/health", health),
+    Route("/api/v1/movies", get_movies),
+    Route("/api/v1/movies/{movie_id:int}", get_movie),
+    Route("/api/v1/showtimes", get_showtimes),
+    Route("/api/v1/showtimes/{showtime_id}", get_showtime),
+    Route("/api/v1/auditorium", get_auditoriums),
+    Route("/api/v1/auditorium/{auditorium_id:int}", get_auditorium),
+]
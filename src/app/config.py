@@ -31,7 +31,140 @@ class Config:
     JWT_COOKIE_SAMESITE = os.getenv("JWT_COOKIE_SAMESITE", "Lax")  # Lax | None | Strict
     JWT_COOKIE_SECURE = os.getenv("JWT_COOKIE_SECURE", "0") == "1"  # True in prod over HTTPS
 
+    # Response JSON (json_provider.py): encoder (orjson | stdlib), and list responses longer than
+    # this many rows are streamed with chunked encoding
+    JSON_ENCODER = os.getenv("JSON_ENCODER", "orjson")
+    JSON_STREAM_MIN_ITEMS = int(os.getenv("JSON_STREAM_MIN_ITEMS", "50"))
+
+    # SQL instrumentation (middleware/sql_stats.py): per-request statement counts; X-SQL-* response
+    # headers (always on in debug mode); log a possible N+1 when one statement shape repeats this often (0 = off)
+    SQL_STATS_ENABLED = os.getenv("SQL_STATS_ENABLED", "1") == "1"
+    SQL_STATS_HEADERS = os.getenv("SQL_STATS_HEADERS", "0") == "1"
+    SQL_STATS_REPEAT_WARN = int(os.getenv("SQL_STATS_REPEAT_WARN", "5"))
+
+    # Admin exports (GET /admin/export/<name>): rows fetched per server-side cursor round trip
+    EXPORT_YIELD_PER = int(os.getenv("EXPORT_YIELD_PER", "1000"))
+
+    # Dashboard reports (GET /admin/reports/*): longest range served at hourly granularity
+    REPORTS_MAX_HOURLY_DAYS = int(os.getenv("REPORTS_MAX_HOURLY_DAYS", "31"))
+
+    # Job scheduler (python -m src.app.jobs schedule): parallel runs per node, jobs this node never
+    # schedules (comma-separated names), and how long job_runs history is kept
+    JOBS_MAX_CONCURRENT = int(os.getenv("JOBS_MAX_CONCURRENT", "4"))
+    JOBS_DISABLED = [j.strip() for j in os.getenv("JOBS_DISABLED", "").split(",") if j.strip()]
+    JOBS_HISTORY_DAYS = int(os.getenv("JOBS_HISTORY_DAYS", "30"))
+
+    # Monthly partitions of bookings/tickets/seat_holds (maintain_partitions job): months created
+    # ahead, months kept (0 = forever; tickets follow bookings), and whether expired months are
+    # detached (left as plain tables to archive and drop by hand) or dropped
+    PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+    BOOKINGS_RETENTION_MONTHS = int(os.getenv("BOOKINGS_RETENTION_MONTHS", "0"))
+    SEAT_HOLDS_RETENTION_MONTHS = int(os.getenv("SEAT_HOLDS_RETENTION_MONTHS", "2"))
+    PARTITION_RETENTION_MODE = os.getenv("PARTITION_RETENTION_MODE", "detach")
+
+    # HTTP serving (python -m src.app.serving): worker class (sync | gthread), processes (0 = from the
+    # CPU count), threads per gthread process, request timeout, graceful shutdown/reload wait, idle
+    # keep-alive, requests after which a worker is replaced (0 = never) and access logging
+    SERVE_BIND = os.getenv("SERVE_BIND", "0.0.0.0:5000")
+    SERVE_WORKER_CLASS = os.getenv("SERVE_WORKER_CLASS", "sync")
+    SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", "0"))
+    SERVE_THREADS = int(os.getenv("SERVE_THREADS", "4"))
+    SERVE_TIMEOUT = int(os.getenv("SERVE_TIMEOUT", "30"))
+    SERVE_GRACEFUL_TIMEOUT = int(os.getenv("SERVE_GRACEFUL_TIMEOUT", "30"))
+    SERVE_KEEPALIVE = int(os.getenv("SERVE_KEEPALIVE", "5"))
+    SERVE_MAX_REQUESTS = int(os.getenv("SERVE_MAX_REQUESTS", "0"))
+    SERVE_ACCESS_LOG = os.getenv("SERVE_ACCESS_LOG", "1") == "1"
+
+    # Async catalog reads (python -m src.app.aio): database (default: SQLALCHEMY_DATABASE_URI with the
+    # asyncpg / aiosqlite driver), pool size per process, bind and processes (0 = one per CPU)
+    ASYNC_DATABASE_URI = os.getenv("ASYNC_DATABASE_URI", "")
+    ASYNC_DB_POOL_SIZE = int(os.getenv("ASYNC_DB_POOL_SIZE", "10"))
+    ASYNC_SERVE_BIND = os.getenv("ASYNC_SERVE_BIND", "0.0.0.0:5001")
+    ASYNC_SERVE_WORKERS = int(os.getenv("ASYNC_SERVE_WORKERS", "0"))
+
+    # Read replicas (services/replicas.py), comma-separated; each gets its own pool of this size and
+    # connect timeout. Workers check them every REPLICA_CHECK_SECONDS and skip one lagging by more than
+    # REPLICA_MAX_LAG_SECONDS; a client that just wrote reads from the primary for REPLICA_PIN_SECONDS
+    DATABASE_REPLICA_URIS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URIS", "").split(",") if u.strip()]
+    REPLICA_POOL_SIZE = int(os.getenv("REPLICA_POOL_SIZE", "5"))
+    REPLICA_MAX_OVERFLOW = int(os.getenv("REPLICA_MAX_OVERFLOW", "5"))
+    REPLICA_CONNECT_TIMEOUT = int(os.getenv("REPLICA_CONNECT_TIMEOUT", "3"))
+    REPLICA_CHECK_SECONDS = float(os.getenv("REPLICA_CHECK_SECONDS", "5"))
+    REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+    REPLICA_PIN_SECONDS = float(os.getenv("REPLICA_PIN_SECONDS", "15"))
+
+    # Connection pools (services/db_pool.py), per process and per database (primary, each replica):
+    # size (0 = one per request thread, or two per concurrent job, plus one), overflow, checkout wait
+    # limit, connection recycle age, and the checkout wait that gets logged. DB_POOLER_MODE=transaction
+    # when connecting through PgBouncer in transaction mode
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "0"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+    DB_POOL_WAIT_WARN_MS = float(os.getenv("DB_POOL_WAIT_WARN_MS", "100"))
+    DB_POOLER_MODE = os.getenv("DB_POOLER_MODE", "session")
+
+    # Server-side timeouts per connection role, ms (0 = none): API requests, jobs, admin exports
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))
+    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS = int(os.getenv("DB_IDLE_IN_TRANSACTION_TIMEOUT_MS", "30000"))
+    DB_JOB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_JOB_STATEMENT_TIMEOUT_MS", "0"))
+    DB_JOB_IDLE_IN_TRANSACTION_TIMEOUT_MS = int(os.getenv("DB_JOB_IDLE_IN_TRANSACTION_TIMEOUT_MS", "0"))
+    DB_EXPORT_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_EXPORT_STATEMENT_TIMEOUT_MS", "60000"))
+    DB_EXPORT_IDLE_IN_TRANSACTION_TIMEOUT_MS = int(os.getenv("DB_EXPORT_IDLE_IN_TRANSACTION_TIMEOUT_MS", "0"))
+
+    # Typeahead prefix index (GET /suggest), per worker: entry cap (~650 bytes each, so ~32 MiB at the
+    # default; a movie and each of its people is an entry), full rebuild interval
+    SUGGEST_MAX_ENTRIES = int(os.getenv("SUGGEST_MAX_ENTRIES", "50000"))
+    SUGGEST_REFRESH_SECONDS = float(os.getenv("SUGGEST_REFRESH_SECONDS", "300"))
+
+    # Authenticated-user cache (per worker process); 0 disables
+    AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "1024"))
+    AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+
+    # Revoked-token deny set: how often each worker pulls new revocations (the purge_revoked_tokens job deletes expired rows)
+    JWT_REVOCATION_REFRESH_SECONDS = float(os.getenv("JWT_REVOCATION_REFRESH_SECONDS", "5"))
+
+    # Password hashing: werkzeug method string (work factor), process pool size (0 = hash inline),
+    # max hashes queued or running before shedding with 503 (0 = 4 per worker)
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(os.cpu_count() or 1, 4))))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "0"))
+    PASSWORD_HASH_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_HASH_TIMEOUT_SECONDS", "10"))
+
+    # Throttling for login / code endpoints: "memory" (per worker) or "shared"
+    # (THROTTLE_SHARED_STORE, a services.throttling.CounterStore; defaults to an in-process stand-in)
+    THROTTLE_ENABLED = os.getenv("THROTTLE_ENABLED", "1") == "1"
+    THROTTLE_BACKEND = os.getenv("THROTTLE_BACKEND", "memory")
+
+    # Email outbox delivery (jobs/email_worker.py): worker threads, rows claimed per batch,
+    # retries with exponential backoff (base * 2^n, capped), lease on claimed rows,
+    # circuit breaker (consecutive server failures before pausing, and for how long)
+    EMAIL_OUTBOX_WORKERS = int(os.getenv("EMAIL_OUTBOX_WORKERS", "2"))
+    EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "20"))
+    EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "8"))
+    EMAIL_OUTBOX_BACKOFF_SECONDS = float(os.getenv("EMAIL_OUTBOX_BACKOFF_SECONDS", "30"))
+    EMAIL_OUTBOX_BACKOFF_MAX_SECONDS = float(os.getenv("EMAIL_OUTBOX_BACKOFF_MAX_SECONDS", "3600"))
+    EMAIL_OUTBOX_POLL_SECONDS = float(os.getenv("EMAIL_OUTBOX_POLL_SECONDS", "2"))
+    EMAIL_OUTBOX_LEASE_SECONDS = float(os.getenv("EMAIL_OUTBOX_LEASE_SECONDS", "120"))
+    EMAIL_OUTBOX_BREAKER_THRESHOLD = int(os.getenv("EMAIL_OUTBOX_BREAKER_THRESHOLD", "5"))
+    EMAIL_OUTBOX_BREAKER_COOLDOWN_SECONDS = float(os.getenv("EMAIL_OUTBOX_BREAKER_COOLDOWN_SECONDS", "60"))
+    EMAIL_OUTBOX_RETENTION_DAYS = int(os.getenv("EMAIL_OUTBOX_RETENTION_DAYS", "7"))
+    EMAIL_SMTP_TIMEOUT_SECONDS = float(os.getenv("EMAIL_SMTP_TIMEOUT_SECONDS", "30"))
+
+    # Promotion campaigns (jobs/run_campaigns.py): persistent SMTP connections, overall send rate
+    # (0 = unlimited), recipients per checkpoint, when a silent RUNNING campaign is taken over,
+    # and how long a PAUSED one (SMTP kept failing) waits before it is retried
+    CAMPAIGN_SMTP_CONNECTIONS = int(os.getenv("CAMPAIGN_SMTP_CONNECTIONS", "3"))
+    CAMPAIGN_RATE_PER_SECOND = float(os.getenv("CAMPAIGN_RATE_PER_SECOND", "10"))
+    CAMPAIGN_CHUNK_SIZE = int(os.getenv("CAMPAIGN_CHUNK_SIZE", "500"))
+    CAMPAIGN_STALE_SECONDS = float(os.getenv("CAMPAIGN_STALE_SECONDS", "600"))
+    CAMPAIGN_RETRY_SECONDS = float(os.getenv("CAMPAIGN_RETRY_SECONDS", "900"))
+
     # Card Encryption (Fernet key for encrypting payment card data at rest)
     # Generate with: python -c "from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())"
     # Educational use only - this project handles test data with symmetric encryption
     ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY", None)
+    # Previous keys, comma-separated: still decrypt, never encrypt. To rotate, move the old key here,
+    # set a new ENCRYPTION_KEY, deploy, then run src/app/jobs/rotate_encryption_key.py
+    ENCRYPTION_OLD_KEYS = os.getenv("ENCRYPTION_OLD_KEYS", "")
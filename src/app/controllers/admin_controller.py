@@ -1,21 +1,43 @@
-from flask import request, jsonify
-from sqlalchemy import asc, desc
+import uuid
+from datetime import datetime, timedelta
+from flask import request, jsonify, current_app
+from sqlalchemy import asc, desc, func, or_, update
 from .. import db
 from ..models.users import User
+from ..services.user_cache import invalidate_user, invalidate_users
+from ..services.token_revocation import revoke_user_tokens, revoke_users_tokens
+from ..services.db_pool import pool_telemetry
+from ..json_provider import list_response
+
+# explicit id lists accepted by PATCH /admin/users (larger sets: use a filter)
+BULK_MAX_IDS = 10000
 
 
 def _to_user_row(u: User):
     return {
-        "user_id": str(u.user_id),
+        "user_id": u.user_id,
         "email": u.email,
         "first_name": u.first_name,
         "last_name": u.last_name,
         "role": "admin" if u.is_admin else "user",
         "is_verified": bool(u.is_verified),
-        "created_at": u.created_at.isoformat() if u.created_at else None,
+        "created_at": u.created_at,
     }
 
 
+def _bad_request(msg):
+    return jsonify({"error": {"code": "BAD_REQUEST", "message": msg}}), 400
+
+
+def _search_clause(q: str):
+    ilike = f"%{q}%"
+    return db.or_(
+        User.email.ilike(ilike),
+        User.first_name.ilike(ilike),
+        User.last_name.ilike(ilike),
+    )
+
+
 def list_users(_admin_user):
     """GET /api/v1/admin/users?query=&limit=&offset=&sort=created_at.desc"""
     q = (request.args.get("query") or "").strip()
@@ -38,20 +60,11 @@ def list_users(_admin_user):
 
     query = User.query
     if q:
-        ilike = f"%{q}%"
-        query = query.filter(
-            db.or_(
-                User.email.ilike(ilike),
-                User.first_name.ilike(ilike),
-                User.last_name.ilike(ilike),
-            )
-        )
+        query = query.filter(_search_clause(q))
     total = query.count()
     rows = query.order_by(order_clause).offset(offset).limit(limit).all()
 
-    return jsonify(
-        {"data": [_to_user_row(u) for u in rows], "page": {"limit": limit, "offset": offset, "total": total}}
-    )
+    return list_response(rows, _to_user_row, page={"limit": limit, "offset": offset, "total": total})
 
 
 def update_user_admin(_admin_user, user_id):
@@ -64,12 +77,14 @@ def update_user_admin(_admin_user, user_id):
         return jsonify({"error": {"code": "NOT_FOUND", "message": "User not found"}}), 404
 
     data = request.get_json(silent=True) or {}
+    demoted = False
 
     # role
     if "role" in data:
         role = data["role"]
         if role not in ("admin", "user"):
             return jsonify({"error": {"code": "BAD_REQUEST", "message": "role must be 'admin' or 'user'"}}), 400
+        demoted = bool(target.is_admin) and role == "user"
         target.is_admin = role == "admin"
 
     # verification
@@ -87,9 +102,152 @@ def update_user_admin(_admin_user, user_id):
         target.email = new_email
 
     try:
+        if demoted:
+            # outstanding tokens were issued to an admin; make them sign in again
+            revoke_user_tokens(target.user_id, timedelta(days=current_app.config["JWT_EXPIRES_DAYS"]))
         db.session.commit()
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": {"code": "SERVER_ERROR", "message": str(e)}}), 500
+    invalidate_user(target.user_id)
 
     return jsonify(_to_user_row(target)), 200
+
+
+def _parse_dt(v):
+    try:
+        if v.endswith("Z"):
+            v = v[:-1] + "+00:00"
+        return datetime.fromisoformat(v)
+    except Exception:
+        return None
+
+
+def _bulk_criteria(data):
+    """WHERE clauses for a bulk request: (criteria, explicit ids or None, error message)."""
+    has_ids, has_filter = "user_ids" in data, "filter" in data
+    if has_ids == has_filter:
+        return None, None, "Provide exactly one of user_ids or filter"
+
+    if has_ids:
+        raw = data["user_ids"]
+        if not isinstance(raw, list) or not raw:
+            return None, None, "user_ids must be a non-empty list"
+        if len(raw) > BULK_MAX_IDS:
+            return None, None, f"At most {BULK_MAX_IDS} user_ids per request; use a filter for larger sets"
+        try:
+            ids = list({uuid.UUID(str(u)) for u in raw})
+        except ValueError:
+            return None, None, "user_ids must be UUIDs"
+        return [User.user_id.in_(ids)], ids, None
+
+    f = data["filter"]
+    if not isinstance(f, dict) or not f:
+        return None, None, "filter must be a non-empty object"
+    criteria = []
+    for key, value in f.items():
+        if key == "query":
+            q = (value or "").strip()
+            if not q:
+                return None, None, "filter.query cannot be empty"
+            criteria.append(_search_clause(q))
+        elif key == "role":
+            if value not in ("admin", "user"):
+                return None, None, "filter.role must be 'admin' or 'user'"
+            criteria.append(User.is_admin.is_(True) if value == "admin" else User.is_admin.isnot(True))
+        elif key in ("is_verified", "is_email_list"):
+            if not isinstance(value, bool):
+                return None, None, f"filter.{key} must be a boolean"
+            column = getattr(User, key)
+            criteria.append(column.is_(True) if value else column.isnot(True))
+        elif key in ("created_from", "created_to"):
+            dt = _parse_dt(value) if isinstance(value, str) else None
+            if dt is None:
+                return None, None, f"filter.{key} must be ISO datetime"
+            criteria.append(User.created_at >= dt if key == "created_from" else User.created_at < dt)
+        else:
+            return None, None, f"Unknown filter '{key}'"
+    return criteria, None, None
+
+
+def bulk_update_users(_admin_user):
+    """PATCH /api/v1/admin/users
+    Body: {
+      user_ids?: [uuid, ...]   (at most BULK_MAX_IDS)   -- or --
+      filter?: { query?, role?, is_verified?, is_email_list?, created_from?, created_to? },
+      changes: { role?: 'admin'|'user', is_verified?: bool, is_email_list?: bool }
+    }
+    Runs as a couple of set-based UPDATEs; rows that already have the new values
+    are left untouched. Demoted admins have their outstanding tokens revoked.
+    """
+    data = request.get_json(silent=True) or {}
+    criteria, ids, error = _bulk_criteria(data)
+    if error:
+        return _bad_request(error)
+
+    changes = data.get("changes")
+    if not isinstance(changes, dict) or not changes:
+        return _bad_request("changes must be a non-empty object")
+    values = {}
+    for key, value in changes.items():
+        if key == "role":
+            if value not in ("admin", "user"):
+                return _bad_request("role must be 'admin' or 'user'")
+            values["is_admin"] = value == "admin"
+        elif key in ("is_verified", "is_email_list"):
+            if not isinstance(value, bool):
+                return _bad_request(f"{key} must be a boolean")
+            values[key] = value
+        else:
+            return _bad_request(f"'{key}' cannot be changed in bulk")
+
+    try:
+        matched = db.session.query(func.count(User.user_id)).filter(*criteria).scalar()
+
+        demoted = []
+        if values.get("is_admin") is False:
+            # demotions first, so we know whose tokens to revoke
+            demoted = db.session.execute(
+                update(User)
+                .where(*criteria, User.is_admin.is_(True))
+                .values(is_admin=False)
+                .returning(User.user_id)
+                .execution_options(synchronize_session=False)
+            ).scalars().all()
+            if demoted:
+                revoke_users_tokens(demoted, timedelta(days=current_app.config["JWT_EXPIRES_DAYS"]))
+
+        differs = or_(*[getattr(User, k).is_distinct_from(v) for k, v in values.items()])
+        updated = db.session.execute(
+            update(User)
+            .where(*criteria, differs)
+            .values(**values)
+            .returning(User.user_id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": {"code": "SERVER_ERROR", "message": str(e)}}), 500
+
+    changed = set(updated) | set(demoted)
+    invalidate_users(changed)
+
+    result = {
+        "matched": matched,
+        "updated": len(changed),
+        "unchanged": matched - len(changed),
+        "demoted": len(demoted),
+    }
+    if ids is not None:
+        result["not_found"] = len(ids) - matched
+    return jsonify(result), 200
+
+
+def get_db_pools(_admin_user):
+    """GET /api/v1/admin/db/pools
+    Connection pools of the worker process that serves the request: size,
+    checked out, overflow, and checkout counts / timeouts / wait histogram
+    since it started. Each worker has its own; poll a few times to see several.
+    """
+    return jsonify(pool_telemetry.snapshot()), 200
@@ -3,17 +3,51 @@ from sqlalchemy import asc, desc
 from sqlalchemy.exc import IntegrityError
 from .. import db
 from ..models.auditorium import Auditorium
+from ..services.suggest import suggest_index
+from ..json_provider import list_response
 
 def _aud_to_dict(a: Auditorium):
     return {
         "id": a.auditorium_id,
         "name": a.name,
-        "created_at": a.created_at.isoformat() if a.created_at else None,
+        "created_at": a.created_at,
     }
 
 def _bad_request(msg, details=None):
     return jsonify({"error": {"code": "BAD_REQUEST", "message": msg, "details": details or {}}}), 400
 
+def auditorium_list_query(query, args):
+    """
+    Filter and sort of GET /api/v1/auditorium (see get_auditoriums) from `args`
+    applied to `query` (Auditorium.query, or select(Auditorium) in the async app).
+    Returns (query, order clause, limit, offset).
+    """
+    q = (args.get("q") or "").strip()
+
+    try:
+        limit = min(max(int(args.get("limit", 20)), 1), 100)
+    except ValueError:
+        limit = 20
+
+    try:
+        offset = max(int(args.get("offset", 0)), 0)
+    except ValueError:
+        offset = 0
+
+    sort = (args.get("sort") or "created_at.desc").lower()
+    sort_map = {
+        "name.asc": asc(Auditorium.name),
+        "name.desc": desc(Auditorium.name),
+        "created_at.asc": asc(Auditorium.created_at),
+        "created_at.desc": desc(Auditorium.created_at),
+    }
+    order_clause = sort_map.get(sort, desc(Auditorium.created_at))
+
+    if q:
+        query = query.filter(Auditorium.name.ilike(f"%{q}%"))
+
+    return query, order_clause, limit, offset
+
 def create_auditorium():
     """
     POST /api/v1/auditorium
@@ -33,6 +67,7 @@ def create_auditorium():
         # unique constraint on name
         return jsonify({"error": {"code": "CONFLICT", "message": "Auditorium name already exists"}}), 409
 
+    suggest_index.upsert_auditorium(a)
     return jsonify(_aud_to_dict(a)), 201
 
 
@@ -45,38 +80,12 @@ def get_auditoriums():
       offset  (int)  - default 0
       sort    (str)  - one of: name.asc, name.desc, created_at.asc, created_at.desc (default)
     """
-    q = (request.args.get("q") or "").strip()
-
-    try:
-        limit = min(max(int(request.args.get("limit", 20)), 1), 100)
-    except ValueError:
-        limit = 20
-
-    try:
-        offset = max(int(request.args.get("offset", 0)), 0)
-    except ValueError:
-        offset = 0
-
-    sort = (request.args.get("sort") or "created_at.desc").lower()
-    sort_map = {
-        "name.asc": asc(Auditorium.name),
-        "name.desc": desc(Auditorium.name),
-        "created_at.asc": asc(Auditorium.created_at),
-        "created_at.desc": desc(Auditorium.created_at),
-    }
-    order_clause = sort_map.get(sort, desc(Auditorium.created_at))
-
-    query = Auditorium.query
-    if q:
-        query = query.filter(Auditorium.name.ilike(f"%{q}%"))
+    query, order_clause, limit, offset = auditorium_list_query(Auditorium.query, request.args)
 
     total = query.count()
     rows = query.order_by(order_clause).offset(offset).limit(limit).all()
 
-    return jsonify({
-        "data": [_aud_to_dict(a) for a in rows],
-        "page": {"limit": limit, "offset": offset, "total": total}
-    })
+    return list_response(rows, _aud_to_dict, page={"limit": limit, "offset": offset, "total": total})
 
 
 def get_auditorium(auditorium_id: int):
@@ -1,15 +1,27 @@
 from flask import jsonify, request, current_app, make_response
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timedelta, timezone
+import uuid
 
 from ..models.users import User
 from ..models.verification_tokens import VerificationToken
 from ..models.password_reset_tokens import PasswordResetToken
 from ..services.email_service import (
-    send_verification_email,
+    queue_verification_email,
     generate_verification_code,
-    send_password_reset_email,
-    send_password_changed_email,
+    queue_password_reset_email,
+    queue_password_changed_email,
+)
+from ..middleware.auth import resolve_principal, auth_error_response, current_token_claims
+from ..services.user_cache import invalidate_user
+from ..services.token_revocation import revoke_token, revoke_user_tokens
+from ..services.password_hashing import password_hasher
+from ..services.codes import (
+    verify_email_code,
+    consume_reset_code,
+    explain_rejected_code,
+    CODE_USER_NOT_FOUND,
+    CODE_USED,
+    CODE_EXPIRED,
 )
 from .. import db
 
@@ -23,15 +35,8 @@ def _now_utc():
     return datetime.now(timezone.utc)
 
 
-def _get_jwt_from_request():
-    """Prefer cookie; fallback to Authorization: Bearer"""
-    token = request.cookies.get(current_app.config["JWT_COOKIE_NAME"])
-    if token:
-        return token
-    auth = request.headers.get("Authorization") or ""
-    if auth.startswith("Bearer "):
-        return auth.split(" ", 1)[1]
-    return None
+def _token_lifetime():
+    return timedelta(days=current_app.config["JWT_EXPIRES_DAYS"])
 
 
 class AuthController:
@@ -54,7 +59,7 @@ class AuthController:
             first_name=data["first_name"],
             last_name=data["last_name"],
             email=data["email"],
-            password_hash=generate_password_hash(data["password"]),
+            password_hash=password_hasher.hash(data["password"]),
             is_email_list=bool(data.get("is_email_list", False)),
         )
 
@@ -65,13 +70,9 @@ class AuthController:
             code = generate_verification_code()
             vtok = VerificationToken(user_id=user.user_id, token=code)
             db.session.add(vtok)
+            queue_verification_email(user.email, code)
             db.session.commit()
 
-            try:
-                send_verification_email(user.email, code)
-            except Exception as e:
-                current_app.logger.error(f"Failed to send verification email: {e}")
-
             return (
                 jsonify(
                     {
@@ -96,9 +97,18 @@ class AuthController:
             return jsonify({"error": "Email and password are required"}), 400
 
         user = User.query.filter_by(email=email).first()
-        if not user or not check_password_hash(user.password_hash, password):
+        if not user or not password_hasher.verify(user.password_hash, password):
             return jsonify({"error": "Invalid email or password"}), 401
 
+        # transparently upgrade hashes made with an older work factor
+        if password_hasher.needs_rehash(user.password_hash):
+            try:
+                user.password_hash = password_hasher.hash(password)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.warning(f"Failed to rehash password on login: {e}")
+
         # Require email verification before login
         if not user.is_verified:
             return (
@@ -110,10 +120,13 @@ class AuthController:
                 403,
             )
 
-        exp = _now_utc() + timedelta(days=current_app.config["JWT_EXPIRES_DAYS"])
+        now = _now_utc()
+        exp = now + _token_lifetime()
         try:
+            # iat as a float: PyJWT would truncate a datetime to the second, and a token issued
+            # in the same second as a password reset would then fall under its revocation cutoff
             token = jwt.encode(
-                {"user_id": str(user.user_id), "exp": exp},
+                {"user_id": str(user.user_id), "exp": exp, "iat": now.timestamp(), "jti": uuid.uuid4().hex},
                 current_app.config["JWT_SECRET_KEY"],
                 algorithm="HS256",
             )
@@ -148,6 +161,20 @@ class AuthController:
 
     @staticmethod
     def logout():
+        # revoke the presented token so a copied cookie/Bearer stops working too
+        claims = current_token_claims()
+        if claims and claims.get("jti"):
+            try:
+                revoke_token(
+                    claims["jti"],
+                    uuid.UUID(claims["user_id"]),
+                    datetime.fromtimestamp(claims["exp"], timezone.utc),
+                )
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.error(f"Failed to revoke token on logout: {e}")
+
         resp = make_response(jsonify({"message": "Logged out"}), 200)
         resp.set_cookie(
             current_app.config["JWT_COOKIE_NAME"],
@@ -171,47 +198,28 @@ class AuthController:
                 400,
             )
 
-        user = User.query.filter_by(email=email).first()
-        if not user:
-            return jsonify({"error": "User not found"}), 404
-
-        vtok = VerificationToken.query.filter_by(
-            user_id=user.user_id, token=code
-        ).first()
-        if not vtok:
+        # consume the code and verify the user in one round trip
+        user_id = verify_email_code(email, str(code))
+        if user_id is None:
+            reason = explain_rejected_code(VerificationToken, email, str(code))
+            db.session.rollback()
+            if reason == CODE_USER_NOT_FOUND:
+                return jsonify({"error": "User not found"}), 404
+            if reason == CODE_EXPIRED:
+                return jsonify({"error": "Verification code has expired"}), 400
+            if reason == CODE_USED:
+                return jsonify({"error": "Verification code has already been used"}), 400
             return jsonify({"error": "Invalid verification code"}), 400
-        if vtok.is_expired:
-            db.session.delete(vtok)
-            db.session.commit()
-            return jsonify({"error": "Verification code has expired"}), 400
-        if vtok.is_used:
-            return jsonify({"error": "Verification code has already been used"}), 400
 
-        user.is_verified = True
-        vtok.is_used = True
         db.session.commit()
+        invalidate_user(user_id)
         return jsonify({"message": "Email verified successfully"}), 200
 
     @staticmethod
     def resend_verification():
-        if jwt is None:
-            return jsonify({"error": "JWT module not available"}), 500
-
-        token = _get_jwt_from_request()
-        if not token:
-            return jsonify({"error": "Not authenticated"}), 401
-        try:
-            payload = jwt.decode(
-                token, current_app.config["JWT_SECRET_KEY"], algorithms=["HS256"]
-            )
-        except jwt.ExpiredSignatureError:
-            return jsonify({"error": "Token has expired"}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({"error": "Invalid token"}), 401
-
-        user = User.query.filter_by(user_id=payload["user_id"]).first()
-        if not user:
-            return jsonify({"error": "User not found"}), 404
+        user, error = resolve_principal()
+        if error:
+            return auth_error_response(error)
         if user.is_verified:
             return jsonify({"message": "Email already verified"}), 200
 
@@ -219,37 +227,16 @@ class AuthController:
         code = generate_verification_code()
         vtok = VerificationToken(user_id=user.user_id, token=code)
         db.session.add(vtok)
+        queue_verification_email(user.email, code)
         db.session.commit()
 
-        try:
-            send_verification_email(user.email, code)
-        except Exception as e:
-            current_app.logger.error(f"Failed to send verification email: {e}")
-            return jsonify({"error": "Failed to send verification email"}), 500
-
         return jsonify({"message": "Verification email sent"}), 200
 
     @staticmethod
     def verify_token():
-        if jwt is None:
-            return jsonify({"error": "JWT module not available"}), 500
-
-        token = _get_jwt_from_request()
-        if not token:
-            return jsonify({"error": "Not authenticated"}), 401
-
-        try:
-            payload = jwt.decode(
-                token, current_app.config["JWT_SECRET_KEY"], algorithms=["HS256"]
-            )
-        except jwt.ExpiredSignatureError:
-            return jsonify({"error": "Token has expired"}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({"error": "Invalid token"}), 401
-
-        user = User.query.filter_by(user_id=payload["user_id"]).first()
-        if not user:
-            return jsonify({"error": "User not found"}), 404
+        user, error = resolve_principal()
+        if error:
+            return auth_error_response(error)
 
         return (
             jsonify(
@@ -288,14 +275,10 @@ class AuthController:
                 code = PasswordResetToken.generate_code()
                 rtok = PasswordResetToken(user_id=user.user_id, token=code)
                 db.session.add(rtok)
+                queue_password_reset_email(user.email, code)
                 db.session.commit()
-                try:
-                    send_password_reset_email(user.email, code)
-                except Exception as e:
-                    current_app.logger.error(
-                        f"Failed to send password reset email: {e}"
-                    )
             except Exception as e:
+                db.session.rollback()
                 current_app.logger.error(
                     f"Failed to create password reset token: {e}"
                 )
@@ -319,42 +302,38 @@ class AuthController:
                 400,
             )
 
-        user = User.query.filter_by(email=email).first()
-        if not user:
-            return jsonify({"error": "Invalid email or code"}), 400
-
-        rtok = PasswordResetToken.query.filter_by(
-            user_id=user.user_id, token=code
-        ).first()
-        if not rtok:
+        # consume the code in one round trip; only failures pay for a lookup to explain why
+        user_id = consume_reset_code(email, str(code))
+        if user_id is None:
+            reason = explain_rejected_code(PasswordResetToken, email, str(code))
+            db.session.rollback()
+            if reason == CODE_USED:
+                return jsonify({"error": "Code has already been used"}), 400
+            if reason == CODE_EXPIRED:
+                return jsonify({"error": "Code has expired"}), 400
             return jsonify({"error": "Invalid email or code"}), 400
-        if rtok.is_used:
-            return jsonify({"error": "Code has already been used"}), 400
-        if rtok.is_expired:
-            db.session.delete(rtok)
-            db.session.commit()
-            return jsonify({"error": "Code has expired"}), 400
 
+        new_hash = password_hasher.hash(new_password)
         try:
-            user.password_hash = generate_password_hash(new_password)
-            rtok.is_used = True
+            User.query.filter_by(user_id=user_id).update(
+                {"password_hash": new_hash}, synchronize_session=False
+            )
             PasswordResetToken.query.filter(
-                PasswordResetToken.user_id == user.user_id,
+                PasswordResetToken.user_id == user_id,
                 PasswordResetToken.is_used == False,
-                PasswordResetToken.token != code,
-            ).delete()
-            db.session.commit()
-            
+            ).delete(synchronize_session=False)
+            # sign out every existing session
+            revoke_user_tokens(user_id, _token_lifetime())
+
             # Notify user about password change
-            try:
-                from datetime import datetime, timezone
-                time_str = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
-                ip = request.remote_addr or "unknown"
-                ua = request.headers.get("User-Agent")
-                send_password_changed_email(user.email, time_str, ip, ua)
-            except Exception as e:
-                current_app.logger.error(f"Failed to send password-changed email: {e}")
-            
+            time_str = _now_utc().strftime("%Y-%m-%d %H:%M:%S UTC")
+            ip = request.remote_addr or "unknown"
+            ua = request.headers.get("User-Agent")
+            queue_password_changed_email(email, time_str, ip, ua)
+
+            db.session.commit()
+            invalidate_user(user_id)
+
             return jsonify({"message": "Password updated successfully"}), 200
         except Exception as e:
             db.session.rollback()
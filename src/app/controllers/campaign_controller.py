@@ -0,0 +1,67 @@
+from flask import request, jsonify
+from .. import db
+from ..models.promotions import Promotion
+from ..models.promotion_campaigns import PromotionCampaign
+from ..services.campaigns import UNFINISHED_STATUSES
+
+
+def _to_campaign_row(c: PromotionCampaign):
+    return {
+        "campaign_id": c.campaign_id,
+        "promotion_id": c.promotion_id,
+        "subject": c.subject,
+        "status": c.status,
+        "sent_count": c.sent_count,
+        "failed_count": c.failed_count,
+        "last_error": c.last_error,
+        "created_at": c.created_at,
+        "started_at": c.started_at,
+        "finished_at": c.finished_at,
+    }
+
+
+def create_campaign(_admin_user, promotion_id):
+    """POST /api/v1/admin/promotions/<promotion_id>/campaigns
+    Body: { subject?: string }
+    Queues a mailing to every verified user on the email list; jobs/run_campaigns.py sends it.
+    """
+    promo = db.session.get(Promotion, promotion_id)
+    if not promo:
+        return jsonify({"error": {"code": "NOT_FOUND", "message": "Promotion not found"}}), 404
+
+    active = PromotionCampaign.query.filter(
+        PromotionCampaign.promotion_id == promo.promotion_id,
+        PromotionCampaign.status.in_(UNFINISHED_STATUSES),
+    ).first()
+    if active:
+        return jsonify({"error": {"code": "CONFLICT", "message": "A campaign for this promotion is already in progress"}}), 409
+
+    data = request.get_json(silent=True) or {}
+    subject = (data.get("subject") or "").strip() or f"Save with code {promo.code}"
+
+    campaign = PromotionCampaign(promotion_id=promo.promotion_id, subject=subject)
+    db.session.add(campaign)
+    db.session.commit()
+    return jsonify(_to_campaign_row(campaign)), 201
+
+
+def get_campaign(_admin_user, campaign_id):
+    """GET /api/v1/admin/campaigns/<campaign_id>"""
+    campaign = db.session.get(PromotionCampaign, campaign_id)
+    if not campaign:
+        return jsonify({"error": {"code": "NOT_FOUND", "message": "Campaign not found"}}), 404
+    return jsonify(_to_campaign_row(campaign)), 200
+
+
+def cancel_campaign(_admin_user, campaign_id):
+    """POST /api/v1/admin/campaigns/<campaign_id>/cancel
+    A running campaign stops at its next checkpoint.
+    """
+    campaign = db.session.get(PromotionCampaign, campaign_id)
+    if not campaign:
+        return jsonify({"error": {"code": "NOT_FOUND", "message": "Campaign not found"}}), 404
+    if campaign.status not in UNFINISHED_STATUSES:
+        return jsonify({"error": {"code": "CONFLICT", "message": f"Campaign is already {campaign.status.lower()}"}}), 409
+    campaign.status = "CANCELLED"
+    db.session.commit()
+    return jsonify(_to_campaign_row(campaign)), 200
@@ -0,0 +1,63 @@
+from datetime import datetime, timezone
+from flask import request, jsonify, current_app, Response
+from ..services.exports import EXPORTS, FORMATS, ExportError, resolve_fields, stream_rows
+
+
+def _bad_request(msg, details=None, code=400):
+    return jsonify({"error": {"code": "BAD_REQUEST", "message": msg, "details": details or {}}}), code
+
+
+def _parse_dt(v: str):
+    # "2025-10-01T19:30:00Z"
+    try:
+        if v.endswith("Z"):
+            v = v[:-1] + "+00:00"
+        return datetime.fromisoformat(v)
+    except Exception:
+        return None
+
+
+def export_table(_admin_user, name):
+    """GET /api/v1/admin/export/<users|bookings|movies|showtimes>
+    Query params:
+      format  (str)  - csv (default) or ndjson
+      fields  (str)  - comma-separated columns, in output order (default all)
+      from/to (ISO)  - created_at range (starts_at for showtimes), to is exclusive
+    Streams every matching row; there is no paging.
+    """
+    export = EXPORTS.get(name)
+    if export is None:
+        return jsonify({"error": {"code": "NOT_FOUND", "message": f"Unknown export '{name}'",
+                                  "details": {"allowed": list(EXPORTS)}}}), 404
+
+    fmt = (request.args.get("format") or "csv").lower()
+    if fmt not in FORMATS:
+        return _bad_request("format must be one of: " + ", ".join(FORMATS))
+
+    raw_fields = [f.strip() for f in (request.args.get("fields") or "").split(",") if f.strip()]
+    try:
+        fields = resolve_fields(export, raw_fields)
+    except ExportError as e:
+        return _bad_request(str(e), {"allowed": list(export.columns)})
+
+    from_raw = request.args.get("from")
+    to_raw = request.args.get("to")
+    dt_from = _parse_dt(from_raw) if from_raw else None
+    dt_to = _parse_dt(to_raw) if to_raw else None
+    if from_raw and not dt_from:
+        return _bad_request("`from` must be ISO datetime")
+    if to_raw and not dt_to:
+        return _bad_request("`to` must be ISO datetime")
+
+    query = export.select(fields, since=dt_from, until=dt_to)
+    chunks = stream_rows(query, fields, fmt, current_app.config.get("EXPORT_YIELD_PER", 1000))
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return Response(
+        chunks,
+        mimetype=FORMATS[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="{name}-{stamp}.{fmt}"',
+            "Cache-Control": "no-store",
+            "X-Accel-Buffering": "no",  # let a fronting nginx pass chunks straight through
+        },
+    )
@@ -1,9 +1,13 @@
 from flask import request, jsonify
 from sqlalchemy import asc, desc
-from sqlalchemy.orm import joinedload
 from .. import db
 from ..models.movie import Movie
 from ..models.category import Category
+from ..models.movie_rating_summary import MovieRatingSummary
+from ..models.loaders import with_profile
+from ..services.ratings import summary_to_dict
+from ..services.suggest import suggest_index
+from ..json_provider import list_response
 
 # helper
 
@@ -23,48 +27,48 @@ def _movie_to_dict(m: Movie):
         "trailer_picture": m.trailer_picture,
         "video": m.video,
         "film_rating_code": m.film_rating_code,
-        "created_at": m.created_at.isoformat() if m.created_at else None,
+        "created_at": m.created_at,
         "categories": [{"id": c.category_id, "name": c.name} for c in (m.categories or [])],
+        "rating": summary_to_dict(m.rating_summary),
     }
 
 def _bad_request(message, details=None):
     return jsonify({"error": {"code": "BAD_REQUEST", "message": message, "details": details or {}}}), 400
 
-# controllers
-
-def get_movies():
+def movie_list_query(query, args):
     """
-    GET /api/v1/movies
-    Query params:
-      q                (str)   - free-text search in title/director/producer
-      category         (str)   - filter by category name (can repeat)
-      category_mode    (str)   - "any" (default) or "all" matching categories
-      limit            (int)   - page size (default 20, max 100)
-      offset           (int)   - pagination offset (default 0)
-      sort             (str)   - "created_at.desc" (default), "created_at.asc", "title.asc/desc"
+    Filters and sort of GET /api/v1/movies (see get_movies) from `args`, the
+    request's query parameters, applied to `query` (Movie.query, or select(Movie)
+    in the async app). Returns (query, order clause, limit, offset); paging is
+    left to the caller, which counts the unpaged query first.
     """
-    q = (request.args.get("q") or "").strip()
-    category_names = request.args.getlist("category")  # /movies?category=Sci-Fi&category=Thriller
-    category_mode = (request.args.get("category_mode") or "any").lower()
+    q = (args.get("q") or "").strip()
+    category_names = args.getlist("category")  # /movies?category=Sci-Fi&category=Thriller
+    category_mode = (args.get("category_mode") or "any").lower()
     try:
-        limit = min(max(int(request.args.get("limit", 20)), 1), 100)
+        limit = min(max(int(args.get("limit", 20)), 1), 100)
     except ValueError:
         limit = 20
     try:
-        offset = max(int(request.args.get("offset", 0)), 0)
+        offset = max(int(args.get("offset", 0)), 0)
     except ValueError:
         offset = 0
 
-    sort = (request.args.get("sort") or "created_at.desc").lower()
+    avg_rating = MovieRatingSummary.rating_sum * 1.0 / db.func.nullif(MovieRatingSummary.rating_count, 0)
+
+    sort = (args.get("sort") or "created_at.desc").lower()
     sort_map = {
         "created_at.asc":  asc(Movie.created_at),
         "created_at.desc": desc(Movie.created_at),
         "title.asc":       asc(Movie.title),
         "title.desc":      desc(Movie.title),
+        "rating.asc":      asc(avg_rating).nulls_last(),
+        "rating.desc":     desc(avg_rating).nulls_last(),
     }
     order_clause = sort_map.get(sort, desc(Movie.created_at))
 
-    query = Movie.query.options(joinedload(Movie.categories))
+    # movie.card joins the one-to-one summary (no extra round trip), which also lets us sort on it
+    query = with_profile(query, "movie.card")
 
     if q:
         ilike = f"%{q}%"
@@ -92,17 +96,32 @@ def get_movies():
                     Movie.categories.any(Category.name.in_(norm))
                 )
 
+    return query, order_clause, limit, offset
+
+# controllers
+
+def get_movies():
+    """
+    GET /api/v1/movies
+    Query params:
+      q                (str)   - free-text search in title/director/producer
+      category         (str)   - filter by category name (can repeat)
+      category_mode    (str)   - "any" (default) or "all" matching categories
+      limit            (int)   - page size (default 20, max 100)
+      offset           (int)   - pagination offset (default 0)
+      sort             (str)   - "created_at.desc" (default), "created_at.asc", "title.asc/desc",
+                                 "rating.desc/asc" (average rating; unrated movies last)
+    """
+    query, order_clause, limit, offset = movie_list_query(Movie.query, request.args)
+
     total = query.count()
-    rows = query.order_by(order_clause).offset(offset).limit(limit).all()
+    rows = query.order_by(order_clause, desc(Movie.movie_id)).offset(offset).limit(limit).all()
 
-    return jsonify({
-        "data": [_movie_to_dict(m) for m in rows],
-        "page": {"limit": limit, "offset": offset, "total": total}
-    })
+    return list_response(rows, _movie_to_dict, page={"limit": limit, "offset": offset, "total": total})
 
 def get_movie(movie_id):
     """GET /api/v1/movies/<movie_id>"""
-    movie = db.session.get(Movie, movie_id)
+    movie = with_profile(Movie.query.filter_by(movie_id=movie_id), "movie.detail").one_or_none()
     if not movie:
         return jsonify({"error": {"code": "NOT_FOUND", "message": f"Movie {movie_id} not found"}}), 404
     return jsonify(_movie_to_dict(movie)), 200
@@ -181,6 +200,7 @@ def create_movie():
 
     db.session.add(movie)
     db.session.commit()
+    suggest_index.upsert_movie(movie)
     return jsonify(_movie_to_dict(movie)), 201
 
 
@@ -245,6 +265,7 @@ def update_movie(movie_id):
             movie.categories = []
     
     db.session.commit()
+    suggest_index.upsert_movie(movie)
     return jsonify(_movie_to_dict(movie)), 200
 
 
@@ -258,4 +279,5 @@ def delete_movie(movie_id):
     
     db.session.delete(movie)
     db.session.commit()
+    suggest_index.remove_movie(movie_id)
     return jsonify({"message": "Movie deleted successfully"}), 200
@@ -0,0 +1,88 @@
+from datetime import date, datetime, time, timedelta, timezone
+from flask import request, jsonify, current_app
+from ..services.revenue import revenue_series, revenue_by
+from ..json_provider import list_response
+
+
+def _bad_request(msg, details=None, code=400):
+    return jsonify({"error": {"code": "BAD_REQUEST", "message": msg, "details": details or {}}}), code
+
+
+def _parse_dt(v: str):
+    # "2025-10-01" or "2025-10-01T19:00:00Z"; naive values are UTC
+    try:
+        if v.endswith("Z"):
+            v = v[:-1] + "+00:00"
+        dt = datetime.fromisoformat(v)
+    except Exception:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _range(default_days: int):
+    """(from, to, error) from ?from=&to= (to exclusive); defaults to the last `default_days` days through today."""
+    from_raw, to_raw = request.args.get("from"), request.args.get("to")
+    end = _parse_dt(to_raw) if to_raw else datetime.combine(date.today() + timedelta(days=1), time.min, timezone.utc)
+    if end is None:
+        return None, None, "`to` must be ISO date or datetime"
+    start = _parse_dt(from_raw) if from_raw else end - timedelta(days=default_days)
+    if start is None:
+        return None, None, "`from` must be ISO date or datetime"
+    if start >= end:
+        return None, None, "`from` must be before `to`"
+    return start, end, None
+
+
+def get_revenue_report(_admin_user):
+    """GET /api/v1/admin/reports/revenue
+    Query params:
+      granularity (str)   - day (default) or hour
+      from/to     (ISO)   - showtime range, to exclusive (default: last 30 days; hourly: last day)
+      movie_id, auditorium_id (int) - optional filters
+    Reads only the rollup tables.
+    """
+    granularity = (request.args.get("granularity") or "day").lower()
+    if granularity not in ("day", "hour"):
+        return _bad_request("granularity must be 'day' or 'hour'")
+    start, end, error = _range(1 if granularity == "hour" else 30)
+    if error:
+        return _bad_request(error)
+    max_hourly_days = current_app.config.get("REPORTS_MAX_HOURLY_DAYS", 31)
+    if granularity == "hour" and end - start > timedelta(days=max_hourly_days):
+        return _bad_request(f"hourly reports cover at most {max_hourly_days} days; use granularity=day")
+
+    data, totals = revenue_series(
+        granularity, start, end,
+        movie_id=request.args.get("movie_id", type=int),
+        auditorium_id=request.args.get("auditorium_id", type=int),
+    )
+    fields = {"granularity": granularity, "from": start, "to": end, "totals": totals}
+    return list_response(data, **fields), 200
+
+
+def _breakdown(dimension):
+    start, end, error = _range(30)
+    if error:
+        return _bad_request(error)
+    limit = max(1, min(request.args.get("limit", default=20, type=int), 100))
+    data, totals = revenue_by(dimension, start.date(), end.date())
+    return jsonify({
+        "from": start.date(),
+        "to": end.date(),
+        "totals": totals,
+        "data": data[:limit],
+    }), 200
+
+
+def get_movie_report(_admin_user):
+    """GET /api/v1/admin/reports/movies?from=&to=&limit=
+    Revenue and attendance per movie over whole days, highest revenue first.
+    """
+    return _breakdown("movie")
+
+
+def get_auditorium_report(_admin_user):
+    """GET /api/v1/admin/reports/auditoriums?from=&to=&limit=
+    Revenue and attendance per auditorium over whole days, highest revenue first.
+    """
+    return _breakdown("auditorium")
@@ -0,0 +1,153 @@
+from flask import request, jsonify, current_app
+from sqlalchemy import asc, desc
+from sqlalchemy.exc import IntegrityError
+from .. import db
+from ..models.movie import Movie
+from ..models.reviews import Review
+from ..services.ratings import apply_rating_change
+from ..json_provider import list_response
+
+# helpers
+
+def _review_to_dict(r: Review):
+    return {
+        "review_id": r.review_id,
+        "movie_id": r.movie_id,
+        "user_id": r.user_id,
+        "rating": r.rating,
+        "comment": r.comment,
+        "created_at": r.created_at,
+    }
+
+def _bad_request(msg, details=None):
+    return jsonify({"error": {"code": "BAD_REQUEST", "message": msg, "details": details or {}}}), 400
+
+def _not_found(msg):
+    return jsonify({"error": {"code": "NOT_FOUND", "message": msg}}), 404
+
+def _parse_rating(raw):
+    if isinstance(raw, bool):
+        return None
+    try:
+        rating = int(raw)
+    except (TypeError, ValueError):
+        return None
+    return rating if 1 <= rating <= 5 else None
+
+# controllers
+
+def get_reviews(movie_id: int):
+    """
+    GET /api/v1/movies/<movie_id>/reviews
+    Query params:
+      limit   (int)  - default 20, max 100
+      offset  (int)  - default 0
+      sort    (str)  - created_at.desc (default), created_at.asc, rating.desc, rating.asc
+    """
+    try:
+        limit = min(max(int(request.args.get("limit", 20)), 1), 100)
+    except ValueError:
+        limit = 20
+    try:
+        offset = max(int(request.args.get("offset", 0)), 0)
+    except ValueError:
+        offset = 0
+
+    sort = (request.args.get("sort") or "created_at.desc").lower()
+    sort_map = {
+        "created_at.asc":  asc(Review.created_at),
+        "created_at.desc": desc(Review.created_at),
+        "rating.asc":      asc(Review.rating),
+        "rating.desc":     desc(Review.rating),
+    }
+    order_clause = sort_map.get(sort, desc(Review.created_at))
+
+    query = Review.query.filter(Review.movie_id == movie_id)
+    total = query.count()
+    rows = query.order_by(order_clause).offset(offset).limit(limit).all()
+
+    return list_response(rows, _review_to_dict, page={"limit": limit, "offset": offset, "total": total})
+
+
+def create_review(user, movie_id: int):
+    """
+    POST /api/v1/movies/<movie_id>/reviews
+    Body: { "rating": 1..5, "comment": "..." }
+    One review per user per movie; the rating summary is updated in the same transaction.
+    """
+    data = request.get_json(silent=True) or {}
+    rating = _parse_rating(data.get("rating"))
+    if rating is None:
+        return _bad_request("`rating` must be an integer between 1 and 5.")
+
+    if not db.session.query(Movie.movie_id).filter_by(movie_id=movie_id).first():
+        return _not_found(f"Movie {movie_id} not found")
+
+    review = Review(
+        user_id=user.user_id,
+        movie_id=movie_id,
+        rating=rating,
+        comment=data.get("comment"),
+    )
+    try:
+        db.session.add(review)
+        db.session.flush()
+        apply_rating_change(movie_id, new_rating=rating)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": {"code": "CONFLICT", "message": "You have already reviewed this movie"}}), 409
+
+    return jsonify(_review_to_dict(review)), 201
+
+
+def update_review(user, review_id):
+    """
+    PATCH /api/v1/reviews/<review_id>
+    Body: { "rating"?: 1..5, "comment"?: "..." }
+    """
+    review = Review.query.filter_by(review_id=review_id).first()
+    if not review or review.user_id != user.user_id:
+        return _not_found("Review not found")
+
+    data = request.get_json(silent=True) or {}
+    old_rating = review.rating
+
+    if "rating" in data:
+        rating = _parse_rating(data.get("rating"))
+        if rating is None:
+            return _bad_request("`rating` must be an integer between 1 and 5.")
+        review.rating = rating
+    if "comment" in data:
+        review.comment = data.get("comment")
+
+    try:
+        apply_rating_change(review.movie_id, old_rating=old_rating, new_rating=review.rating)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        current_app.logger.exception("Failed to update review %s", review_id)
+        return jsonify({"error": {"code": "SERVER_ERROR", "message": "Failed to update review"}}), 500
+
+    return jsonify(_review_to_dict(review)), 200
+
+
+def delete_review(user, review_id):
+    """
+    DELETE /api/v1/reviews/<review_id>
+    Authors can delete their own reviews; admins can delete any review.
+    """
+    review = Review.query.filter_by(review_id=review_id).first()
+    if not review or (review.user_id != user.user_id and not user.is_admin):
+        return _not_found("Review not found")
+
+    try:
+        apply_rating_change(review.movie_id, old_rating=review.rating)
+        db.session.delete(review)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        current_app.logger.exception("Failed to delete review %s", review_id)
+        return jsonify({"error": {"code": "SERVER_ERROR", "message": "Failed to delete review"}}), 500
+
+    return "", 204
@@ -6,6 +6,7 @@ from .. import db
 from ..models.showtimes import Showtime
 from ..models.movie import Movie
 from ..models.auditorium import Auditorium
+from ..json_provider import list_response
 
 # helpers
 def _bad_request(msg, details=None, code=400):
@@ -22,15 +23,58 @@ def _parse_dt(v: str):
 
 def _to_dict(s: Showtime):
     return {
-        "showtime_id": str(s.showtime_id),
+        "showtime_id": s.showtime_id,
         "movie_id": s.movie_id,
         "auditorium_id": s.auditorium_id,
-        "starts_at": s.starts_at.isoformat() if s.starts_at else None,
+        "starts_at": s.starts_at,
         "child_price_cents": s.child_price_cents,
         "adult_price_cents": s.adult_price_cents,
         "senior_price_cents": s.senior_price_cents,
     }
 
+def _int_arg(args, key, default=None):
+    try:
+        return int(args.get(key))
+    except (TypeError, ValueError):
+        return default
+
+def showtime_list_query(query, args):
+    """
+    Filters and sort of GET /api/v1/showtimes (see get_showtimes) from `args`,
+    the request's query parameters, applied to `query` (Showtime.query, or
+    select(Showtime) in the async app). Returns (query, order clause, limit,
+    offset); raises ValueError with the message for a malformed `from`/`to`.
+    """
+    # filters
+    movie_id = _int_arg(args, "movie_id")
+    auditorium_id = _int_arg(args, "auditorium_id")
+
+    from_raw = args.get("from")
+    to_raw = args.get("to")
+    dt_from = _parse_dt(from_raw) if from_raw else None
+    dt_to = _parse_dt(to_raw) if to_raw else None
+    if from_raw and not dt_from:
+        raise ValueError("`from` must be ISO datetime")
+    if to_raw and not dt_to:
+        raise ValueError("`to` must be ISO datetime")
+
+    limit = max(1, min(_int_arg(args, "limit", 20), 100))
+    offset = max(0, _int_arg(args, "offset", 0))
+
+    sort = (args.get("sort") or "starts_at.desc").lower()
+    order_clause = desc(Showtime.starts_at) if sort == "starts_at.desc" else asc(Showtime.starts_at)
+
+    if movie_id is not None:
+        query = query.filter(Showtime.movie_id == movie_id)
+    if auditorium_id is not None:
+        query = query.filter(Showtime.auditorium_id == auditorium_id)
+    if dt_from:
+        query = query.filter(Showtime.starts_at >= dt_from)
+    if dt_to:
+        query = query.filter(Showtime.starts_at < dt_to)
+
+    return query, order_clause, limit, offset
+
 # controllers
 def create_showtime():
     """
@@ -116,42 +160,12 @@ def get_showtimes():
       offset          (int)    default 0
       sort            (str)    created_at not present; use starts_at.asc/starts_at.desc (default desc)
     """
-    # filters
-    movie_id = request.args.get("movie_id", type=int)
-    auditorium_id = request.args.get("auditorium_id", type=int)
-
-    from_raw = request.args.get("from")
-    to_raw = request.args.get("to")
-    dt_from = _parse_dt(from_raw) if from_raw else None
-    dt_to = _parse_dt(to_raw) if to_raw else None
-    if from_raw and not dt_from:
-        return _bad_request("`from` must be ISO datetime")
-    if to_raw and not dt_to:
-        return _bad_request("`to` must be ISO datetime")
-
-    limit = request.args.get("limit", default=20, type=int)
-    offset = request.args.get("offset", default=0, type=int)
-    limit = max(1, min(limit, 100))
-    offset = max(0, offset)
-
-    sort = (request.args.get("sort") or "starts_at.desc").lower()
-    order_clause = desc(Showtime.starts_at) if sort == "starts_at.desc" else asc(Showtime.starts_at)
-
-    q = Showtime.query
-
-    if movie_id is not None:
-        q = q.filter(Showtime.movie_id == movie_id)
-    if auditorium_id is not None:
-        q = q.filter(Showtime.auditorium_id == auditorium_id)
-    if dt_from:
-        q = q.filter(Showtime.starts_at >= dt_from)
-    if dt_to:
-        q = q.filter(Showtime.starts_at < dt_to)
+    try:
+        q, order_clause, limit, offset = showtime_list_query(Showtime.query, request.args)
+    except ValueError as e:
+        return _bad_request(str(e))
 
     total = q.count()
     rows = q.order_by(order_clause).offset(offset).limit(limit).all()
 
-    return jsonify({
-        "data": [_to_dict(s) for s in rows],
-        "page": {"limit": limit, "offset": offset, "total": total}
-    })
+    return list_response(rows, _to_dict, page={"limit": limit, "offset": offset, "total": total})
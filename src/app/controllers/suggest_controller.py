@@ -0,0 +1,32 @@
+from flask import request, jsonify
+from ..services.suggest import suggest_index, KIND_ORDER
+
+
+def get_suggestions():
+    """
+    GET /api/v1/suggest
+    Query params:
+      q       (str)  - what the user has typed so far (prefix of any word of a name)
+      types   (str)  - comma-separated subset of: movie, person, auditorium (default all)
+      limit   (int)  - default 10, max 25
+    Served from the in-memory prefix index; never queries the database per keystroke.
+    """
+    q = (request.args.get("q") or "").strip()
+    try:
+        limit = min(max(int(request.args.get("limit", 10)), 1), 25)
+    except ValueError:
+        limit = 10
+
+    kinds = None
+    types = (request.args.get("types") or "").strip()
+    if types:
+        kinds = {t.strip().lower() for t in types.split(",") if t.strip()}
+        unknown = kinds - set(KIND_ORDER)
+        if unknown:
+            return jsonify({"error": {"code": "BAD_REQUEST",
+                                      "message": f"Unknown types: {', '.join(sorted(unknown))}",
+                                      "details": {"allowed": list(KIND_ORDER)}}}), 400
+
+    if not q:
+        return jsonify({"data": []}), 200
+    return jsonify({"data": suggest_index.suggest(q, limit, kinds)}), 200
@@ -1,15 +1,17 @@
 from flask import request, jsonify, current_app
 from datetime import datetime
-from ..services.email_service import send_password_changed_email
-from ..services.encryption import CardEncryption
+from ..services.email_service import queue_password_changed_email
+from ..services.encryption import get_card_encryption
 from sqlalchemy.exc import IntegrityError
 import re
-import jwt
 from datetime import datetime, timezone
 from .. import db
+from ..middleware.auth import resolve_principal, auth_error_response
+from ..services.user_cache import invalidate_user
+from ..services.password_hashing import password_hasher
 from ..models.users import User
 from ..models.billing_info import BillingInfo
-from ..services.email_service import send_password_changed_email
+from ..models.loaders import with_profile
 
 STATE_RE = re.compile(r"^[A-Z]{2}$")
 ZIP5_RE  = re.compile(r"^\d{5}$")
@@ -17,31 +19,21 @@ MMYY_RE  = re.compile(r"^(0[1-9]|1[0-2])/\d{2}$")
 CARD16_RE = re.compile(r"^\d{16}$")
 
 def get_user_from_token():
-    tok = request.cookies.get(current_app.config["JWT_COOKIE_NAME"])
-    if not tok:
-        auth = request.headers.get("Authorization", "")
-        if auth.startswith("Bearer "):
-            tok = auth.split(" ", 1)[1]
-    if not tok:
-        return None, (jsonify({"error": "Not authenticated"}), 401)
-    try:
-        payload = jwt.decode(tok, current_app.config["JWT_SECRET_KEY"], algorithms=["HS256"])
-        user = User.query.filter_by(user_id=payload["user_id"]).first()
-        if not user:
-            return None, (jsonify({"error": "User not found"}), 404)
-        if not user.is_verified:
-            return None, (jsonify({"error": "Email is not verified"}), 401)
-        return user, None
-    except jwt.ExpiredSignatureError:
-        return None, (jsonify({"error": "Token has expired"}), 401)
-    except jwt.InvalidTokenError:
-        return None, (jsonify({"error": "Invalid token"}), 401)
-    except Exception as e:
-        return None, (jsonify({"error": f"Authentication failed: {str(e)}"}), 401)
+    """Resolve the request's verified principal (see middleware.auth.resolve_principal)."""
+    principal, error = resolve_principal()
+    if error:
+        return None, auth_error_response(error)
+    if not principal.is_verified:
+        return None, (jsonify({"error": "Email is not verified"}), 401)
+    return principal, None
+
+def _load_user(user_id):
+    """Full User row plus cards (user.profile) for endpoints that read or edit the profile."""
+    return with_profile(User.query.filter_by(user_id=user_id), "user.profile").first()
 
 def _user_to_dict(user: User, include_cards: bool = False):
     data = {
-        "user_id": str(user.user_id),
+        "user_id": user.user_id,
         "email": user.email,
         "first_name": user.first_name,
         "last_name": user.last_name,
@@ -58,50 +50,41 @@ def _user_to_dict(user: User, include_cards: bool = False):
         },
     }
     if include_cards:
-        cards = BillingInfo.query.filter_by(user_id=user.user_id).order_by(BillingInfo.created_at.desc()).all()
-        data["payment_cards"] = [_card_to_public_dict(c) for c in cards]
+        data["payment_cards"] = [_card_to_public_dict(c) for c in user.billing_infos]
     return data
 
 def _card_to_public_dict(card: BillingInfo):
     """
-    Convert BillingInfo to public dict, decrypting sensitive fields.
-    Security: Only last 4 digits of card number exposed; full number and expiry are encrypted in DB.
+    Convert BillingInfo to public dict from the plaintext display columns; nothing is decrypted.
+    Rows written before those columns existed show masked until the backfill_card_display_fields
+    job has filled them.
+    Security: Only last 4 digits and expiry are exposed; number, expiry and cardholder name stay
+    encrypted in DB and the name is only returned by the reveal endpoint.
     """
-    try:
-        encryptor = CardEncryption()
-        # Decrypt card number and expiry if they are encrypted
-        card_number = encryptor.decrypt(card.card_number) if card.card_number else ""
-        card_last4 = card_number[-4:] if card_number else "0000"
-        # Decrypt cardholder name and expiry
-        cardholder_name = encryptor.decrypt(card.cardholder_name) if card.cardholder_name else ""
-        card_exp = encryptor.decrypt(card.card_exp) if card.card_exp else ""
-    except Exception as e:
-        current_app.logger.warning(f"Failed to decrypt card data: {e}")
-        card_last4 = "XXXX"
-        cardholder_name = "••••••••"
-        card_exp = "••/••"
-    
     return {
-        "billing_info_id": str(card.billing_info_id),
+        "billing_info_id": card.billing_info_id,
         "card_type": card.card_type,
-        "cardholder_name": cardholder_name,  # Decrypted
-        "card_last4": card_last4,
-        "card_exp": card_exp,  # Decrypted
+        "cardholder_name": "••••••••",  # see reveal_user_card
+        "card_last4": card.card_last4 or "XXXX",
+        "card_exp": card.card_exp_display or "••/••",
         "billing_address": {
             "street": card.billing_street,
             "city": card.billing_city,
             "state": card.billing_state,
             "zip_code": card.billing_zip_code,
         },
-        "created_at": card.created_at.isoformat() if card.created_at else None,
+        "created_at": card.created_at,
     }
 
 # get/ put
 
 def get_user_profile():
-    user, error = get_user_from_token()
+    principal, error = get_user_from_token()
     if error:
         return error
+    user = _load_user(principal.user_id)
+    if not user:
+        return jsonify({"error": "User not found"}), 404
     return jsonify(_user_to_dict(user, include_cards=True)), 200
 
 def update_user_profile():
@@ -109,9 +92,12 @@ def update_user_profile():
     Regular users can edit: first/last name, phone_number (10 digits), address, is_email_list, password
     Email change is admin-only (kept as-is).
     """
-    user, error = get_user_from_token()
+    principal, error = get_user_from_token()
     if error:
         return error
+    user = _load_user(principal.user_id)
+    if not user:
+        return jsonify({"error": "User not found"}), 404
 
     data = request.get_json(silent=True) or {}
 
@@ -154,16 +140,10 @@ def update_user_profile():
 
     # Password (inline)
     if "password" in data and data["password"]:
-        from werkzeug.security import generate_password_hash
-        user.password_hash = generate_password_hash(data["password"])
-        # notify user about password change (do not include the password)
-        try:
-            time_str = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
-            ip = request.remote_addr or "unknown"
-            ua = request.headers.get("User-Agent")
-            send_password_changed_email(user.email, time_str, ip, ua)
-        except Exception as e:
-            current_app.logger.error(f"Failed to send password-changed email: {e}")
+        user.password_hash = password_hasher.hash(data["password"])
+        password_changed = True
+    else:
+        password_changed = False
 
     # Email change (admin-only, unchanged from your rules)
     if "email" in data and data["email"] is not None:
@@ -177,11 +157,20 @@ def update_user_profile():
             return jsonify({"error": {"code": "CONFLICT", "message": "Email already in use"}}), 409
         user.email = new_email
 
+    if password_changed:
+        # notify user about password change (do not include the password); queued in the
+        # same transaction so it is only sent if the update commits
+        time_str = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+        ip = request.remote_addr or "unknown"
+        ua = request.headers.get("User-Agent")
+        queue_password_changed_email(user.email, time_str, ip, ua)
+
     try:
         db.session.commit()
     except IntegrityError as e:
         db.session.rollback()
         return jsonify({"error": {"code": "CONFLICT", "message": str(e)}}), 409
+    invalidate_user(user.user_id)
 
     return jsonify(_user_to_dict(user, include_cards=True)), 200
 
@@ -247,7 +236,7 @@ def add_user_card():
 
     # Encrypt sensitive fields
     try:
-        encryptor = CardEncryption()
+        encryptor = get_card_encryption()
         encrypted_card_number = encryptor.encrypt(num)
         encrypted_card_exp = encryptor.encrypt(exp)
         encrypted_cardholder_name = encryptor.encrypt(str(data["cardholder_name"]))
@@ -268,6 +257,7 @@ def add_user_card():
         billing_state=state,
         billing_zip_code=zip5,
     )
+    card.set_display_fields(num, exp)
 
     db.session.add(card)
     try:
@@ -296,7 +286,7 @@ def update_user_card(card_id):
     # Encrypt cardholder name if updating
     if "cardholder_name" in data and data["cardholder_name"]:
         try:
-            encryptor = CardEncryption()
+            encryptor = get_card_encryption()
             card.cardholder_name = encryptor.encrypt(str(data["cardholder_name"]))
         except Exception as e:
             current_app.logger.error(f"Encryption failed: {e}")
@@ -308,8 +298,9 @@ def update_user_card(card_id):
         if not MMYY_RE.match(exp):
             return jsonify({"error": {"code": "BAD_REQUEST", "message": "card_exp must be MM/YY"}}), 400
         try:
-            encryptor = CardEncryption()
+            encryptor = get_card_encryption()
             card.card_exp = encryptor.encrypt(exp)
+            card.set_display_fields(card_exp=exp)
         except Exception as e:
             current_app.logger.error(f"Encryption failed: {e}")
             return jsonify({"error": {"code": "INTERNAL_SERVER_ERROR", "message": "Failed to update card"}}), 500
@@ -352,6 +343,34 @@ def update_user_card(card_id):
 
     return jsonify(_card_to_public_dict(card)), 200
 
+def reveal_user_card(card_id):
+    """
+    Decrypt the cardholder name and expiry of one card for its owner.
+    Security: The only endpoint that decrypts card data; the full number is never returned.
+    """
+    user, error = get_user_from_token()
+    if error:
+        return error
+
+    card = BillingInfo.query.get(card_id)
+    if not card or card.user_id != user.user_id:
+        return jsonify({"error": {"code": "NOT_FOUND", "message": "Card not found"}}), 404
+
+    try:
+        encryptor = get_card_encryption()
+        cardholder_name = encryptor.decrypt(card.cardholder_name) if card.cardholder_name else ""
+        card_exp = encryptor.decrypt(card.card_exp) if card.card_exp else ""
+    except Exception as e:
+        current_app.logger.error(f"Failed to decrypt card data: {e}")
+        return jsonify({"error": {"code": "INTERNAL_SERVER_ERROR", "message": "Failed to read card"}}), 500
+
+    return jsonify({
+        "billing_info_id": card.billing_info_id,
+        "cardholder_name": cardholder_name,
+        "card_last4": card.card_last4,
+        "card_exp": card_exp,
+    }), 200
+
 def delete_user_card(card_id):
     user, error = get_user_from_token()
     if error:
@@ -0,0 +1,4 @@
+"""Background jobs. `python -m src.app.jobs --help` lists, runs and schedules them (see framework.py).
+
+The individual scripts here can still be run directly, as before.
+"""
@@ -0,0 +1,117 @@
+"""
+python -m src.app.jobs list
+python -m src.app.jobs run <job> [param=value ...]
+python -m src.app.jobs schedule [--only job,job]
+python -m src.app.jobs history [job] [--limit 20]
+
+Builds the app with create_job_app(): config, database and services, without
+the HTTP layer.
+"""
+import argparse
+import signal
+import socket
+import sys
+
+from .. import create_job_app, db
+from ..models.job_runs import JobRun
+from .framework import JOBS, Scheduler, run_job
+from . import tasks  # noqa: F401  (registers the jobs)
+
+EX_TEMPFAIL = 75
+
+
+def _coerce(raw: str, default):
+    if isinstance(default, bool):
+        return raw.lower() in ("1", "true", "yes", "on")
+    if isinstance(default, int):
+        return int(raw)
+    if isinstance(default, float):
+        return float(raw)
+    return raw
+
+
+def _params(job, pairs):
+    accepted = job.params
+    params = {}
+    for pair in pairs:
+        key, sep, raw = pair.partition("=")
+        if not sep or key not in accepted:
+            raise SystemExit(f"{job.name} accepts: {', '.join(f'{k}={v!r}' for k, v in accepted.items()) or 'nothing'}")
+        params[key] = _coerce(raw, accepted[key])
+    return params
+
+
+def cmd_list(app, args):
+    for job in JOBS.values():
+        when = job.cron.expr if job.cron else "on demand"
+        print(f"{job.name:26} {when:14} {job.description}")
+        if job.params:
+            print(f"{'':26} {'':14} params: {', '.join(f'{k}={v!r}' for k, v in job.params.items())}")
+
+
+def cmd_run(app, args):
+    if args.job not in JOBS:
+        raise SystemExit(f"unknown job {args.job!r}; see `list`")
+    run = run_job(app, args.job, trigger="MANUAL", **_params(JOBS[args.job], args.params))
+    if run["status"] == "SKIPPED":
+        print(f"{args.job}: skipped ({run['detail']})")
+        return EX_TEMPFAIL
+    if run["status"] == "FAILED":
+        print(run["detail"], file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_schedule(app, args):
+    disabled = set(app.config.get("JOBS_DISABLED", []))
+    only = set(args.only.split(",")) if args.only else None
+    jobs = [j for j in JOBS.values() if j.name not in disabled and (only is None or j.name in only)]
+    scheduler = Scheduler(app, jobs, max_concurrent=app.config.get("JOBS_MAX_CONCURRENT", 4))
+
+    def _stop(signum, frame):
+        print("stopping scheduler (waiting for running jobs)...", flush=True)
+        scheduler.stop()
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    scheduler.run_forever()
+    return 0
+
+
+def cmd_history(app, args):
+    with app.app_context():
+        query = JobRun.query.order_by(JobRun.started_at.desc())
+        if args.job:
+            query = query.filter(JobRun.job_name == args.job)
+        for r in query.limit(args.limit):
+            print(f"{r.started_at:%Y-%m-%d %H:%M:%S} {r.job_name:26} {r.status:8} {r.trigger:9} "
+                  f"{r.duration_ms:>8} ms rows={r.rows} batches={r.batches} {r.node}"
+                  + (f"  {r.detail.splitlines()[-1][:120]}" if r.detail else ""))
+        db.session.remove()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.app.jobs", description="Run and schedule background jobs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="show jobs and schedules").set_defaults(fn=cmd_list)
+    p = sub.add_parser("run", help="run one job now (skips if it is already running anywhere)")
+    p.add_argument("job")
+    p.add_argument("params", nargs="*", metavar="param=value")
+    p.set_defaults(fn=cmd_run)
+    p = sub.add_parser("schedule", help="run scheduled jobs at their cron times until stopped")
+    p.add_argument("--only", help="comma-separated job names")
+    p.set_defaults(fn=cmd_schedule)
+    p = sub.add_parser("history", help="recent runs from job_runs")
+    p.add_argument("job", nargs="?")
+    p.add_argument("--limit", type=int, default=20)
+    p.set_defaults(fn=cmd_history)
+    args = parser.parse_args(argv)
+
+    app = create_job_app()
+    # flask_mail opens smtplib connections without a timeout (campaign sends)
+    socket.setdefaulttimeout(app.config["EMAIL_SMTP_TIMEOUT_SECONDS"])
+    return args.fn(app, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
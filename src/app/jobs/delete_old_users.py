@@ -1,50 +1,126 @@
+# docker exec -it movie-booking-be-app-1 poetry run python src/app/jobs/delete_old_users.py --dry-run
+#
+# Deletes non-admin users created more than --days ago (except PROTECTED_USER_EMAIL), in
+# chunks of --chunk-size, each chunk its own short transaction:
+#   SELECT user_id ... ORDER BY user_id LIMIT n FOR UPDATE SKIP LOCKED   (keyset on user_id)
+#   UPDATE movie_rating_summary ... FROM (their reviews grouped by movie)
+#   DELETE FROM users WHERE user_id IN (...) RETURNING user_id
+# Billing info, bookings, reviews, tokens and holds go with the user via ON DELETE CASCADE.
+# The rating summary is the one aggregate a cascade would leave stale, hence the UPDATE.
+# Revenue rollups keep the sales of deleted users; the money was still taken.
+
 import sys
 import os
+import argparse
+import time
 from datetime import datetime, timedelta, timezone
 
 sys.path.append('/app')
 
-from wsgi import app
+from sqlalchemy import case, func, select
+
 from src.app import db
 from src.app.models.users import User
+from src.app.models.reviews import Review
+from src.app.models.movie_rating_summary import MovieRatingSummary
+from src.app.services.user_cache import invalidate_users
 
-def delete_old_users():
-    PROTECTED_USER_EMAIL = os.getenv("PROTECTED_USER_EMAIL", "protected@example.com")
-    DAYS_THRESHOLD = 3
 
-    with app.app_context():
-        all_users = User.query.filter(User.is_admin == False).all()
-        print(f"found {len(all_users)} non-admin users.")
+def _candidates(threshold_date, protected_emails):
+    users = User.__table__
+    return (
+        users.c.is_admin.is_(False),
+        users.c.created_at < threshold_date,
+        users.c.email.notin_(protected_emails),
+    )
+
 
-        now = datetime.now(timezone.utc)
-        threshold_date = now - timedelta(days=DAYS_THRESHOLD) + timedelta(minutes=5)
-        
-        users_to_delete = []
+def _subtract_reviews(conn, user_ids):
+    """Take the reviews about to be cascade-deleted out of movie_rating_summary."""
+    reviews, summary = Review.__table__, MovieRatingSummary.__table__
+    buckets = {f"count_{r}": func.sum(case((reviews.c.rating == r, 1), else_=0)) for r in range(1, 6)}
+    removed = (
+        select(
+            reviews.c.movie_id,
+            func.count().label("rating_count"),
+            func.sum(reviews.c.rating).label("rating_sum"),
+            *[expr.label(name) for name, expr in buckets.items()],
+        )
+        .where(reviews.c.user_id.in_(user_ids))
+        .group_by(reviews.c.movie_id)
+        .subquery()
+    )
+    columns = ["rating_count", "rating_sum", *buckets]
+    return conn.execute(
+        summary.update()
+        .where(summary.c.movie_id == removed.c.movie_id)
+        .values({c: summary.c[c] - removed.c[c] for c in columns})
+    ).rowcount
 
-        for user in all_users:
-            is_old_enough = user.created_at < threshold_date
-            is_not_protected = user.email != PROTECTED_USER_EMAIL
-            
-            print(f"{user.email} | Created: {user.created_at} | Older than threshold: {is_old_enough}")
 
-            if is_old_enough and is_not_protected:
-                users_to_delete.append(user)
+def delete_old_users(days: float = 3, chunk_size: int = 1000, dry_run: bool = False, protected_emails=None):
+    """Delete non-admin users created more than `days` ago; returns how many (or would be, with dry_run)."""
+    protected_emails = protected_emails or [os.getenv("PROTECTED_USER_EMAIL", "protected@example.com")]
+    users = User.__table__
 
-        if not users_to_delete:
-            print("no users matched the deletion criteria.")
-            return
+    now = datetime.now(timezone.utc)
+    threshold_date = now - timedelta(days=days) + timedelta(minutes=5)
+    where = _candidates(threshold_date, protected_emails)
 
-        print(f"deleting {len(users_to_delete)} users")
-        for user in users_to_delete:
-            print(f"Deleting user: {user.email}")
-            db.session.delete(user)
+    if dry_run:
+        with db.engine.connect() as conn:
+            count, oldest, newest = conn.execute(
+                select(func.count(), func.min(users.c.created_at), func.max(users.c.created_at)).where(*where)
+            ).one()
+        print(f"dry run: {count} users created before {threshold_date.isoformat()} would be deleted "
+              f"(created {oldest} .. {newest}); protected: {', '.join(protected_emails)}")
+        return count
 
+    started = time.perf_counter()
+    deleted = 0
+    after = None
+    while True:
+        chunk_started = time.perf_counter()
+        page = select(users.c.user_id).where(*where)
+        if after is not None:
+            page = page.where(users.c.user_id > after)
+        page = page.order_by(users.c.user_id).limit(chunk_size).with_for_update(skip_locked=True)
         try:
-            db.session.commit()
-            print("Successfully deleted users.")
+            with db.engine.begin() as conn:
+                ids = conn.execute(page).scalars().all()
+                if not ids:
+                    break
+                summaries = _subtract_reviews(conn, ids)
+                deleted_ids = conn.execute(
+                    users.delete().where(users.c.user_id.in_(ids)).returning(users.c.user_id)
+                ).scalars().all()
         except Exception as e:
-            db.session.rollback()
-            print(f"Failed to delete users: {e}")
+            print(f"Failed to delete chunk after {after}: {e}")
+            raise
+        after = ids[-1]
+        deleted += len(deleted_ids)
+        # only reaches this process's cache; web workers drop theirs on TTL expiry
+        invalidate_users(deleted_ids)
+        print(f"deleted {len(deleted_ids)} users ({summaries} rating summaries adjusted) "
+              f"in {(time.perf_counter() - chunk_started) * 1000:.0f} ms; total {deleted}")
+
+    if not deleted:
+        print("no users matched the deletion criteria.")
+    else:
+        print(f"Successfully deleted {deleted} users in {time.perf_counter() - started:.1f}s.")
+    return deleted
+
 
 if __name__ == "__main__":
-    delete_old_users()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Delete non-admin users older than --days")
+    parser.add_argument("--days", type=float, default=3)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="only count the users that would be deleted")
+    parser.add_argument("--protect", action="append", default=None, metavar="EMAIL",
+                        help="email to keep (repeatable; default PROTECTED_USER_EMAIL)")
+    args = parser.parse_args()
+
+    from wsgi import app
+    with app.app_context():
+        delete_old_users(days=args.days, chunk_size=args.chunk_size, dry_run=args.dry_run,
+                         protected_emails=args.protect)
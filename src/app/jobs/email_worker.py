@@ -0,0 +1,41 @@
+# docker exec -it movie-booking-be-app-1 poetry run python src/app/jobs/email_worker.py
+# Long-running: drains email_outbox until SIGTERM/SIGINT. Run as many copies as needed;
+# rows are claimed with SKIP LOCKED so workers never send the same email twice.
+
+import sys, os, signal, socket, time
+
+sys.path.append('/app')
+
+from wsgi import app
+from src.app.services.email_outbox import outbox_workers
+
+PURGE_EVERY_SECONDS = 3600
+
+
+def main():
+    # flask_mail opens smtplib connections without a timeout; never let a hung server pin a worker
+    socket.setdefaulttimeout(app.config["EMAIL_SMTP_TIMEOUT_SECONDS"])
+
+    stopping = []
+    def _stop(signum, frame):
+        stopping.append(signum)
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    outbox_workers.start(app)
+    print(f"email worker started with {outbox_workers.workers} threads")
+
+    next_purge = 0.0
+    while not stopping:
+        if time.monotonic() >= next_purge:
+            next_purge = time.monotonic() + PURGE_EVERY_SECONDS
+            with app.app_context():
+                print(f"Purged {outbox_workers.purge_sent()} sent emails.")
+        time.sleep(1)
+
+    print("stopping email worker...")
+    outbox_workers.stop(timeout=app.config["EMAIL_SMTP_TIMEOUT_SECONDS"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""Scheduling, single-runner locking and run metrics for the jobs in src/app/jobs.
+
+A job is a plain function registered with `@job(name, schedule="*/5 * * * *")`.
+It runs inside an app context and receives a `JobContext`, which counts rows
+and batches for the run. `Scheduler` runs every scheduled job in-process at
+its cron times (5 fields, UTC). Any number of nodes can run a scheduler: each
+run first takes a Postgres advisory lock named after the job
+(`pg_try_advisory_lock`, held on its own connection for the whole run), so
+exactly one node runs it and the others record a SKIPPED run. The same lock
+keeps a manual `python -m src.app.jobs run <name>` from overlapping a
+scheduled run. With DB_POOLER_MODE=transaction the lock is
+`pg_try_advisory_xact_lock` instead, in a transaction kept open for the run.
+On databases without advisory locks (SQLite in development)
+the lock is only process-local.
+
+Every attempt is written to `job_runs`, with node, trigger, status, duration,
+rows and batches.
+"""
+import hashlib
+import inspect
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import select, text
+
+from .. import db
+from ..models.job_runs import JobRun
+
+log = logging.getLogger(__name__)
+
+NODE = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _now_utc():
+    return datetime.now(timezone.utc)
+
+
+# cron expressions
+
+_FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 6))
+_ALIASES = {"@hourly": "0 * * * *", "@daily": "0 0 * * *", "@weekly": "0 0 * * 0", "@monthly": "0 0 1 * *"}
+
+
+class Cron:
+    """
+    Standard 5-field cron: minute hour day-of-month month day-of-week (0 = Sunday),
+    each `*`, `n`, `a-b`, `*/s`, `a-b/s` or a comma list of those. As in cron, when
+    both day fields are restricted a time matches if either one does.
+    """
+
+    def __init__(self, expr: str):
+        self.expr = expr
+        parts = _ALIASES.get(expr.strip(), expr).split()
+        if len(parts) != 5:
+            raise ValueError(f"cron expression needs 5 fields: {expr!r}")
+        self.sets = {}
+        for part, (name, lo, hi) in zip(parts, _FIELDS):
+            self.sets[name] = self._parse(part, lo, hi, name)
+        if 7 in self.sets["weekday"]:
+            self.sets["weekday"].add(0)
+        self.day_any = parts[2] == "*"
+        self.weekday_any = parts[4] == "*"
+
+    @staticmethod
+    def _parse(part, lo, hi, name):
+        values = set()
+        for item in part.split(","):
+            rng, _, step = item.partition("/")
+            step = int(step) if step else 1
+            if rng == "*":
+                start, end = lo, hi
+            elif "-" in rng:
+                start, end = (int(v) for v in rng.split("-", 1))
+            else:
+                start = end = int(rng)
+            top = 7 if name == "weekday" else hi
+            if start < lo or end > top or start > end or step < 1:
+                raise ValueError(f"bad cron {name} field: {part!r}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, dt: datetime) -> bool:
+        day_ok = dt.day in self.sets["day"]
+        weekday_ok = (dt.isoweekday() % 7) in self.sets["weekday"]
+        if self.day_any or self.weekday_any:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, after: datetime) -> datetime:
+        """First matching minute strictly after `after` (UTC)."""
+        dt = after.astimezone(timezone.utc).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+        while dt < limit:
+            if dt.month not in self.sets["month"]:
+                dt = (dt.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(dt):
+                dt = dt.replace(hour=0, minute=0) + timedelta(days=1)
+            elif dt.hour not in self.sets["hour"]:
+                dt = dt.replace(minute=0) + timedelta(hours=1)
+            elif dt.minute not in self.sets["minute"]:
+                dt += timedelta(minutes=1)
+            else:
+                return dt
+        raise ValueError(f"cron expression never matches: {self.expr!r}")
+
+    def __repr__(self):
+        return f"Cron({self.expr!r})"
+
+
+# registry
+
+class Job:
+    def __init__(self, name: str, fn, schedule: str = None, description: str = None):
+        self.name = name
+        self.fn = fn
+        self.cron = Cron(schedule) if schedule else None
+        self.description = description or (inspect.getdoc(fn) or "").split("\n")[0]
+
+    @property
+    def params(self):
+        """Keyword arguments the job accepts (besides ctx), with their defaults."""
+        return {
+            n: p.default for n, p in inspect.signature(self.fn).parameters.items()
+            if n != "ctx" and p.default is not inspect.Parameter.empty
+        }
+
+
+JOBS = {}
+
+
+def job(name: str, schedule: str = None, description: str = None):
+    """Register `fn(ctx, **params)` as a job; without a schedule it only runs on demand."""
+    def register(fn):
+        if name in JOBS:
+            raise ValueError(f"duplicate job name {name!r}")
+        JOBS[name] = Job(name, fn, schedule, description)
+        return fn
+    return register
+
+
+# run context and batching helpers
+
+class JobContext:
+    def __init__(self, job: Job, trigger: str):
+        self.job = job
+        self.trigger = trigger
+        self.rows = 0
+        self.batches = 0
+        self.started = time.perf_counter()
+
+    def add(self, rows: int = 0, batches: int = 1):
+        self.rows += rows
+        self.batches += batches
+
+    def log(self, message: str):
+        elapsed = time.perf_counter() - self.started
+        print(f"[{self.job.name} +{elapsed:.1f}s] {message}", flush=True)
+
+    def batched_delete(self, table, *where, key=None, batch_size: int = 5000) -> int:
+        """
+        DELETE FROM table WHERE key IN (SELECT key ... WHERE <where> LIMIT batch_size),
+        repeated until a batch comes back short; each batch is its own transaction.
+        Returns the rows deleted.
+        """
+        key = key if key is not None else list(table.primary_key.columns)[0]
+        victims = select(key).where(*where).limit(batch_size)
+        total = 0
+        while True:
+            t = time.perf_counter()
+            with db.engine.begin() as conn:
+                n = conn.execute(table.delete().where(key.in_(victims))).rowcount
+            total += n
+            self.add(n)
+            if n:
+                self.log(f"deleted {n} from {table.name} in {(time.perf_counter() - t) * 1000:.0f} ms")
+            if n < batch_size:
+                return total
+
+    def keyset_batches(self, key, *where, batch_size: int = 1000):
+        """
+        Yield lists of `key` values matching `where`, in key order, batch_size at a
+        time. Each page is a fresh short query (no long-lived cursor), resuming
+        after the last key of the previous page.
+        """
+        after = None
+        while True:
+            query = select(key).where(*where)
+            if after is not None:
+                query = query.where(key > after)
+            with db.engine.connect() as conn:
+                keys = conn.execute(query.order_by(key).limit(batch_size)).scalars().all()
+            if not keys:
+                return
+            yield keys
+            self.batches += 1
+            after = keys[-1]
+
+
+# single-runner lock
+
+_local_locks = {}
+_local_locks_guard = threading.Lock()
+
+
+def advisory_key(name: str) -> int:
+    """Stable signed 64-bit lock id for a job name (same on every node)."""
+    return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), "big", signed=True)
+
+
+class JobLock:
+    """Held for the duration of one run; `acquired` is False if another runner has the job."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.acquired = False
+        self._conn = None
+        self._local = None
+        self._xact = current_app.config.get("DB_POOLER_MODE") == "transaction"
+
+    def __enter__(self):
+        with _local_locks_guard:
+            self._local = _local_locks.setdefault(self.name, threading.Lock())
+        if not self._local.acquire(blocking=False):
+            return self
+        if db.engine.dialect.name != "postgresql":
+            self.acquired = True
+            return self
+        conn = db.engine.connect()
+        try:
+            if self._xact:
+                # behind a transaction-mode pooler a session lock could outlive us on a server
+                # connection someone else gets; hold a transaction (and its lock) open instead
+                conn.execute(text("SET LOCAL idle_in_transaction_session_timeout = 0"))
+                got = conn.execute(text("SELECT pg_try_advisory_xact_lock(:k)"),
+                                   {"k": advisory_key(self.name)}).scalar()
+            else:
+                got = conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": advisory_key(self.name)}).scalar()
+                conn.commit()
+        except Exception:
+            conn.close()
+            self._local.release()
+            raise
+        if got:
+            self._conn = conn
+            self.acquired = True
+        else:
+            conn.close()
+            self._local.release()
+        return self
+
+    def __exit__(self, *exc):
+        if not self.acquired:
+            return False
+        try:
+            if self._conn is not None:
+                try:
+                    if self._xact:
+                        self._conn.rollback()
+                    else:
+                        self._conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": advisory_key(self.name)})
+                        self._conn.commit()
+                finally:
+                    # closing returns the connection to the pool; a dead session drops the lock anyway
+                    self._conn.close()
+        finally:
+            self._local.release()
+        return False
+
+
+# running
+
+def _record(job: Job, trigger: str, status: str, started_at: datetime, ctx: JobContext = None, detail=None):
+    values = {
+        "job_name": job.name, "node": NODE, "trigger": trigger, "status": status, "started_at": started_at,
+        "duration_ms": int((time.perf_counter() - ctx.started) * 1000) if ctx else 0,
+        "rows": ctx.rows if ctx else 0, "batches": ctx.batches if ctx else 0,
+        "detail": (str(detail)[-2000:] if detail is not None else None),
+    }
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(JobRun.__table__.insert().values(**values))
+    except Exception as e:
+        log.warning("could not record run of %s: %r", job.name, e)
+    return values
+
+
+def run_job(app, name: str, trigger: str = "MANUAL", **params) -> dict:
+    """Run one job now, under its lock. Returns the recorded run (status OK / FAILED / SKIPPED)."""
+    job = JOBS[name]
+    with app.app_context():
+        started_at = _now_utc()
+        with JobLock(name) as lock:
+            if not lock.acquired:
+                return _record(job, trigger, "SKIPPED", started_at, detail="already running on another node")
+            ctx = JobContext(job, trigger)
+            try:
+                result = job.fn(ctx, **params)
+            except Exception as e:
+                db.session.rollback()
+                ctx.log(f"failed: {e!r}")
+                return _record(job, trigger, "FAILED", started_at, ctx, traceback.format_exc())
+            finally:
+                db.session.remove()
+            run = _record(job, trigger, "OK", started_at, ctx, result)
+        ctx.log(f"done in {run['duration_ms']} ms: rows={ctx.rows} batches={ctx.batches}"
+                + (f" ({result})" if result is not None else ""))
+        return run
+
+
+class Scheduler:
+    """Runs every scheduled job at its cron times; each run on a worker thread."""
+
+    def __init__(self, app, jobs=None, max_concurrent: int = 4, tick_seconds: float = 30.0):
+        self.app = app
+        self.jobs = [j for j in (jobs or JOBS.values()) if j.cron is not None]
+        self.tick_seconds = tick_seconds
+        self._pool = ThreadPoolExecutor(max_workers=max(max_concurrent, 1), thread_name_prefix="job")
+        self._running = set()     # names running on this node
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _launch(self, job: Job):
+        with self._lock:
+            if job.name in self._running:
+                log.warning("%s still running; skipping this slot", job.name)
+                return
+            self._running.add(job.name)
+
+        def _run():
+            try:
+                run_job(self.app, job.name, trigger="SCHEDULE")
+            finally:
+                with self._lock:
+                    self._running.discard(job.name)
+
+        self._pool.submit(_run)
+
+    def run_forever(self):
+        now = _now_utc()
+        due = {j.name: j.cron.next_after(now) for j in self.jobs}
+        for j in self.jobs:
+            print(f"scheduled {j.name} ({j.cron.expr}); next at {due[j.name].isoformat()}", flush=True)
+        while not self._stop.is_set():
+            now = _now_utc()
+            for j in self.jobs:
+                if due[j.name] <= now:
+                    self._launch(j)
+                    due[j.name] = j.cron.next_after(now)
+            wait = min([(d - _now_utc()).total_seconds() for d in due.values()] + [self.tick_seconds])
+            self._stop.wait(max(wait, 0.5))
+        self._pool.shutdown(wait=True)
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,16 @@
+# docker exec -it movie-booking-be-app-1 poetry run python src/app/jobs/purge_codes.py
+
+import sys, os
+
+sys.path.append('/app')
+
+from wsgi import app
+from src.app.services.codes import purge_codes
+
+
+if __name__ == "__main__":
+    with app.app_context():
+        batch_size = int(os.getenv("CODE_PURGE_BATCH_SIZE", 5000))
+        deleted = purge_codes(batch_size)
+        for table, count in deleted.items():
+            print(f"Purged {count} used/expired rows from {table}.")
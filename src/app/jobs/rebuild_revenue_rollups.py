@@ -0,0 +1,25 @@
+# docker exec -it movie-booking-be-app-1 poetry run python src/app/jobs/rebuild_revenue_rollups.py --from 2026-01-01
+#
+# Recomputes revenue_hourly / revenue_daily from bookings + tickets for whole UTC days
+# [--from, --to). Without arguments: every day that still has showtimes. Safe to re-run;
+# live updates keep flowing through services.revenue.apply_booking_status_change.
+
+import sys, argparse
+from datetime import date
+
+sys.path.append('/app')
+
+from wsgi import app
+from src.app.services.revenue import rebuild_rollups
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill / rebuild the revenue rollup tables")
+    parser.add_argument("--from", dest="start", type=date.fromisoformat, default=None, help="first day (UTC)")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, default=None, help="day after the last one")
+    parser.add_argument("--days-per-batch", type=int, default=7)
+    args = parser.parse_args()
+
+    with app.app_context():
+        days = rebuild_rollups(args.start, args.end, days_per_batch=args.days_per_batch)
+    print(f"Rebuilt {days} day(s) of revenue rollups.")
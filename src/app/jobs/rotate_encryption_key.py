@@ -0,0 +1,25 @@
+# docker exec -it movie-booking-be-app-1 poetry run python src/app/jobs/rotate_encryption_key.py --workers 4
+#
+# Key rotation on a live system:
+#   1. ENCRYPTION_OLD_KEYS=<current key>, ENCRYPTION_KEY=<new key>; deploy (reads accept both keys)
+#   2. run this job; it can be stopped and re-run at any time (--after <id> skips ahead)
+#   3. once it reports rotated=0 failed=0, drop the old key from ENCRYPTION_OLD_KEYS
+
+import sys, os, argparse, uuid
+
+sys.path.append('/app')
+
+from wsgi import app
+from src.app.services.key_rotation import reencrypt_billing_info
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-encrypt billing_info card fields under the current ENCRYPTION_KEY")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=int(os.getenv("KEY_ROTATION_CHUNK_SIZE", 1000)))
+    parser.add_argument("--after", type=uuid.UUID, default=None, help="resume after this billing_info_id")
+    args = parser.parse_args()
+
+    with app.app_context():
+        stats = reencrypt_billing_info(workers=args.workers, chunk_size=args.chunk_size, after=args.after)
+    sys.exit(1 if stats["failed"] else 0)
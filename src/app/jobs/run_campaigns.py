@@ -0,0 +1,23 @@
+# docker exec -it movie-booking-be-app-1 poetry run python src/app/jobs/run_campaigns.py
+# Sends every runnable promotion campaign (see services/campaigns.py), then exits.
+# Safe to schedule frequently: a campaign is only ever claimed by one runner.
+
+import sys, os, socket
+
+sys.path.append('/app')
+
+from wsgi import app
+from src.app.services.campaigns import campaign_runner
+
+
+if __name__ == "__main__":
+    socket.setdefaulttimeout(app.config["EMAIL_SMTP_TIMEOUT_SECONDS"])
+    with app.app_context():
+        while True:
+            campaign_id = campaign_runner.claim()
+            if campaign_id is None:
+                break
+            print(f"running campaign {campaign_id}...")
+            result = campaign_runner.run(campaign_id)
+            print(f"campaign {campaign_id}: {result['status']} sent={result['sent']} failed={result['failed']}"
+                  + (f" error={result['last_error']}" if result["last_error"] else ""))
@@ -5,7 +5,6 @@ from datetime import datetime, timedelta, timezone
 
 sys.path.append('/app')
 
-from wsgi import app
 from src.app import db
 from src.app.models.showtimes import Showtime
 from src.app.models.movie import Movie
@@ -81,6 +80,7 @@ def initial_seed(days: int) -> None:
     return
 
 if __name__ == "__main__":
+    from wsgi import app
     with app.app_context():
         delete_old_showtimes()
         daily_limit = int(os.getenv("DAILY_SHOWTIMES", 2))
@@ -0,0 +1,136 @@
+"""The jobs known to `python -m src.app.jobs`, with their schedules (UTC cron).
+
+Jobs without a schedule (destructive or one-off maintenance) only run on demand:
+    python -m src.app.jobs run delete_old_users dry_run=true
+"""
+from datetime import date, datetime, timedelta, timezone
+
+from flask import current_app
+
+from .. import db
+from ..models.job_runs import JobRun
+from .framework import job
+
+
+@job("purge_codes", schedule="5 * * * *")
+def purge_codes(ctx, batch_size: int = 5000):
+    """Delete used / expired verification and password reset codes."""
+    from ..services.codes import purge_codes as _purge
+    deleted = _purge(batch_size)
+    ctx.add(sum(deleted.values()), batches=0)
+    return deleted
+
+
+@job("purge_sent_emails", schedule="15 * * * *")
+def purge_sent_emails(ctx):
+    """Delete delivered email_outbox rows past EMAIL_OUTBOX_RETENTION_DAYS."""
+    from ..services.email_outbox import outbox_workers
+    ctx.add(outbox_workers.purge_sent())
+
+
+@job("purge_revoked_tokens", schedule="25 * * * *")
+def purge_revoked_tokens(ctx):
+    """Delete jwt_blacklist rows whose tokens have expired anyway."""
+    from ..services.token_revocation import purge_expired
+    ctx.add(purge_expired())
+
+
+@job("run_campaigns", schedule="*/5 * * * *")
+def run_campaigns(ctx):
+    """Send every runnable promotion campaign."""
+    from ..services.campaigns import campaign_runner
+    results = []
+    while True:
+        campaign_id = campaign_runner.claim()
+        if campaign_id is None:
+            return results or None
+        result = campaign_runner.run(campaign_id)
+        ctx.add(result["sent"])
+        ctx.log(f"campaign {campaign_id}: {result['status']} sent={result['sent']} failed={result['failed']}")
+        results.append({"campaign_id": str(campaign_id), **result})
+
+
+@job("showtimes", schedule="0 3 * * *")
+def showtimes(ctx, daily_showtimes: int = 2):
+    """Delete past showtimes and create next week's."""
+    from .showtimes_jobs import delete_old_showtimes, create_new_showtimes
+    delete_old_showtimes()
+    create_new_showtimes(daily_showtimes)
+
+
+@job("prune_job_runs", schedule="40 4 * * *")
+def prune_job_runs(ctx):
+    """Delete job_runs history older than JOBS_HISTORY_DAYS."""
+    table = JobRun.__table__
+    cutoff = datetime.now(timezone.utc) - timedelta(days=current_app.config.get("JOBS_HISTORY_DAYS", 30))
+    return ctx.batched_delete(table, table.c.started_at < cutoff)
+
+
+@job("maintain_partitions", schedule="10 0 * * *")
+def maintain_partitions(ctx, months_ahead: int = None, mode: str = None):
+    """Create upcoming monthly partitions and detach/drop the expired ones."""
+    from ..services.partitions import apply_retention, ensure_partitions
+    if db.engine.dialect.name != "postgresql":
+        return "skipped: partitioning needs Postgres"
+    config = current_app.config
+    created = ensure_partitions(
+        db.engine, config.get("PARTITION_MONTHS_AHEAD", 3) if months_ahead is None else int(months_ahead),
+        report=ctx.log,
+    )
+    bookings_months = config.get("BOOKINGS_RETENTION_MONTHS", 0)
+    removed = apply_retention(
+        db.engine,
+        {"bookings": bookings_months, "tickets": bookings_months,
+         "seat_holds": config.get("SEAT_HOLDS_RETENTION_MONTHS", 2)},
+        mode=mode or config.get("PARTITION_RETENTION_MODE", "detach"),
+        report=ctx.log,
+    )
+    ctx.add(0, batches=len(created) + len(removed))
+    return {"created": created, "removed": removed}
+
+
+# on demand only
+
+@job("delete_old_users")
+def delete_old_users(ctx, days: float = 3, chunk_size: int = 1000, dry_run: bool = False):
+    """Delete non-admin users older than `days` (see delete_old_users.py)."""
+    from .delete_old_users import delete_old_users as _delete
+    n = _delete(days=days, chunk_size=chunk_size, dry_run=dry_run)
+    if not dry_run:
+        ctx.add(n, batches=-(-n // chunk_size))
+    return f"would delete {n}" if dry_run else None
+
+
+@job("rebuild_revenue_rollups")
+def rebuild_revenue_rollups(ctx, start: str = None, end: str = None, days_per_batch: int = 7):
+    """Recompute revenue_hourly / revenue_daily for UTC days [start, end)."""
+    from ..services.revenue import rebuild_rollups
+    days = rebuild_rollups(
+        date.fromisoformat(start) if start else None,
+        date.fromisoformat(end) if end else None,
+        days_per_batch=days_per_batch,
+        report=ctx.log,
+    )
+    ctx.add(days, batches=-(-days // days_per_batch))
+
+
+@job("rotate_encryption_key")
+def rotate_encryption_key(ctx, workers: int = 2, chunk_size: int = 1000):
+    """Re-encrypt stored card fields under the current ENCRYPTION_KEY."""
+    from ..services.key_rotation import reencrypt_billing_info
+    stats = reencrypt_billing_info(workers=workers, chunk_size=chunk_size, report=ctx.log)
+    ctx.add(stats["scanned"], batches=-(-stats["scanned"] // chunk_size))
+    if stats["failed"]:
+        raise RuntimeError(f"{stats['failed']} rows could not be decrypted with any configured key")
+    return stats
+
+
+@job("backfill_card_display_fields")
+def backfill_card_display_fields(ctx, chunk_size: int = 1000):
+    """Fill billing_info's last-4 / expiry display columns left NULL by the migration."""
+    from ..services.key_rotation import backfill_display_fields
+    stats = backfill_display_fields(chunk_size=chunk_size, report=ctx.log)
+    ctx.add(stats["filled"], batches=-(-stats["scanned"] // chunk_size))
+    if stats["failed"]:
+        raise RuntimeError(f"{stats['failed']} rows could not be decrypted with any configured key")
+    return stats
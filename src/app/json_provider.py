@@ -0,0 +1,119 @@
+"""JSON encoding of API responses (`app.json`) and streamed list bodies.
+
+FastJSONProvider replaces Flask's default provider. JSON_ENCODER picks the
+encoder: "orjson" (the default; falls back to "stdlib" when the package is
+missing) or "stdlib". Both write the same JSON:
+  - keys sorted, no whitespace (indented in debug mode), one trailing newline
+    after a response body
+  - UUIDs as their canonical string, datetimes, dates and times in ISO 8601
+    (what `.isoformat()` gives), Decimals as strings, dataclasses as objects
+
+so serializers hand over model values as they are. Flask's default provider
+would send a datetime as an HTTP date. The bytes differ in one place only:
+orjson writes non-ASCII text as UTF-8 where the stdlib escapes it (\\u00e9).
+
+`list_response(rows, to_dict, page=...)` builds the usual
+`{"data": [...], "page": {...}}` body. With more than JSON_STREAM_MIN_ITEMS
+rows it is streamed: rows are serialized and encoded a chunk at a time and
+sent with chunked transfer encoding, so neither the list of dicts nor the
+whole body is ever held in memory.
+"""
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime, time
+
+from flask import current_app, stream_with_context
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ENCODERS = ("orjson", "stdlib")
+
+# streamed bodies are written in pieces of about this size
+_FLUSH_BYTES = 64 * 1024
+
+
+def _default(o):
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, (uuid.UUID, decimal.Decimal)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def encoder(name: str = "orjson", indent: bool = False):
+    """obj -> bytes for JSON_ENCODER `name`."""
+    if name not in ENCODERS:
+        raise ValueError(f"JSON_ENCODER must be one of {', '.join(ENCODERS)}")
+    if name == "orjson" and orjson is not None:
+        options = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return lambda obj: orjson.dumps(obj, default=_default, option=options)
+    dump_args = {"indent": 2} if indent else {"separators": (",", ":")}
+    return lambda obj: json.dumps(obj, default=_default, sort_keys=True, **dump_args).encode()
+
+
+class FastJSONProvider(JSONProvider):
+    mimetype = "application/json"
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.encoder_name = app.config.get("JSON_ENCODER", "orjson")
+        self.stream_min_items = app.config.get("JSON_STREAM_MIN_ITEMS", 50)
+        self.dumpb = encoder(self.encoder_name, indent=app.debug)
+
+    def dumps(self, obj, **kwargs) -> str:
+        return self.dumpb(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumpb(obj) + b"\n", mimetype=self.mimetype)
+
+
+def _stream(dumpb, rows, to_dict, fields):
+    to_dict = to_dict or (lambda row: row)
+    out = bytearray(b"{")
+    for n, key in enumerate(sorted([*fields, "data"])):
+        if n:
+            out += b","
+        out += dumpb(key) + b":"
+        if key != "data":
+            out += dumpb(fields[key])
+            continue
+        out += b"["
+        for i, row in enumerate(rows):
+            if i:
+                out += b","
+            out += dumpb(to_dict(row))
+            if len(out) >= _FLUSH_BYTES:
+                yield bytes(out)
+                out.clear()
+        out += b"]"
+    out += b"}\n"
+    yield bytes(out)
+
+
+def list_response(rows, to_dict=None, **fields):
+    """`{"data": [to_dict(row) for row in rows], **fields}`, streamed when `rows` is long.
+
+    Without `to_dict` the rows are encoded as they are (already dicts).
+    """
+    provider = current_app.json
+    if not isinstance(provider, FastJSONProvider) or len(rows) <= provider.stream_min_items:
+        data = [to_dict(row) for row in rows] if to_dict else rows
+        return provider.response({"data": data, **fields})
+    body = stream_with_context(_stream(provider.dumpb, rows, to_dict, fields))
+    return current_app.response_class(body, mimetype=provider.mimetype)
@@ -1,9 +1,50 @@
 """Auth utilities: extract JWT from HttpOnly cookie (preferred) or Bearer header,
-and decorators for auth/verified/admin guards."""
+resolve it to a request-scoped principal, and decorators for auth/verified/admin guards."""
+import uuid
+from dataclasses import dataclass
 from functools import wraps
-from flask import jsonify, request, current_app
+from flask import jsonify, request, current_app, g
 import jwt
+from .. import db
 from ..models.users import User
+from ..services.user_cache import principal_cache
+from ..services.token_revocation import revocation_filter
+
+# why a principal could not be resolved
+AUTH_MISSING = "missing"
+AUTH_EXPIRED = "expired"
+AUTH_INVALID = "invalid"
+AUTH_REVOKED = "revoked"
+AUTH_NOT_FOUND = "not_found"
+
+_AUTH_ERROR_RESPONSES = {
+    AUTH_MISSING: ("Not authenticated", 401),
+    AUTH_EXPIRED: ("Token has expired", 401),
+    AUTH_INVALID: ("Invalid token", 401),
+    AUTH_REVOKED: ("Token has been revoked", 401),
+    AUTH_NOT_FOUND: ("User not found", 404),
+}
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as seen by auth checks: a narrow, relationship-free projection."""
+    user_id: uuid.UUID
+    email: str
+    first_name: str
+    last_name: str
+    is_verified: bool
+    is_admin: bool
+
+
+_PRINCIPAL_COLUMNS = (
+    User.user_id,
+    User.email,
+    User.first_name,
+    User.last_name,
+    User.is_verified,
+    User.is_admin,
+)
 
 
 def _extract_token():
@@ -18,14 +59,83 @@ def _extract_token():
     return None
 
 
-def _decode_user(token: str):
-    try:
-        payload = jwt.decode(
-            token, current_app.config["JWT_SECRET_KEY"], algorithms=["HS256"]
-        )
-        return User.query.filter_by(user_id=payload["user_id"]).first()
-    except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
+def _load_principal(user_id: uuid.UUID):
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+    row = db.session.query(*_PRINCIPAL_COLUMNS).filter(User.user_id == user_id).first()
+    if row is None:
         return None
+    principal = Principal(
+        user_id=row.user_id,
+        email=row.email,
+        first_name=row.first_name,
+        last_name=row.last_name,
+        is_verified=bool(row.is_verified),
+        is_admin=bool(row.is_admin),
+    )
+    principal_cache.put(user_id, principal)
+    return principal
+
+
+def resolve_principal():
+    """
+    Decode the request's JWT and load its user, at most once per request.
+    Returns (principal, None) on success or (None, AUTH_*) describing the failure.
+    """
+    token = _extract_token()
+    # keyed by token too: g outlives the request when an app context is pushed around it (tests, CLI)
+    cached = g.get("auth_principal")
+    if cached is not None and cached[0] == token:
+        return cached[1], cached[2]
+
+    principal, error, claims = None, None, None
+    if not token:
+        error = AUTH_MISSING
+    else:
+        try:
+            payload = jwt.decode(
+                token, current_app.config["JWT_SECRET_KEY"], algorithms=["HS256"]
+            )
+            user_id = uuid.UUID(str(payload["user_id"]))
+        except jwt.ExpiredSignatureError:
+            error = AUTH_EXPIRED
+        except (jwt.InvalidTokenError, KeyError, ValueError):
+            error = AUTH_INVALID
+        else:
+            # in-memory deny set first; only live tokens reach the cache/DB
+            if revocation_filter.is_revoked(payload):
+                error = AUTH_REVOKED
+            else:
+                claims = payload
+                principal = _load_principal(user_id)
+                if principal is None:
+                    error = AUTH_NOT_FOUND
+
+    g.auth_principal = (token, principal, error)
+    g.auth_claims = claims
+    return principal, error
+
+
+def current_token_claims():
+    """Claims of the request's token once resolve_principal() has accepted it, else None."""
+    resolve_principal()
+    return g.get("auth_claims")
+
+
+def auth_error_response(error: str):
+    """Controller-style (json, status) for a resolve_principal() failure."""
+    message, status = _AUTH_ERROR_RESPONSES.get(error, ("Invalid token", 401))
+    return jsonify({"error": message}), status
+
+
+def _require_principal():
+    principal, error = resolve_principal()
+    if error == AUTH_MISSING:
+        return None, (jsonify({"error": "Not authenticated"}), 401)
+    if principal is None:
+        return None, (jsonify({"error": "Invalid or expired token"}), 401)
+    return principal, None
 
 
 def require_auth(f):
@@ -33,12 +143,9 @@ def require_auth(f):
 
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = _extract_token()
-        if not token:
-            return jsonify({"error": "Not authenticated"}), 401
-        user = _decode_user(token)
-        if not user:
-            return jsonify({"error": "Invalid or expired token"}), 401
+        user, error = _require_principal()
+        if error:
+            return error
         return f(user, *args, **kwargs)
 
     return decorated
@@ -49,12 +156,9 @@ def require_verified_email(f):
 
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = _extract_token()
-        if not token:
-            return jsonify({"error": "Not authenticated"}), 401
-        user = _decode_user(token)
-        if not user:
-            return jsonify({"error": "Invalid or expired token"}), 401
+        user, error = _require_principal()
+        if error:
+            return error
         if not user.is_verified:
             return jsonify({"error": "Email verification required"}), 403
         return f(user, *args, **kwargs)
@@ -67,12 +171,9 @@ def require_admin(f):
 
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = _extract_token()
-        if not token:
-            return jsonify({"error": "Not authenticated"}), 401
-        user = _decode_user(token)
-        if not user:
-            return jsonify({"error": "Invalid or expired token"}), 401
+        user, error = _require_principal()
+        if error:
+            return error
         if not user.is_verified:
             return jsonify({"error": "Email verification required"}), 403
         if not user.is_admin:
@@ -0,0 +1,18 @@
+"""Read-only views: their ORM reads go to a read replica when one is healthy (services/replicas.py)."""
+from functools import wraps
+from flask import g
+from ..services.replicas import replicas
+
+
+def read_only(f):
+    """
+    Route the view's reads, including those made by auth decorators below it,
+    to a replica. Clients that wrote within REPLICA_PIN_SECONDS stay on the
+    primary. Only for views that never need to see a write made moments ago
+    by someone else; flushes still go to the primary.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        g.db_replica = replicas.choose()
+        return f(*args, **kwargs)
+    return decorated
@@ -0,0 +1,161 @@
+"""Per-request SQL instrumentation: statement count, DB time and repeated statement shapes.
+
+Engine events record every statement executed while a request (or a
+`count_statements()` block) is active. A statement's "shape" is its SQL with
+whitespace collapsed and expanded IN lists folded, so the same query run once
+per row of a parent result (an N+1) shows up as one shape with a high count.
+
+With `SQL_STATS_HEADERS` on (or in debug mode) every response carries
+    X-SQL-Count            statements executed
+    X-SQL-Time-Ms          time spent in the driver
+    X-SQL-Repeated         executions of the most repeated shape
+    X-DB-Pool-Wait-Ms      time spent waiting to check out a connection
+and a warning is logged when a shape repeats `SQL_STATS_REPEAT_WARN` times.
+
+Tests can hold an endpoint to a budget:
+
+    with assert_statement_budget(2):
+        client.get("/api/v1/movies")
+"""
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import current_app, g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_WS_RE = re.compile(r"\s+")
+# "IN (?, ?, ?)" / "IN (%(p_1)s, %(p_2)s)" / "IN (__[POSTCOMPILE_p])" -> "IN (...)"
+_IN_LIST_RE = re.compile(r"\bIN \((?:[^()]|\([^()]*\))*\)", re.IGNORECASE)
+
+
+def statement_shape(statement: str) -> str:
+    return _IN_LIST_RE.sub("IN (...)", _WS_RE.sub(" ", statement).strip())
+
+
+class SQLStats:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+        self.pool_wait_seconds = 0.0    # waiting for a pooled connection (services/db_pool.py)
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[statement_shape(statement)] += 1
+
+    @property
+    def milliseconds(self) -> float:
+        return round(self.seconds * 1000, 2)
+
+    def repeated(self, threshold: int = 2):
+        """[(shape, times)] executed at least `threshold` times, most repeated first."""
+        return [(s, n) for s, n in self.shapes.most_common() if n >= threshold]
+
+    def summary(self) -> str:
+        lines = [f"{self.count} statements, {self.milliseconds} ms"]
+        lines += [f"  {n}x {shape[:200]}" for shape, n in self.shapes.most_common()]
+        return "\n".join(lines)
+
+
+# collectors opened with count_statements(), per thread
+_local = threading.local()
+
+
+def _active_collectors():
+    stack = getattr(_local, "collectors", None)
+    if stack is None:
+        stack = _local.collectors = []
+    return stack
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("sql_stats_start", []).append((context, time.perf_counter()))
+
+
+def _handle_error(exception_context):
+    # a failed statement never reaches after_cursor_execute: drop its start so the
+    # pooled connection's info doesn't grow with every error
+    conn = exception_context.connection
+    starts = conn.info.get("sql_stats_start") if conn is not None else None
+    if starts and starts[-1][0] is exception_context.execution_context:
+        starts.pop()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("sql_stats_start")
+    elapsed = time.perf_counter() - starts.pop()[1] if starts else 0.0
+    if has_request_context():
+        stats = g.get("sql_stats")
+        if stats is not None:
+            stats.record(statement, elapsed)
+    for stats in _active_collectors():
+        stats.record(statement, elapsed)
+
+
+@contextmanager
+def count_statements():
+    """Collect every statement this thread executes inside the block."""
+    stats = SQLStats()
+    stack = _active_collectors()
+    stack.append(stats)
+    try:
+        yield stats
+    finally:
+        stack.remove(stats)
+
+
+@contextmanager
+def assert_statement_budget(max_statements: int, max_repeats: int = None):
+    """Fail if the block runs more than `max_statements` statements (or one shape more than `max_repeats` times)."""
+    with count_statements() as stats:
+        yield stats
+    if stats.count > max_statements:
+        raise AssertionError(f"SQL budget exceeded: {stats.count} > {max_statements}\n{stats.summary()}")
+    if max_repeats is not None and stats.repeated(max_repeats + 1):
+        raise AssertionError(f"statement repeated more than {max_repeats} times\n{stats.summary()}")
+
+
+class SQLStatsRecorder:
+    def __init__(self):
+        self._listening = False
+
+    def init_app(self, app):
+        if not app.config.get("SQL_STATS_ENABLED", True):
+            return
+        if not self._listening:
+            # on the Engine class, so every engine the app creates is covered
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+            event.listen(Engine, "handle_error", _handle_error)
+            self._listening = True
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    @staticmethod
+    def _start():
+        g.sql_stats = SQLStats()
+
+    @staticmethod
+    def _finish(response):
+        stats = g.pop("sql_stats", None)
+        if stats is None:
+            return response
+        threshold = current_app.config.get("SQL_STATS_REPEAT_WARN", 5)
+        repeated = stats.repeated(threshold) if threshold else []
+        for shape, n in repeated:
+            current_app.logger.warning(f"possible N+1: {n}x {shape[:300]}")
+        if current_app.config.get("SQL_STATS_HEADERS") or current_app.debug:
+            most = stats.shapes.most_common(1)
+            response.headers["X-SQL-Count"] = str(stats.count)
+            response.headers["X-SQL-Time-Ms"] = str(stats.milliseconds)
+            response.headers["X-SQL-Repeated"] = str(most[0][1] if most else 0)
+            response.headers["X-DB-Pool-Wait-Ms"] = str(round(stats.pool_wait_seconds * 1000, 2))
+        return response
+
+
+sql_stats = SQLStatsRecorder()
@@ -0,0 +1,75 @@
+"""Throttle decorator: reject over-limit requests before the view touches the DB or hashes anything."""
+from functools import wraps
+from flask import jsonify, request, current_app
+import jwt
+from .auth import _extract_token
+from ..services.throttling import throttler
+
+
+def _ip_key():
+    return request.remote_addr or "unknown"
+
+
+def _email_key():
+    data = request.get_json(silent=True) or {}
+    email = data.get("email") if isinstance(data, dict) else None
+    if not isinstance(email, str) or not email.strip():
+        return None
+    return email.strip().lower()
+
+
+def _user_key():
+    # signature check only; no DB lookup, revocation or expiry handling here
+    token = _extract_token()
+    if not token:
+        return None
+    try:
+        payload = jwt.decode(
+            token,
+            current_app.config["JWT_SECRET_KEY"],
+            algorithms=["HS256"],
+            options={"verify_exp": False},
+        )
+    except jwt.InvalidTokenError:
+        return None
+    return str(payload.get("user_id") or "") or None
+
+
+_KEY_FUNCS = {
+    "ip": _ip_key,
+    "email": _email_key,
+    "user": _user_key,
+}
+
+
+def throttle(name: str, **rules):
+    """
+    Throttle an endpoint. Each keyword is a key kind (ip, email, user) mapped to
+    (limit, window_seconds), e.g.
+
+        @throttle("login", ip=(20, 60), email=(5, 300))
+
+    A request is rejected with 429 if any applicable rule is over its limit.
+    """
+    for kind in rules:
+        if kind not in _KEY_FUNCS:
+            raise ValueError(f"unknown throttle key kind: {kind}")
+
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if throttler.enabled:
+                for kind, (limit, window) in rules.items():
+                    value = _KEY_FUNCS[kind]()
+                    if value is None:
+                        continue
+                    allowed, retry_after = throttler.backend.hit(f"{name}:{kind}:{value}", limit, window)
+                    if not allowed:
+                        resp = jsonify({"error": "Too many requests, please try again later"})
+                        resp.headers["Retry-After"] = str(retry_after)
+                        return resp, 429
+            return f(*args, **kwargs)
+
+        return decorated
+
+    return decorator
@@ -11,4 +11,10 @@ from .seats import Seat
 from .bookings import Booking
 from .seat_holds import SeatHold
 from .tickets import Ticket
-from .promotions import Promotion
\ No newline at end of file
+from .promotions import Promotion
+from .movie_rating_summary import MovieRatingSummary
+from .jwt_blacklist import JWTBlacklist
+from .email_outbox import EmailOutbox
+from .promotion_campaigns import PromotionCampaign
+from .revenue_rollups import RevenueHourly, RevenueDaily
+from .job_runs import JobRun
\ No newline at end of file
@@ -29,6 +29,12 @@ class BillingInfo(db.Model):
     card_exp    = db.Column(db.String(255), nullable=False) 
     cardholder_name = db.Column(db.String(255), nullable=False)
 
+    # Non-sensitive display fields, derived from the plaintext at write time so
+    # listing cards never has to decrypt anything
+    card_last4     = db.Column(db.String(4))
+    card_exp_month = db.Column(db.SmallInteger)
+    card_exp_year  = db.Column(db.SmallInteger)   # 4-digit
+
     billing_street   = db.Column(db.String(255), nullable=False)
     billing_state    = db.Column(db.String(2),   nullable=False)
     billing_zip_code = db.Column(db.String(5),   nullable=False)
@@ -39,5 +45,20 @@ class BillingInfo(db.Model):
         # Removed Luhn check since card_number is now encrypted
     )
 
+    def set_display_fields(self, card_number: str = None, card_exp: str = None):
+        """Fill the display columns from plaintext values ("4111...1111", "MM/YY")."""
+        if card_number:
+            self.card_last4 = card_number[-4:]
+        if card_exp:
+            mm, yy = card_exp.split("/")
+            self.card_exp_month = int(mm)
+            self.card_exp_year = 2000 + int(yy)
+
+    @property
+    def card_exp_display(self):
+        if self.card_exp_month is None or self.card_exp_year is None:
+            return None
+        return f"{self.card_exp_month:02d}/{self.card_exp_year % 100:02d}"
+
     def __repr__(self):
         return f"<BillingInfo {self.billing_info_id} {self.card_type}>"
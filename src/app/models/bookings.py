@@ -1,10 +1,23 @@
 from .. import db
 from sqlalchemy.sql import func
 import uuid
+from datetime import datetime, timezone
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy import Enum
 
+
+def _now_utc():
+    return datetime.now(timezone.utc)
+
+
 class Booking(db.Model):
+    """
+    Range-partitioned by month on created_at (services/partitions.py). The
+    database primary key is (booking_id, created_at), because Postgres needs
+    the partition key in every unique constraint. booking_id alone is still
+    unique and is what the ORM keys on. created_at is set in Python, so
+    tickets can copy it before the flush.
+    """
     __tablename__ = "bookings"
 
     booking_id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -20,11 +33,14 @@ class Booking(db.Model):
                        nullable=False, default="PENDING")
 
     total_cents = db.Column(db.Integer, nullable=False)
-    created_at  = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
+    created_at  = db.Column(db.DateTime(timezone=True), primary_key=True,
+                            default=_now_utc, server_default=func.now(), nullable=False)
     expires_at  = db.Column(db.DateTime(timezone=True), nullable=True)
 
+    __mapper_args__ = {"primary_key": [booking_id]}
     __table_args__ = (
         db.CheckConstraint("total_cents >= 0", name="ck_booking_total_nonneg"),
         db.Index("ix_bookings_user_id", "user_id"),
         db.Index("ix_bookings_showtime_id", "showtime_id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
@@ -7,12 +7,12 @@ class Category(db.Model):
     category_id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.Text, unique=True, nullable=False)
 
-    # many-to-many relation back to movies
+    # many-to-many relation back to movies; never eager, a category lookup must not pull its whole catalogue
     movies = db.relationship(
         "Movie",
         secondary=movie_categories,
         back_populates="categories",
-        lazy="selectin",
+        lazy="select",
     )
 
     def __repr__(self):
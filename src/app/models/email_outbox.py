@@ -0,0 +1,33 @@
+from .. import db
+from sqlalchemy.sql import func
+from sqlalchemy import Enum
+
+
+class EmailOutbox(db.Model):
+    """Emails waiting for delivery; written in the same transaction as the change that triggers them."""
+    __tablename__ = "email_outbox"
+
+    email_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+
+    recipient = db.Column(db.Text, nullable=False)
+    subject   = db.Column(db.Text, nullable=False)
+    html      = db.Column(db.Text, nullable=False)
+
+    status = db.Column(Enum("PENDING", "SENDING", "SENT", "FAILED",
+                            name="email_outbox_status_enum", create_type=True),
+                       nullable=False, default="PENDING", server_default="PENDING")
+    attempts        = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = db.Column(db.DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_until    = db.Column(db.DateTime(timezone=True), nullable=True)  # lease while SENDING
+    last_error      = db.Column(db.Text)
+
+    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
+    sent_at    = db.Column(db.DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # workers poll "due" rows by status + time
+        db.Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    def __repr__(self):
+        return f"<EmailOutbox {self.email_id} {self.status} to={self.recipient}>"
@@ -0,0 +1,28 @@
+from .. import db
+from sqlalchemy import Enum
+
+
+class JobRun(db.Model):
+    """One execution (or skipped attempt) of a job from src/app/jobs, on any node."""
+    __tablename__ = "job_runs"
+
+    run_id = db.Column(db.Integer, primary_key=True)
+    job_name = db.Column(db.Text, nullable=False)
+    node = db.Column(db.Text, nullable=False)            # hostname:pid
+    trigger = db.Column(Enum("SCHEDULE", "MANUAL", name="job_trigger_enum", create_type=True),
+                        nullable=False, default="SCHEDULE", server_default="SCHEDULE")
+    status = db.Column(Enum("OK", "FAILED", "SKIPPED", name="job_run_status_enum", create_type=True),
+                       nullable=False)
+
+    started_at  = db.Column(db.DateTime(timezone=True), nullable=False)
+    duration_ms = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rows        = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")
+    batches     = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    detail      = db.Column(db.Text)                     # result summary, error or skip reason
+
+    __table_args__ = (
+        db.Index("ix_job_runs_job_started", "job_name", "started_at"),
+    )
+
+    def __repr__(self):
+        return f"<JobRun {self.job_name} {self.status} {self.started_at}>"
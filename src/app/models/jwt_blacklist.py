@@ -1,8 +1,20 @@
 from .. import db
 from sqlalchemy.sql import func
+from sqlalchemy.dialects.postgresql import UUID
+
+# jti prefix for rows that revoke every token a user was issued before `created_at`
+USER_WIDE_JTI_PREFIX = "user:"
 
 class JWTBlacklist(db.Model):
     __tablename__ = "jwt_blacklist"
-    jti = db.Column(db.String(64), primary_key=True)     # JWT ID
+    jti = db.Column(db.String(64), primary_key=True)     # JWT ID, or "user:<user_id>" for user-wide revocation
+    user_id = db.Column(UUID(as_uuid=True),
+                        db.ForeignKey("users.user_id", ondelete="CASCADE"),
+                        nullable=True)
     expires_at = db.Column(db.DateTime(timezone=True), nullable=False)
-    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
+    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_jwt_blacklist_created_at", "created_at"),
+        db.Index("ix_jwt_blacklist_expires_at", "expires_at"),
+    )
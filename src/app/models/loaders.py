@@ -0,0 +1,52 @@
+"""Named loader profiles.
+
+Relationships default to plain lazy loading, so a query only fetches the
+rows of its own entity. An endpoint that serializes related rows opts into
+the profile matching its response shape, which loads exactly those relations
+in a fixed number of round trips:
+
+    movie.card     movie list items: rating summary joined, categories in one
+                   extra SELECT ... IN for the whole page (no row fan-out
+                   under LIMIT). The query is outer-joined to the summary, so
+                   callers may also sort or filter on MovieRatingSummary columns.
+    movie.detail   one movie: rating summary and categories joined, one statement
+    user.profile   user with billing cards (newest first) in one extra SELECT ... IN
+
+    movies = with_profile(Movie.query, "movie.card").limit(20).all()
+"""
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
+
+from .movie import Movie
+from .users import User
+
+
+def _movie_card(query):
+    return (
+        query
+        .outerjoin(Movie.rating_summary)
+        .options(contains_eager(Movie.rating_summary), selectinload(Movie.categories))
+    )
+
+
+def _movie_detail(query):
+    return query.options(joinedload(Movie.rating_summary), joinedload(Movie.categories))
+
+
+def _user_profile(query):
+    return query.options(selectinload(User.billing_infos))
+
+
+PROFILES = {
+    "movie.card": _movie_card,
+    "movie.detail": _movie_detail,
+    "user.profile": _user_profile,
+}
+
+
+def with_profile(query, name: str):
+    """Apply the loader profile `name` to an ORM query."""
+    try:
+        profile = PROFILES[name]
+    except KeyError:
+        raise ValueError(f"unknown loader profile {name!r}") from None
+    return profile(query)
@@ -19,11 +19,20 @@ class Movie(db.Model):
     )
 
     # many-to-many relation with categories table
+    # (loaded on demand; endpoints opt in via models.loaders)
     categories = db.relationship(
         "Category",
         secondary=movie_categories,
         back_populates="movies",
-        lazy="joined",
+        lazy="select",
+    )
+
+    # one-to-one rating aggregate, maintained by services.ratings
+    rating_summary = db.relationship(
+        "MovieRatingSummary",
+        uselist=False,
+        lazy="select",
+        passive_deletes=True,
     )
 
     def __repr__(self):
@@ -0,0 +1,48 @@
+from .. import db
+from sqlalchemy.sql import func
+
+
+class MovieRatingSummary(db.Model):
+    """Running rating totals per movie, kept in step with `reviews` on every write."""
+    __tablename__ = "movie_rating_summary"
+
+    movie_id = db.Column(
+        db.Integer,
+        db.ForeignKey("movies.movie_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    rating_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_sum   = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    # 1..5 histogram
+    count_1 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    count_2 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    count_3 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    count_4 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    count_5 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    updated_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        db.CheckConstraint("rating_count >= 0", name="ck_rating_summary_count_nonneg"),
+    )
+
+    @property
+    def average(self):
+        if not self.rating_count:
+            return None
+        return round(self.rating_sum / self.rating_count, 2)
+
+    @property
+    def histogram(self):
+        return {
+            "1": self.count_1,
+            "2": self.count_2,
+            "3": self.count_3,
+            "4": self.count_4,
+            "5": self.count_5,
+        }
+
+    def __repr__(self):
+        return f"<MovieRatingSummary movie={self.movie_id} n={self.rating_count}>"
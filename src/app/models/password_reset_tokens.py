@@ -1,5 +1,6 @@
 from .. import db
 from sqlalchemy.sql import func
+from sqlalchemy import text
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime, timedelta, timezone
@@ -14,7 +15,14 @@ class PasswordResetToken(db.Model):
     token = db.Column(db.String(6), nullable=False)  # 6-digit reset code
     created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
     expires_at = db.Column(db.DateTime(timezone=True), nullable=False)
-    is_used = db.Column(db.Boolean, default=False)
+    is_used = db.Column(db.Boolean, nullable=False, default=False, server_default=text("false"))
+
+    __table_args__ = (
+        # lookups and consumption are always by (user_id, token); deletes by user_id use the prefix
+        db.Index("ix_password_reset_tokens_user_token", "user_id", "token"),
+        # TTL purge
+        db.Index("ix_password_reset_tokens_expires_at", "expires_at"),
+    )
 
     def __init__(self, user_id, token, expires_in_minutes=15):
         self.user_id = user_id
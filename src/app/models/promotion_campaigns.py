@@ -0,0 +1,42 @@
+from .. import db
+from sqlalchemy.sql import func
+from sqlalchemy import Enum
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+
+
+class PromotionCampaign(db.Model):
+    """One mailing of a promotion to the `is_email_list` audience; the checkpoint makes it resumable."""
+    __tablename__ = "promotion_campaigns"
+
+    campaign_id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    promotion_id = db.Column(
+        UUID(as_uuid=True),
+        db.ForeignKey("promotions.promotion_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    subject = db.Column(db.Text, nullable=False)
+    status = db.Column(Enum("PENDING", "RUNNING", "PAUSED", "DONE", "CANCELLED",
+                            name="promotion_campaign_status_enum", create_type=True),
+                       nullable=False, default="PENDING", server_default="PENDING")
+
+    # recipients are streamed in user_id order; everyone <= last_user_id has been handled
+    last_user_id = db.Column(UUID(as_uuid=True), nullable=True)
+    sent_count   = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    failed_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    last_error   = db.Column(db.Text)
+
+    created_at  = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at  = db.Column(db.DateTime(timezone=True), nullable=True)
+    heartbeat_at = db.Column(db.DateTime(timezone=True), nullable=True)  # bumped on every checkpoint
+    finished_at = db.Column(db.DateTime(timezone=True), nullable=True)
+
+    promotion = db.relationship("Promotion")
+
+    __table_args__ = (
+        db.Index("ix_promotion_campaigns_status", "status"),
+    )
+
+    def __repr__(self):
+        return f"<PromotionCampaign {self.campaign_id} {self.status} sent={self.sent_count}>"
@@ -0,0 +1,46 @@
+from .. import db
+from sqlalchemy.sql import func
+
+
+class _RevenueTotals:
+    # confirmed bookings / their tickets / their total_cents, net of cancellations
+    bookings      = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    tickets       = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    revenue_cents = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")
+
+    updated_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class RevenueHourly(_RevenueTotals, db.Model):
+    """Confirmed sales per showtime hour (UTC), movie and auditorium; kept in step with booking status changes."""
+    __tablename__ = "revenue_hourly"
+
+    bucket_start  = db.Column(db.DateTime(timezone=True), primary_key=True)
+    movie_id      = db.Column(db.Integer, db.ForeignKey("movies.movie_id", ondelete="CASCADE"), primary_key=True)
+    auditorium_id = db.Column(db.Integer, db.ForeignKey("auditoriums.auditorium_id", ondelete="CASCADE"),
+                              primary_key=True)
+
+    __table_args__ = (
+        db.Index("ix_revenue_hourly_movie_bucket", "movie_id", "bucket_start"),
+    )
+
+    def __repr__(self):
+        return f"<RevenueHourly {self.bucket_start} movie={self.movie_id} aud={self.auditorium_id}>"
+
+
+class RevenueDaily(_RevenueTotals, db.Model):
+    """Same totals per showtime day (UTC); what the dashboard reads for anything longer than a few days."""
+    __tablename__ = "revenue_daily"
+
+    day           = db.Column(db.Date, primary_key=True)
+    movie_id      = db.Column(db.Integer, db.ForeignKey("movies.movie_id", ondelete="CASCADE"), primary_key=True)
+    auditorium_id = db.Column(db.Integer, db.ForeignKey("auditoriums.auditorium_id", ondelete="CASCADE"),
+                              primary_key=True)
+
+    __table_args__ = (
+        db.Index("ix_revenue_daily_movie_day", "movie_id", "day"),
+        db.Index("ix_revenue_daily_auditorium_day", "auditorium_id", "day"),
+    )
+
+    def __repr__(self):
+        return f"<RevenueDaily {self.day} movie={self.movie_id} aud={self.auditorium_id}>"
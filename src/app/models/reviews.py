@@ -24,4 +24,5 @@ class Review(db.Model):
         db.Index("ix_reviews_movie_id", "movie_id"),
         db.Index("ix_reviews_user_id", "user_id"),
         db.CheckConstraint("rating BETWEEN 1 AND 5", name="ck_reviews_rating"),
+        db.UniqueConstraint("user_id", "movie_id", name="uq_reviews_user_movie"),
     )
@@ -2,8 +2,10 @@ from .. import db
 from sqlalchemy.sql import func
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
+from .bookings import _now_utc
 
 class SeatHold(db.Model):
+    """Range-partitioned by month on created_at; primary key (hold_id, created_at) as for bookings."""
     __tablename__ = "seat_holds"
 
     hold_id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -18,12 +20,15 @@ class SeatHold(db.Model):
                            db.ForeignKey("seats.seat_id", ondelete="CASCADE"),
                            nullable=False)
 
-    created_at      = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
+    created_at      = db.Column(db.DateTime(timezone=True), primary_key=True,
+                                default=_now_utc, server_default=func.now(), nullable=False)
     hold_expires_at = db.Column(db.DateTime(timezone=True), nullable=False)
     released_at     = db.Column(db.DateTime(timezone=True), nullable=True)
 
+    __mapper_args__ = {"primary_key": [hold_id]}
     __table_args__ = (
         db.Index("ix_seat_holds_showtime_id", "showtime_id"),
         db.Index("ix_seat_holds_user_id", "user_id"),
-        # we’ll add a partial unique index in the migration
+        # no unique index across holds: on a partitioned table it would have to include created_at
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
@@ -4,13 +4,18 @@ import uuid
 from sqlalchemy.dialects.postgresql import UUID
 
 class Ticket(db.Model):
+    """
+    Partitioned like bookings, on a copy of the booking's created_at, so a
+    booking and its tickets always share a month. That lets a month be
+    detached or dropped as a unit, and lets the composite foreign key point
+    at the partitioned bookings table.
+    """
     __tablename__ = "tickets"
 
     ticket_id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
-    booking_id  = db.Column(UUID(as_uuid=True),
-                            db.ForeignKey("bookings.booking_id", ondelete="CASCADE"),
-                            nullable=False)
+    booking_id  = db.Column(UUID(as_uuid=True), nullable=False)
+    booking_created_at = db.Column(db.DateTime(timezone=True), primary_key=True, nullable=False)
     showtime_id = db.Column(UUID(as_uuid=True),
                             db.ForeignKey("showtimes.showtime_id", ondelete="CASCADE"),
                             nullable=False)
@@ -20,9 +25,17 @@ class Ticket(db.Model):
 
     price_cents = db.Column(db.Integer, nullable=False)
 
+    __mapper_args__ = {"primary_key": [ticket_id]}
     __table_args__ = (
-        db.UniqueConstraint("booking_id", "seat_id", name="uq_ticket_per_seat_in_booking"),
+        db.ForeignKeyConstraint(
+            ["booking_id", "booking_created_at"],
+            ["bookings.booking_id", "bookings.created_at"],
+            ondelete="CASCADE",
+            name="fk_tickets_booking",
+        ),
+        db.UniqueConstraint("booking_id", "booking_created_at", "seat_id", name="uq_ticket_per_seat_in_booking"),
         db.CheckConstraint("price_cents >= 0", name="ck_ticket_price_nonneg"),
         db.Index("ix_tickets_showtime_id", "showtime_id"),
         db.Index("ix_tickets_seat_id", "seat_id"),
+        {"postgresql_partition_by": "RANGE (booking_created_at)"},
     )
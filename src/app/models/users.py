@@ -32,12 +32,13 @@ class User(db.Model):
 
     created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
 
-    # relationships
+    # relationships (loaded on demand; endpoints opt in via models.loaders)
     billing_infos = db.relationship(
         "BillingInfo",
         backref="user",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="select",
+        order_by="desc(BillingInfo.created_at)",
     )
 
 
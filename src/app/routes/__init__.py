@@ -9,6 +9,8 @@ def init_app(app):
     from .user_routes import bp as user_bp
     from .auth_routes import auth_bp
     from .admin_routes import bp as admin_bp
+    from .review_routes import bp as review_bp
+    from .suggest_routes import bp as suggest_bp
 
 
     bp.register_blueprint(movie_bp)
@@ -17,6 +19,8 @@ def init_app(app):
     bp.register_blueprint(user_bp)
     bp.register_blueprint(auth_bp, url_prefix='/auth')
     bp.register_blueprint(admin_bp, url_prefix='/admin')
+    bp.register_blueprint(review_bp)
+    bp.register_blueprint(suggest_bp)
 
 
     app.register_blueprint(bp, url_prefix="/api/v1")
@@ -1,6 +1,10 @@
 from flask import Blueprint
 from ..middleware.auth import require_admin
-from ..controllers.admin_controller import list_users, update_user_admin
+from ..middleware.read_only import read_only
+from ..controllers.admin_controller import list_users, update_user_admin, bulk_update_users, get_db_pools
+from ..controllers.campaign_controller import create_campaign, get_campaign, cancel_campaign
+from ..controllers.export_controller import export_table
+from ..controllers.report_controller import get_revenue_report, get_movie_report, get_auditorium_report
 
 bp = Blueprint("admin_routes", __name__, url_prefix="/admin")
 
@@ -10,8 +14,66 @@ bp = Blueprint("admin_routes", __name__, url_prefix="/admin")
 def _list_users(admin_user):
     return list_users(admin_user)
 
+# PATCH /api/v1/admin/users  (bulk: user_ids or filter + changes)
+@bp.patch("/users")
+@require_admin
+def _bulk_update_users(admin_user):
+    return bulk_update_users(admin_user)
+
 # PATCH /api/v1/admin/users/<user_id>
 @bp.patch("/users/<user_id>")
 @require_admin
 def _update_user_admin(admin_user, user_id):
     return update_user_admin(admin_user, user_id)
+
+# GET /api/v1/admin/export/<users|bookings|movies|showtimes>?format=csv|ndjson&fields=
+@bp.get("/export/<name>")
+@read_only
+@require_admin
+def _export_table(admin_user, name):
+    return export_table(admin_user, name)
+
+# POST /api/v1/admin/promotions/<promotion_id>/campaigns
+@bp.post("/promotions/<promotion_id>/campaigns")
+@require_admin
+def _create_campaign(admin_user, promotion_id):
+    return create_campaign(admin_user, promotion_id)
+
+# GET /api/v1/admin/campaigns/<campaign_id>
+@bp.get("/campaigns/<campaign_id>")
+@require_admin
+def _get_campaign(admin_user, campaign_id):
+    return get_campaign(admin_user, campaign_id)
+
+# POST /api/v1/admin/campaigns/<campaign_id>/cancel
+@bp.post("/campaigns/<campaign_id>/cancel")
+@require_admin
+def _cancel_campaign(admin_user, campaign_id):
+    return cancel_campaign(admin_user, campaign_id)
+
+# GET /api/v1/admin/reports/revenue?granularity=day|hour&from=&to=&movie_id=&auditorium_id=
+@bp.get("/reports/revenue")
+@read_only
+@require_admin
+def _revenue_report(admin_user):
+    return get_revenue_report(admin_user)
+
+# GET /api/v1/admin/reports/movies?from=&to=&limit=
+@bp.get("/reports/movies")
+@read_only
+@require_admin
+def _movie_report(admin_user):
+    return get_movie_report(admin_user)
+
+# GET /api/v1/admin/reports/auditoriums?from=&to=&limit=
+@bp.get("/reports/auditoriums")
+@read_only
+@require_admin
+def _auditorium_report(admin_user):
+    return get_auditorium_report(admin_user)
+
+# GET /api/v1/admin/db/pools
+@bp.get("/db/pools")
+@require_admin
+def _db_pools(admin_user):
+    return get_db_pools(admin_user)
@@ -1,4 +1,5 @@
 from flask import Blueprint
+from ..middleware.read_only import read_only
 from ..controllers.auditorium_controller import (
     create_auditorium,
     get_auditoriums,
@@ -12,7 +13,7 @@ bp = Blueprint("auditorium_routes", __name__, url_prefix="/auditorium")
 bp.post("")(create_auditorium)
 
 # GET /api/v1/auditorium
-bp.get("")(get_auditoriums)
+bp.get("")(read_only(get_auditoriums))
 
 # GET /api/v1/auditorium/<auditorium_id>
-bp.get("/<int:auditorium_id>")(get_auditorium)
+bp.get("/<int:auditorium_id>")(read_only(get_auditorium))
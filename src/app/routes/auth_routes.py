@@ -1,5 +1,6 @@
 from flask import Blueprint
 from ..controllers.auth_controller import AuthController
+from ..middleware.throttle import throttle
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -9,6 +10,7 @@ def signup():
     return AuthController.signup()
 
 @auth_bp.route("/login", methods=["POST"])
+@throttle("login", ip=(30, 60), email=(5, 300))
 def login():
     return AuthController.login()
 
@@ -22,18 +24,22 @@ def verify_token():
     return AuthController.verify_token()
 
 @auth_bp.route("/verify-email", methods=["POST"])
+@throttle("verify_email", ip=(20, 60), email=(5, 900))
 def verify_email():
     return AuthController.verify_email()
 
 @auth_bp.route("/resend-verification", methods=["POST"])
+@throttle("resend_verification", ip=(10, 60), user=(3, 900))
 def resend_verification():
     return AuthController.resend_verification()
 
 @auth_bp.route("/forgot-password", methods=["POST"])
+@throttle("forgot_password", ip=(10, 60), email=(3, 900))
 def forgot_password():
     return AuthController.forgot_password()
 
 @auth_bp.route("/reset-password", methods=["POST"])
+@throttle("reset_password", ip=(20, 60), email=(5, 900))
 def reset_password():
     return AuthController.reset_password()
 
@@ -1,4 +1,5 @@
 from flask import Blueprint
+from ..middleware.read_only import read_only
 from ..controllers.movie_controller import create_movie, get_movie, get_movies, delete_movie, update_movie
 
 bp = Blueprint("movie_routes", __name__, url_prefix="/movies")
@@ -9,7 +10,7 @@ def create():
     return create_movie()
 
 # GET /api/v1/movies/{movie_id}
-bp.get("/<int:movie_id>")(get_movie)
+bp.get("/<int:movie_id>")(read_only(get_movie))
 
 # PUT /api/v1/movies/{movie_id}
 @bp.put("/<int:movie_id>")
@@ -22,4 +23,4 @@ def delete(movie_id):
     return delete_movie(movie_id)
 
 # GET /api/v1/movies
-bp.get("")(get_movies)
\ No newline at end of file
+bp.get("")(read_only(get_movies))
\ No newline at end of file
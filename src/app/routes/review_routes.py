@@ -0,0 +1,32 @@
+from flask import Blueprint
+from ..middleware.auth import require_verified_email
+from ..middleware.read_only import read_only
+from ..controllers.review_controller import (
+    get_reviews,
+    create_review,
+    update_review,
+    delete_review,
+)
+
+bp = Blueprint("review_routes", __name__)
+
+# GET /api/v1/movies/{movie_id}/reviews
+bp.get("/movies/<int:movie_id>/reviews")(read_only(get_reviews))
+
+# POST /api/v1/movies/{movie_id}/reviews
+@bp.post("/movies/<int:movie_id>/reviews")
+@require_verified_email
+def _create_review(user, movie_id):
+    return create_review(user, movie_id)
+
+# PATCH /api/v1/reviews/{review_id}
+@bp.patch("/reviews/<review_id>")
+@require_verified_email
+def _update_review(user, review_id):
+    return update_review(user, review_id)
+
+# DELETE /api/v1/reviews/{review_id}
+@bp.delete("/reviews/<review_id>")
+@require_verified_email
+def _delete_review(user, review_id):
+    return delete_review(user, review_id)
@@ -1,4 +1,5 @@
 from flask import Blueprint
+from ..middleware.read_only import read_only
 from ..controllers.showtime_controller import (
     create_showtime,
     get_showtime,
@@ -11,7 +12,7 @@ bp = Blueprint("showtime_routes", __name__, url_prefix="/showtimes")
 bp.post("")(create_showtime)
 
 # GET /api/v1/showtimes/<showtime_id>
-bp.get("/<showtime_id>")(get_showtime)
+bp.get("/<showtime_id>")(read_only(get_showtime))
 
 # GET /api/v1/showtimes
-bp.get("")(get_showtimes)
+bp.get("")(read_only(get_showtimes))
@@ -0,0 +1,8 @@
+from flask import Blueprint
+from ..middleware.read_only import read_only
+from ..controllers.suggest_controller import get_suggestions
+
+bp = Blueprint("suggest_routes", __name__, url_prefix="/suggest")
+
+# GET /api/v1/suggest?q=
+bp.get("")(read_only(get_suggestions))
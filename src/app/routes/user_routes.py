@@ -6,6 +6,7 @@ from ..controllers.user_controller import (
     add_user_card,
     delete_user_card,
     update_user_card,
+    reveal_user_card,
 )
 
 bp = Blueprint("user_routes", __name__, url_prefix="/users")
@@ -19,3 +20,4 @@ bp.get("/cards")(get_user_cards)
 bp.post("/cards")(add_user_card)
 bp.patch("/cards/<card_id>")(update_user_card)
 bp.delete("/cards/<card_id>")(delete_user_card)
+bp.get("/cards/<card_id>/reveal")(reveal_user_card)
@@ -0,0 +1,320 @@
+"""Bulk promotional mailings to the `is_email_list` audience.
+
+`CampaignRunner.run` streams recipients in `user_id` order through a
+server-side cursor (`yield_per`), so memory stays flat however large `users`
+grows. The template is compiled once per campaign and only the per-recipient
+fields are rendered per message. Messages are handed to a small pool of
+sender threads, each holding one persistent SMTP connection, behind a shared
+token bucket (`CAMPAIGN_RATE_PER_SECOND`).
+
+Progress is checkpointed after every chunk (`CAMPAIGN_CHUNK_SIZE` recipients):
+`last_user_id` and the counters are written in their own short transaction.
+A runner that dies, or is paused because the SMTP server keeps failing,
+resumes after the last checkpoint; at most one chunk is sent twice.
+"""
+import logging
+import queue
+import smtplib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from flask_mail import Message
+from sqlalchemy import and_, or_, select
+
+from .. import db
+from ..models.promotion_campaigns import PromotionCampaign
+from ..models.users import User
+from .email_service import mail
+
+log = logging.getLogger(__name__)
+
+PROMO_EMAIL_TEMPLATE = """
+<h1>{{ headline }}</h1>
+<p>Hi {{ first_name }},</p>
+<p>Use code <strong style="font-size: 20px; letter-spacing: 2px; color: #4F46E5;">{{ code }}</strong>
+for {{ discount }}% off your next booking.</p>
+<p>Valid {{ starts }} through {{ ends }}.</p>
+<p style="font-size: 12px; color: #6B7280;">You are receiving this because you joined our email list.
+<a href="{{ profile_url }}">Update your preferences</a> to stop receiving promotions.</p>
+"""
+
+UNFINISHED_STATUSES = ("PENDING", "RUNNING", "PAUSED")
+
+# refusals of one message say nothing about the connection
+_MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+
+def _now_utc():
+    return datetime.now(timezone.utc)
+
+
+class TokenBucket:
+    """Blocking rate limiter shared by the sender threads; rate <= 0 disables it."""
+
+    def __init__(self, rate: float, burst: float = None):
+        self.rate = rate
+        self.capacity = burst or max(rate, 1.0)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class _Sender(threading.Thread):
+    """One persistent SMTP connection draining the shared queue."""
+
+    def __init__(self, app, jobs: queue.Queue, bucket: TokenBucket, stats: dict, lock: threading.Lock, n: int):
+        super().__init__(name=f"campaign-sender-{n}", daemon=True)
+        self.app = app
+        self.jobs = jobs
+        self.bucket = bucket
+        self.stats = stats
+        self.lock = lock
+        self.conn = None
+
+    def _connect(self):
+        self._close()
+        conn = mail.connect()
+        conn.__enter__()
+        self.conn = conn
+
+    def _close(self):
+        if self.conn is not None:
+            try:
+                self.conn.__exit__(None, None, None)
+            except Exception:
+                pass
+            self.conn = None
+
+    def _send(self, msg: Message) -> bool:
+        """Send once, reconnecting and retrying once if the connection broke."""
+        for attempt in (1, 2):
+            try:
+                if self.conn is None:
+                    self._connect()
+                self.conn.send(msg)
+                return True
+            except _MESSAGE_ERRORS:
+                return False
+            except Exception as e:
+                log.warning("campaign: %s send failed (attempt %s): %r", self.name, attempt, e)
+                self._close()
+                with self.lock:
+                    self.stats["last_error"] = repr(e)
+        with self.lock:
+            self.stats["connection_failures"] += 1
+        return False
+
+    def run(self):
+        with self.app.app_context():
+            try:
+                while True:
+                    msg = self.jobs.get()
+                    try:
+                        if msg is None:
+                            return
+                        self.bucket.acquire()
+                        ok = self._send(msg)
+                        with self.lock:
+                            self.stats["sent" if ok else "failed"] += 1
+                    finally:
+                        self.jobs.task_done()
+            finally:
+                self._close()
+
+
+class CampaignRunner:
+    def __init__(self, connections: int = 3, rate_per_second: float = 10.0, chunk_size: int = 500,
+                 stale_seconds: float = 600.0, retry_seconds: float = 900.0, max_connection_failures: int = 20):
+        self.connections = connections
+        self.rate_per_second = rate_per_second
+        self.chunk_size = chunk_size
+        self.stale_seconds = stale_seconds
+        self.retry_seconds = retry_seconds
+        self.max_connection_failures = max_connection_failures
+
+    def init_app(self, app):
+        cfg = app.config
+        self.connections = cfg.get("CAMPAIGN_SMTP_CONNECTIONS", self.connections)
+        self.rate_per_second = cfg.get("CAMPAIGN_RATE_PER_SECOND", self.rate_per_second)
+        self.chunk_size = cfg.get("CAMPAIGN_CHUNK_SIZE", self.chunk_size)
+        self.stale_seconds = cfg.get("CAMPAIGN_STALE_SECONDS", self.stale_seconds)
+        self.retry_seconds = cfg.get("CAMPAIGN_RETRY_SECONDS", self.retry_seconds)
+
+    # bookkeeping (Core statements in their own transactions, never the streaming one)
+
+    def claim(self):
+        """
+        Mark the next runnable campaign RUNNING and return its id: PENDING ones,
+        PAUSED ones once `retry_seconds` have passed, or RUNNING ones whose
+        runner stopped checkpointing.
+        """
+        table = PromotionCampaign.__table__
+        now = _now_utc()
+        runnable = or_(
+            table.c.status == "PENDING",
+            and_(table.c.status == "PAUSED",
+                 table.c.heartbeat_at < now - timedelta(seconds=self.retry_seconds)),
+            and_(table.c.status == "RUNNING",
+                 table.c.heartbeat_at < now - timedelta(seconds=self.stale_seconds)),
+        )
+        with db.engine.begin() as conn:
+            campaign_id = conn.execute(
+                select(table.c.campaign_id)
+                .where(runnable)
+                .order_by(table.c.created_at)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            ).scalar()
+            if campaign_id is None:
+                return None
+            conn.execute(
+                table.update()
+                .where(table.c.campaign_id == campaign_id)
+                .values(status="RUNNING", heartbeat_at=now,
+                        started_at=db.func.coalesce(table.c.started_at, now))
+            )
+        return campaign_id
+
+    def _checkpoint(self, campaign_id, last_user_id, sent: int, failed: int, last_error=None) -> bool:
+        """Record progress; returns False if the campaign was cancelled meanwhile."""
+        table = PromotionCampaign.__table__
+        values = {
+            "heartbeat_at": _now_utc(),
+            "sent_count": table.c.sent_count + sent,
+            "failed_count": table.c.failed_count + failed,
+        }
+        if last_user_id is not None:
+            values["last_user_id"] = last_user_id
+        if last_error:
+            values["last_error"] = last_error[:1000]
+        with db.engine.begin() as conn:
+            result = conn.execute(
+                table.update()
+                .where(table.c.campaign_id == campaign_id, table.c.status == "RUNNING")
+                .values(**values)
+            )
+        return result.rowcount == 1
+
+    def _finish(self, campaign_id, status: str, last_error=None):
+        table = PromotionCampaign.__table__
+        values = {"status": status, "heartbeat_at": _now_utc()}
+        if status == "DONE":
+            values["finished_at"] = _now_utc()
+            values["last_error"] = None
+        if last_error:
+            values["last_error"] = last_error[:1000]
+        with db.engine.begin() as conn:
+            conn.execute(
+                table.update()
+                .where(table.c.campaign_id == campaign_id, table.c.status == "RUNNING")
+                .values(**values)
+            )
+
+    # sending
+
+    def _recipients(self, after_user_id):
+        query = (
+            db.session.query(User.user_id, User.email, User.first_name)
+            .filter(User.is_email_list.is_(True), User.is_verified.is_(True))
+            .order_by(User.user_id)
+            .execution_options(yield_per=self.chunk_size)
+        )
+        if after_user_id is not None:
+            query = query.filter(User.user_id > after_user_id)
+        return query
+
+    def run(self, campaign_id) -> dict:
+        """Send a claimed (RUNNING) campaign from its checkpoint to the end. Returns the final counts."""
+        campaign = db.session.get(PromotionCampaign, campaign_id)
+        promo = campaign.promotion
+        subject = campaign.subject
+        after = campaign.last_user_id
+
+        # compiled once; per message only first_name varies
+        template = current_app.jinja_env.from_string(PROMO_EMAIL_TEMPLATE)
+        fixed = {
+            "headline": promo.description or "A new promotion for you",
+            "code": promo.code,
+            "discount": f"{float(promo.discount_percent):g}",
+            "starts": promo.starts_at.strftime("%b %d, %Y"),
+            "ends": promo.ends_at.strftime("%b %d, %Y"),
+            "profile_url": f"{current_app.config['FRONTEND_URL'].rstrip('/')}/profile",
+        }
+        db.session.commit()  # the cursor below starts its own transaction
+
+        stats = {"sent": 0, "failed": 0, "connection_failures": 0, "last_error": None}
+        lock = threading.Lock()
+        jobs = queue.Queue(maxsize=self.chunk_size * 2)
+        bucket = TokenBucket(self.rate_per_second)
+        app = current_app._get_current_object()
+        senders = [_Sender(app, jobs, bucket, stats, lock, n) for n in range(max(self.connections, 1))]
+        for s in senders:
+            s.start()
+
+        reported = {"sent": 0, "failed": 0}
+        stopped = None
+        try:
+            chunk_last = None
+            pending = 0
+            for user_id, email, first_name in self._recipients(after):
+                html = template.render(first_name=first_name, **fixed)
+                jobs.put(Message(subject=subject, recipients=[email], html=html))
+                chunk_last, pending = user_id, pending + 1
+                if pending < self.chunk_size:
+                    continue
+                pending = 0
+                stopped = self._chunk_done(campaign_id, jobs, stats, lock, reported, chunk_last)
+                if stopped:
+                    break
+            if pending and not stopped:
+                stopped = self._chunk_done(campaign_id, jobs, stats, lock, reported, chunk_last)
+        finally:
+            db.session.rollback()  # close the streaming cursor's transaction
+            for _ in senders:
+                jobs.put(None)
+            for s in senders:
+                s.join()
+
+        outcome, error = stopped or ("DONE", None)
+        if outcome != "CANCELLED":
+            self._finish(campaign_id, outcome, error)
+        return {"status": outcome, "sent": stats["sent"], "failed": stats["failed"], "last_error": error}
+
+    def _chunk_done(self, campaign_id, jobs, stats, lock, reported, chunk_last):
+        """
+        Wait for the chunk to drain, then checkpoint it. Returns None to keep
+        going, or (status, error) when the campaign has to stop.
+        """
+        jobs.join()
+        with lock:
+            sent, failed = stats["sent"] - reported["sent"], stats["failed"] - reported["failed"]
+            reported["sent"], reported["failed"] = stats["sent"], stats["failed"]
+            broken = stats["connection_failures"] >= self.max_connection_failures
+            error = stats["last_error"]
+        if broken:
+            # the server is down: record neither position nor counts, so the whole chunk is retried
+            self._checkpoint(campaign_id, None, 0, 0, error)
+            log.warning("campaign %s: pausing after repeated SMTP failures: %s", campaign_id, error)
+            return "PAUSED", error
+        if not self._checkpoint(campaign_id, chunk_last, sent, failed):
+            return "CANCELLED", None
+        return None
+
+
+campaign_runner = CampaignRunner()
@@ -0,0 +1,103 @@
+"""Verification / password-reset code consumption and purging.
+
+A code is consumed with a single conditional UPDATE ... RETURNING: it only
+matches if the code belongs to the email's user, is unused and unexpired, so
+checking and marking it used is one round trip and two concurrent attempts
+cannot both succeed. Only a failed attempt pays for a follow-up lookup to
+explain why it failed.
+"""
+from sqlalchemy import select, update, delete, func, or_
+
+from .. import db
+from ..models.users import User
+from ..models.verification_tokens import VerificationToken
+from ..models.password_reset_tokens import PasswordResetToken
+
+# why a code was rejected
+CODE_USER_NOT_FOUND = "user_not_found"
+CODE_INVALID = "invalid"
+CODE_USED = "used"
+CODE_EXPIRED = "expired"
+
+
+def _user_id_for(email: str):
+    users = User.__table__
+    return select(users.c.user_id).where(users.c.email == email).scalar_subquery()
+
+
+def _consume(model, email: str, code: str):
+    table = model.__table__
+    return (
+        update(table)
+        .where(
+            table.c.user_id == _user_id_for(email),
+            table.c.token == code,
+            table.c.is_used.is_(False),
+            table.c.expires_at > func.now(),
+        )
+        .values(is_used=True)
+        .returning(table.c.user_id)
+    )
+
+
+def verify_email_code(email: str, code: str):
+    """Consume a verification code and mark its user verified, in one statement. Returns user_id or None."""
+    users = User.__table__
+    used = _consume(VerificationToken, email, code).cte("used_code")
+    stmt = (
+        update(users)
+        .where(users.c.user_id == used.c.user_id)
+        .values(is_verified=True)
+        .returning(users.c.user_id)
+    )
+    return db.session.execute(stmt).scalar()
+
+
+def consume_reset_code(email: str, code: str):
+    """Consume a password-reset code in one statement. Returns user_id or None."""
+    return db.session.execute(_consume(PasswordResetToken, email, code)).scalar()
+
+
+def explain_rejected_code(model, email: str, code: str) -> str:
+    """Slow path after a failed consume: find out which CODE_* reason applies."""
+    user_id = db.session.execute(select(User.user_id).where(User.email == email)).scalar()
+    if user_id is None:
+        return CODE_USER_NOT_FOUND
+    row = db.session.execute(
+        select(model.is_used, model.expires_at <= func.now())
+        .where(model.user_id == user_id, model.token == code)
+        .order_by(model.created_at.desc())
+        .limit(1)
+    ).first()
+    if row is None:
+        return CODE_INVALID
+    is_used, is_expired = row
+    if is_used:
+        return CODE_USED
+    if is_expired:
+        return CODE_EXPIRED
+    return CODE_INVALID
+
+
+def purge_codes(batch_size: int = 5000) -> dict:
+    """
+    Delete used and expired codes in batches of `batch_size`, committing per
+    batch so no single transaction holds many row locks. Returns rows deleted per table.
+    """
+    deleted = {}
+    for model in (VerificationToken, PasswordResetToken):
+        table = model.__table__
+        victims = (
+            select(table.c.token_id)
+            .where(or_(table.c.is_used.is_(True), table.c.expires_at <= func.now()))
+            .limit(batch_size)
+        )
+        total = 0
+        while True:
+            result = db.session.execute(delete(table).where(table.c.token_id.in_(victims)))
+            db.session.commit()
+            total += result.rowcount
+            if result.rowcount < batch_size:
+                break
+        deleted[table.name] = total
+    return deleted
@@ -0,0 +1,289 @@
+"""Connection pool settings, per-role session timeouts and pool telemetry.
+
+`configure(app, role)` runs before `db.init_app` and sets the engine options
+of the primary and of every replica bind (services/replicas.py): a
+`TimedQueuePool` of DB_POOL_SIZE (0 = sized for this process, see
+`default_pool_size`) plus DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE and
+pre-ping. SQLite keeps Flask-SQLAlchemy's defaults.
+
+Timeouts come in per-role pairs (statement, idle in transaction), see
+`ROLES`. The process role is "web" for the API and "job" for the jobs app,
+and a block of code can take another role with `with db_role("export"):`.
+When a connection is checked out for a role other than the one it last
+served, `statement_timeout` and `idle_in_transaction_session_timeout` are
+SET and committed once. Connections that stay in the same role pay nothing.
+
+DB_POOLER_MODE=transaction is for running behind PgBouncer (or a similar
+pooler) in transaction mode, where a session is not ours between
+transactions:
+  - The timeouts are applied with SET LOCAL at the start of every
+    transaction instead of once per connection.
+  - Drivers that prepare statements server-side are told not to: psycopg 3
+    gets prepare_threshold=None, asyncpg gets statement_cache_size=0.
+    psycopg2 never prepares.
+  - Job locks use transaction-scoped advisory locks (jobs/framework.py).
+
+Telemetry: each pool counts checkouts, pool timeouts, new connections and
+invalidations, and keeps a histogram of how long checkouts waited. `snapshot()`
+returns these with the live size / checked out / overflow of every pool
+(GET /api/v1/admin/db/pools). The wait of the current request is added to
+its SQL stats (X-DB-Pool-Wait-Ms), and a wait over DB_POOL_WAIT_WARN_MS is
+logged, at most every 10 s per pool.
+"""
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import g, has_request_context
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+log = logging.getLogger(__name__)
+
+POOLER_MODES = ("session", "transaction")
+
+# checkout wait histogram upper bounds, ms (plus one open-ended bucket)
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# role -> config keys of its (statement timeout, idle in transaction timeout), in ms; 0 = none
+ROLES = {
+    "web": ("DB_STATEMENT_TIMEOUT_MS", "DB_IDLE_IN_TRANSACTION_TIMEOUT_MS"),
+    "job": ("DB_JOB_STATEMENT_TIMEOUT_MS", "DB_JOB_IDLE_IN_TRANSACTION_TIMEOUT_MS"),
+    "export": ("DB_EXPORT_STATEMENT_TIMEOUT_MS", "DB_EXPORT_IDLE_IN_TRANSACTION_TIMEOUT_MS"),
+}
+
+_role = ContextVar("db_role", default=None)
+
+
+@contextmanager
+def db_role(role: str):
+    """Connections checked out inside the block get `role`'s timeouts."""
+    if role not in ROLES:
+        raise ValueError(f"unknown db role {role!r}")
+    token = _role.set(role)
+    try:
+        yield
+    finally:
+        _role.reset(token)
+
+
+class PoolStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.wait_seconds = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._lock = threading.Lock()
+        self._warned_at = 0.0
+
+    def observe_wait(self, seconds: float, warn_ms: float = 0):
+        ms = seconds * 1000
+        bucket = next((i for i, bound in enumerate(WAIT_BUCKETS_MS) if ms <= bound), len(WAIT_BUCKETS_MS))
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds += seconds
+            self.wait_buckets[bucket] += 1
+        if warn_ms and ms > warn_ms:
+            now = time.monotonic()
+            if now - self._warned_at >= 10:
+                self._warned_at = now
+                log.warning("pool %s: checkout waited %.0f ms", self.name, ms)
+
+    def count(self, what: str):
+        with self._lock:
+            setattr(self, what, getattr(self, what) + 1)
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            data = {
+                "pool": type(pool).__name__,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "wait_ms": {
+                    "sum": round(self.wait_seconds * 1000, 2),
+                    # cumulative, Prometheus-style: checkouts that waited at most `le` ms
+                    "buckets": [
+                        {"le": bound, "count": sum(self.wait_buckets[:i + 1])}
+                        for i, bound in enumerate([*WAIT_BUCKETS_MS, "inf"])
+                    ],
+                },
+            }
+        if isinstance(pool, QueuePool):
+            data.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+                "timeout_seconds": pool._timeout,
+            })
+        return data
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that times every checkout (including a new connection, when one is opened)."""
+
+    stats = None
+    warn_ms = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            if self.stats is not None:
+                self.stats.count("timeouts")
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            if self.stats is not None:
+                self.stats.observe_wait(waited, self.warn_ms)
+            if has_request_context():
+                sql = g.get("sql_stats")
+                if sql is not None:
+                    sql.pool_wait_seconds += waited
+
+    def recreate(self):
+        # engine.dispose() (e.g. after a fork) swaps in a new pool; keep counting into the same stats
+        pool = super().recreate()
+        pool.stats, pool.warn_ms = self.stats, self.warn_ms
+        return pool
+
+
+def default_pool_size(app, role: str) -> int:
+    """Connections one process needs at once: a request or job per thread, plus one for Core side work."""
+    config = app.config
+    if role == "job":
+        # each running job holds its lock connection and one to work with
+        return 2 * config.get("JOBS_MAX_CONCURRENT", 4) + 1
+    threads = config.get("SERVE_THREADS", 4) if config.get("SERVE_WORKER_CLASS") == "gthread" else 1
+    return threads + 1
+
+
+def _pooler_connect_args(uri: str) -> dict:
+    if uri.startswith("postgresql+psycopg:") or uri.startswith("postgresql+psycopg_async:"):
+        return {"prepare_threshold": None}
+    if uri.startswith("postgresql+asyncpg:"):
+        return {"statement_cache_size": 0}
+    return {}
+
+
+def _options(app, uri: str, role: str, pool_size: int, max_overflow: int, base: dict = None) -> dict:
+    options = dict(base or {})
+    if uri.startswith("sqlite"):
+        return options
+    config = app.config
+    options.update({
+        "poolclass": TimedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": config.get("DB_POOL_TIMEOUT", 10),
+        "pool_recycle": config.get("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": config.get("DB_POOL_PRE_PING", True),
+    })
+    if config.get("DB_POOLER_MODE") == "transaction":
+        options["connect_args"] = {**options.get("connect_args", {}), **_pooler_connect_args(uri)}
+    return options
+
+
+def configure(app, role: str = "web"):
+    """Engine options for the primary and every bind. Runs after replicas.configure, before db.init_app."""
+    config = app.config
+    if role not in ROLES:
+        raise ValueError(f"unknown db role {role!r}")
+    if config.get("DB_POOLER_MODE", "session") not in POOLER_MODES:
+        raise ValueError(f"DB_POOLER_MODE must be one of {', '.join(POOLER_MODES)}")
+    config["DB_ROLE"] = role
+    size = config.get("DB_POOL_SIZE") or default_pool_size(app, role)
+    overflow = config.get("DB_MAX_OVERFLOW", 5)
+    config["SQLALCHEMY_ENGINE_OPTIONS"] = _options(
+        app, config.get("SQLALCHEMY_DATABASE_URI") or "", role, size, overflow,
+        config.get("SQLALCHEMY_ENGINE_OPTIONS"),
+    )
+    binds = {}
+    for key, bind in (config.get("SQLALCHEMY_BINDS") or {}).items():
+        if isinstance(bind, str):
+            bind = {"url": bind}
+        binds[key] = _options(app, bind["url"], role, bind.get("pool_size", size),
+                              bind.get("max_overflow", overflow), bind)
+    config["SQLALCHEMY_BINDS"] = binds
+
+
+class PoolTelemetry:
+    def __init__(self):
+        self.role = "web"
+        self.pooler_mode = "session"
+        self.timeouts = {}
+        self._engines = {}
+
+    def init_app(self, app):
+        from .. import db
+        self.role = app.config.get("DB_ROLE", "web")
+        self.pooler_mode = app.config.get("DB_POOLER_MODE", "session")
+        self.timeouts = {role: (int(app.config.get(stmt, 0)), int(app.config.get(idle, 0)))
+                         for role, (stmt, idle) in ROLES.items()}
+        warn_ms = app.config.get("DB_POOL_WAIT_WARN_MS", 100)
+        with app.app_context():
+            self._engines = {key or "primary": engine for key, engine in db.engines.items()}
+        for name, engine in self._engines.items():
+            stats = PoolStats(name)
+            if isinstance(engine.pool, TimedQueuePool):
+                engine.pool.stats, engine.pool.warn_ms = stats, warn_ms
+            else:
+                engine.pool.stats = stats
+            event.listen(engine, "connect", lambda *_a, s=stats: s.count("connects"))
+            event.listen(engine, "invalidate", lambda *_a, s=stats: s.count("invalidations"))
+            if engine.dialect.name != "postgresql":
+                continue
+            if self.pooler_mode == "transaction":
+                event.listen(engine, "begin", self._set_local_timeouts)
+            else:
+                event.listen(engine, "checkout", self._set_session_timeouts)
+
+    def current_role(self) -> str:
+        return _role.get() or self.role
+
+    @staticmethod
+    def _sql(statement_ms: int, idle_ms: int, local: bool) -> str:
+        scope = "SET LOCAL" if local else "SET"
+        return f"{scope} statement_timeout = {statement_ms}; {scope} idle_in_transaction_session_timeout = {idle_ms}"
+
+    def _set_session_timeouts(self, dbapi_connection, connection_record, connection_proxy):
+        role = self.current_role()
+        if connection_record.info.get("db_role") == role:
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(self._sql(*self.timeouts[role], local=False))
+        finally:
+            cursor.close()
+        # committed, so a later rollback of the caller's transaction can't undo it
+        dbapi_connection.commit()
+        connection_record.info["db_role"] = role
+
+    def _set_local_timeouts(self, conn):
+        # the first statement of the transaction, so the pooler keeps it on one server connection
+        conn.exec_driver_sql(self._sql(*self.timeouts[self.current_role()], local=True))
+
+    def snapshot(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "role": self.role,
+            "pooler_mode": self.pooler_mode,
+            "pools": {
+                # pools other than TimedQueuePool (SQLite) lose their stats when recreated
+                name: (getattr(engine.pool, "stats", None) or PoolStats(name)).snapshot(engine.pool)
+                for name, engine in self._engines.items()
+            },
+        }
+
+
+pool_telemetry = PoolTelemetry()
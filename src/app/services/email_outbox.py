@@ -0,0 +1,279 @@
+"""Delivery of queued emails from the `email_outbox` table.
+
+Request handlers only insert outbox rows (services/email_service.queue_*), in
+the same transaction as the change that triggers them. `OutboxWorkerPool` runs
+N threads, each claiming a batch of due rows with `FOR UPDATE SKIP LOCKED`
+(so workers in any number of processes never pick the same row), leasing them
+as SENDING, and delivering them over one SMTP connection that stays open while
+there is work. Failed rows are retried with exponential backoff and marked
+FAILED after `EMAIL_OUTBOX_MAX_ATTEMPTS`. Rows whose lease expired (worker
+died mid-batch) become due again. A circuit breaker shared by the threads
+stops connecting for a cooldown after repeated server-level failures, then
+lets one probe through.
+"""
+import logging
+import smtplib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask_mail import Message
+from sqlalchemy import and_, or_, select
+
+from .. import db
+from ..models.email_outbox import EmailOutbox
+from .email_service import mail
+
+log = logging.getLogger(__name__)
+
+
+def _now_utc():
+    return datetime.now(timezone.utc)
+
+
+class CircuitBreaker:
+    """closed -> open after `threshold` consecutive failures -> half-open (one probe) after `cooldown`."""
+
+    def __init__(self, threshold: int = 5, cooldown_seconds: float = 60.0):
+        self.threshold = threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.cooldown_seconds:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def cancel_probe(self):
+        """The probe slot was granted but nothing was sent; let the next caller probe."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+
+# refusals of one message say nothing about the server's health; the row is still retried
+_MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+
+class OutboxWorkerPool:
+    def __init__(self):
+        self.workers = 2
+        self.batch_size = 20
+        self.max_attempts = 8
+        self.backoff_seconds = 30.0
+        self.backoff_max_seconds = 3600.0
+        self.poll_seconds = 2.0
+        self.lease_seconds = 120.0
+        self.retention_days = 7
+        self.breaker = CircuitBreaker()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def init_app(self, app):
+        cfg = app.config
+        self.workers = cfg.get("EMAIL_OUTBOX_WORKERS", self.workers)
+        self.batch_size = cfg.get("EMAIL_OUTBOX_BATCH_SIZE", self.batch_size)
+        self.max_attempts = cfg.get("EMAIL_OUTBOX_MAX_ATTEMPTS", self.max_attempts)
+        self.backoff_seconds = cfg.get("EMAIL_OUTBOX_BACKOFF_SECONDS", self.backoff_seconds)
+        self.backoff_max_seconds = cfg.get("EMAIL_OUTBOX_BACKOFF_MAX_SECONDS", self.backoff_max_seconds)
+        self.poll_seconds = cfg.get("EMAIL_OUTBOX_POLL_SECONDS", self.poll_seconds)
+        self.lease_seconds = cfg.get("EMAIL_OUTBOX_LEASE_SECONDS", self.lease_seconds)
+        self.retention_days = cfg.get("EMAIL_OUTBOX_RETENTION_DAYS", self.retention_days)
+        self.breaker = CircuitBreaker(
+            cfg.get("EMAIL_OUTBOX_BREAKER_THRESHOLD", 5),
+            cfg.get("EMAIL_OUTBOX_BREAKER_COOLDOWN_SECONDS", 60.0),
+        )
+
+    # database side (Core statements in short transactions of their own)
+
+    def claim_batch(self):
+        """Lease up to `batch_size` due rows to this worker and return them."""
+        table = EmailOutbox.__table__
+        now = _now_utc()
+        due = or_(
+            and_(table.c.status == "PENDING", table.c.next_attempt_at <= now),
+            and_(table.c.status == "SENDING", table.c.locked_until < now),
+        )
+        with db.engine.begin() as conn:
+            ids = conn.execute(
+                select(table.c.email_id)
+                .where(due)
+                .order_by(table.c.next_attempt_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            ).scalars().all()
+            if not ids:
+                return []
+            rows = conn.execute(
+                table.update()
+                .where(table.c.email_id.in_(ids))
+                .values(
+                    status="SENDING",
+                    locked_until=now + timedelta(seconds=self.lease_seconds),
+                    attempts=table.c.attempts + 1,
+                )
+                .returning(table.c.email_id, table.c.recipient, table.c.subject, table.c.html, table.c.attempts)
+            ).all()
+        return sorted(rows, key=lambda r: ids.index(r.email_id))
+
+    def mark_sent(self, ids):
+        if not ids:
+            return
+        table = EmailOutbox.__table__
+        with db.engine.begin() as conn:
+            conn.execute(
+                table.update()
+                .where(table.c.email_id.in_(ids))
+                .values(status="SENT", sent_at=_now_utc(), locked_until=None, last_error=None)
+            )
+
+    def mark_failed(self, row, error: str):
+        """Schedule a retry with exponential backoff, or give up after max attempts."""
+        table = EmailOutbox.__table__
+        delay = min(self.backoff_seconds * (2 ** (row.attempts - 1)), self.backoff_max_seconds)
+        values = {"locked_until": None, "last_error": error[:1000]}
+        if row.attempts >= self.max_attempts:
+            values["status"] = "FAILED"
+        else:
+            values["status"] = "PENDING"
+            values["next_attempt_at"] = _now_utc() + timedelta(seconds=delay)
+        with db.engine.begin() as conn:
+            conn.execute(table.update().where(table.c.email_id == row.email_id).values(**values))
+
+    def release(self, rows):
+        """Hand back leased rows that were never attempted, without charging an attempt."""
+        if not rows:
+            return
+        table = EmailOutbox.__table__
+        with db.engine.begin() as conn:
+            conn.execute(
+                table.update()
+                .where(table.c.email_id.in_([r.email_id for r in rows]))
+                .values(status="PENDING", locked_until=None, attempts=table.c.attempts - 1)
+            )
+
+    def purge_sent(self) -> int:
+        """Delete delivered rows older than `EMAIL_OUTBOX_RETENTION_DAYS`."""
+        table = EmailOutbox.__table__
+        cutoff = _now_utc() - timedelta(days=self.retention_days)
+        with db.engine.begin() as conn:
+            result = conn.execute(
+                table.delete().where(table.c.status == "SENT", table.c.sent_at < cutoff)
+            )
+        return result.rowcount
+
+    # SMTP side
+
+    def deliver(self, conn, rows):
+        """
+        Send `rows` over an open connection. Returns False if the server failed
+        (connection should be dropped); rows not yet attempted are released.
+        """
+        sent = []
+        try:
+            for i, row in enumerate(rows):
+                try:
+                    conn.send(Message(subject=row.subject, recipients=[row.recipient], html=row.html))
+                except _MESSAGE_ERRORS as e:
+                    self.mark_failed(row, repr(e))
+                    continue
+                except Exception as e:
+                    log.warning("email_outbox: send of %s failed: %r", row.email_id, e)
+                    self.breaker.record_failure()
+                    self.mark_failed(row, repr(e))
+                    self.release(rows[i + 1:])
+                    return False
+                sent.append(row.email_id)
+                self.breaker.record_success()
+        finally:
+            self.mark_sent(sent)
+        return True
+
+    def _work(self, app):
+        with app.app_context():
+            while not self._stop.is_set():
+                if not self.breaker.allow():
+                    self._stop.wait(self.poll_seconds)
+                    continue
+                try:
+                    batch = self.claim_batch()
+                    if not batch:
+                        # nothing was sent, so a granted probe proved nothing
+                        self.breaker.cancel_probe()
+                        self._stop.wait(self.poll_seconds)
+                        continue
+                    self._drain(batch)
+                except Exception:
+                    log.exception("email_outbox: worker loop error")
+                    # a probe that failed on our side (e.g. the claim) said nothing about SMTP;
+                    # without this the breaker would stay half-open with its one probe taken
+                    self.breaker.cancel_probe()
+                    self._stop.wait(self.poll_seconds)
+
+    def _drain(self, batch):
+        """Keep one connection open while there are due rows."""
+        try:
+            conn = mail.connect()
+            conn.__enter__()
+        except Exception as e:
+            log.warning("email_outbox: SMTP connect failed: %r", e)
+            self.breaker.record_failure()
+            self.release(batch)
+            return
+        try:
+            while batch and not self._stop.is_set():
+                if not self.deliver(conn, batch):
+                    return
+                batch = self.claim_batch()
+            self.release(batch)
+        finally:
+            try:
+                conn.__exit__(None, None, None)
+            except Exception:
+                pass
+
+    def start(self, app):
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._work, args=(app,), name=f"email-outbox-{n}", daemon=True)
+            for n in range(self.workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+
+outbox_workers = OutboxWorkerPool()
@@ -1,4 +1,4 @@
-from flask_mail import Mail, Message
+from flask_mail import Mail
 from flask import current_app, render_template_string
 
 mail = Mail()
@@ -35,20 +35,30 @@ PASSWORD_CHANGED_EMAIL_TEMPLATE = """
 <p>If it was you, no action is needed.</p>
 """
 
-def send_verification_email(user_email: str, code: str):
+def queue_email(recipient: str, subject: str, html: str):
     """
-    Send verification email to the user with a 6-digit code
+    Add an email to the outbox on the current session. It is delivered by the
+    outbox workers (services/email_outbox.py) only if the caller's transaction
+    commits, so request handlers never wait on SMTP.
     """
-    msg = Message(
+    from .. import db
+    from ..models.email_outbox import EmailOutbox
+    row = EmailOutbox(recipient=recipient, subject=subject, html=html)
+    db.session.add(row)
+    return row
+
+def queue_verification_email(user_email: str, code: str):
+    """
+    Queue verification email to the user with a 6-digit code
+    """
+    return queue_email(
+        user_email,
         'Verify your email address',
-        recipients=[user_email],
-        html=render_template_string(
+        render_template_string(
             VERIFICATION_EMAIL_TEMPLATE,
             verification_code=code
         )
     )
-    
-    mail.send(msg)
 
 def generate_verification_code() -> str:
     """
@@ -57,37 +67,35 @@ def generate_verification_code() -> str:
     from ..models.verification_tokens import VerificationToken
     return VerificationToken.generate_code()
 
-def send_password_reset_email(user_email: str, code: str):
+def queue_password_reset_email(user_email: str, code: str):
     """
-    Send password reset email with a 6-digit code
+    Queue password reset email with a 6-digit code
     """
-    msg = Message(
+    return queue_email(
+        user_email,
         'Reset your password',
-        recipients=[user_email],
-        html=render_template_string(
+        render_template_string(
             PASSWORD_RESET_EMAIL_TEMPLATE,
             reset_code=code
         )
     )
-    mail.send(msg)
 
-def send_password_changed_email(user_email: str, time_str: str, ip: str, ua: str):
+def queue_password_changed_email(user_email: str, time_str: str, ip: str, ua: str):
     """
-    Send password changed notification email with change details
+    Queue password changed notification email with change details
     
     """
     # Extract local part of email (before @) for greeting
     email_local = user_email.split('@')[0] if '@' in user_email else user_email
     
-    msg = Message(
+    return queue_email(
+        user_email,
         'Password Changed Notification',
-        recipients=[user_email],
-        html=render_template_string(
+        render_template_string(
             PASSWORD_CHANGED_EMAIL_TEMPLATE,
             email_local=email_local,
             timestamp=time_str,
             ip_address=ip,
             user_agent=ua
         )
-    )
-    mail.send(msg)
\ No newline at end of file
+    )
\ No newline at end of file
@@ -1,17 +1,60 @@
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, MultiFernet, InvalidToken
 import os
+import threading
+
+def _key_list(value: str):
+    return [k.strip() for k in (value or "").split(",") if k.strip()]
 
 class CardEncryption:
-    def __init__(self):
-        key = os.getenv("ENCRYPTION_KEY")
+    """
+    Card field cipher. ENCRYPTION_KEY encrypts; ENCRYPTION_OLD_KEYS (comma-separated)
+    are still accepted for decryption, so a key can be rotated while the app is live
+    and jobs/rotate_encryption_key.py re-encrypts the stored data in the background.
+    """
+    def __init__(self, key: str = None, old_keys: list = None):
+        key = key or os.getenv("ENCRYPTION_KEY")
         if not key:
             raise ValueError("ENCRYPTION_KEY not set in environment")
-        self.cipher = Fernet(key.encode() if isinstance(key, str) else key)
+        if old_keys is None:
+            old_keys = _key_list(os.getenv("ENCRYPTION_OLD_KEYS"))
+        self.keys = [key] + [k for k in old_keys if k != key]
+        fernets = [Fernet(k.encode() if isinstance(k, str) else k) for k in self.keys]
+        self.primary = fernets[0]
+        self.cipher = MultiFernet(fernets)
     
     def encrypt(self, plaintext: str) -> str:
-        """Encrypt a card field. Returns base64 string."""
+        """Encrypt a card field with the current key. Returns base64 string."""
         return self.cipher.encrypt(plaintext.encode()).decode()
     
     def decrypt(self, ciphertext: str) -> str:
-        """Decrypt a card field."""
-        return self.cipher.decrypt(ciphertext.encode()).decode()
\ No newline at end of file
+        """Decrypt a card field written under the current or any old key."""
+        return self.cipher.decrypt(ciphertext.encode()).decode()
+
+    def is_current(self, ciphertext: str) -> bool:
+        """True if the field is already encrypted with the current key."""
+        try:
+            self.primary.decrypt(ciphertext.encode())
+            return True
+        except InvalidToken:
+            return False
+
+    def rotate(self, ciphertext: str) -> str:
+        """Re-encrypt a field under the current key (keeps the original timestamp)."""
+        return self.cipher.rotate(ciphertext.encode()).decode()
+
+
+_card_encryption = None
+_card_encryption_lock = threading.Lock()
+
+def get_card_encryption() -> CardEncryption:
+    """
+    Process-wide CardEncryption. Fernet holds no per-call state, so one
+    instance is shared by every request and thread instead of re-deriving
+    the key for each card.
+    """
+    global _card_encryption
+    if _card_encryption is None:
+        with _card_encryption_lock:
+            if _card_encryption is None:
+                _card_encryption = CardEncryption()
+    return _card_encryption
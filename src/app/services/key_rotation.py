@@ -0,0 +1,206 @@
+"""Re-encryption of stored card fields after an encryption key rotation.
+
+`reencrypt_billing_info` walks `billing_info` in primary-key order (keyset
+pagination, one short query per chunk, no long transaction). Chunks go to a
+process pool, where each field not yet under the current key is rotated. The
+results are written back in id order, one batched UPDATE per chunk. Each row
+is guarded by its old ciphertext, so a card edited meanwhile (and therefore
+already written under the new key) is left alone.
+
+The job is idempotent: fields already under the current key are skipped after
+one HMAC check, so an interrupted run can simply be restarted, or resumed
+with `after=` the last id it reported.
+
+Pool processes are started with "spawn", so callers need the usual
+`if __name__ == "__main__":` guard.
+
+`backfill_display_fields` fills the plaintext display columns (last 4 digits,
+expiry) of rows written before they existed, in the same keyset chunks.
+"""
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import bindparam, cast, column, or_, select, values
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.types import String
+
+from .. import db
+from ..models.billing_info import BillingInfo
+from .encryption import CardEncryption, get_card_encryption
+
+ENCRYPTED_COLUMNS = ("card_number", "card_exp", "cardholder_name")
+
+_worker_cipher = None
+
+
+def _init_worker(keys):
+    global _worker_cipher
+    _worker_cipher = CardEncryption(keys[0], keys[1:])
+
+
+def _rotate_rows(rows):
+    """
+    rows: [(billing_info_id, card_number, card_exp, cardholder_name)].
+    Returns (updates, skipped, failed); each update is (id, old values, new values).
+    """
+    updates, skipped, failed = [], 0, 0
+    for row in rows:
+        old = row[1:]
+        try:
+            new = tuple(v if not v or _worker_cipher.is_current(v) else _worker_cipher.rotate(v) for v in old)
+        except Exception:
+            failed += 1  # not decryptable with any configured key
+            continue
+        if new == old:
+            skipped += 1
+        else:
+            updates.append((row[0], old, new))
+    return updates, skipped, failed
+
+
+def _write_batch(conn, updates) -> int:
+    """Apply one chunk of rotated values in a single statement; returns rows written."""
+    table = BillingInfo.__table__
+    if conn.dialect.name == "postgresql":
+        names = ["b_id"] + [f"old_{c}" for c in ENCRYPTED_COLUMNS] + [f"new_{c}" for c in ENCRYPTED_COLUMNS]
+        data = values(*[column(n, String) for n in names], name="v").data(
+            [(str(b_id), *old, *new) for b_id, old, new in updates]
+        )
+        stmt = (
+            table.update()
+            .where(table.c.billing_info_id == cast(data.c.b_id, UUID(as_uuid=True)))
+            .where(*[table.c[c] == data.c[f"old_{c}"] for c in ENCRYPTED_COLUMNS])
+            .values({c: data.c[f"new_{c}"] for c in ENCRYPTED_COLUMNS})
+        )
+        return conn.execute(stmt).rowcount
+
+    # other dialects (e.g. SQLite in development) have no UPDATE ... FROM (VALUES ...); use executemany
+    stmt = (
+        table.update()
+        .where(table.c.billing_info_id == bindparam("b_id"))
+        .where(*[table.c[c] == bindparam(f"old_{c}") for c in ENCRYPTED_COLUMNS])
+        .values({c: bindparam(f"new_{c}") for c in ENCRYPTED_COLUMNS})
+    )
+    params = []
+    for b_id, old, new in updates:
+        p = {"b_id": b_id}
+        p.update({f"old_{c}": v for c, v in zip(ENCRYPTED_COLUMNS, old)})
+        p.update({f"new_{c}": v for c, v in zip(ENCRYPTED_COLUMNS, new)})
+        params.append(p)
+    return conn.execute(stmt, params).rowcount
+
+
+def _chunks(chunk_size: int, after=None):
+    table = BillingInfo.__table__
+    while True:
+        query = select(table.c.billing_info_id, *[table.c[c] for c in ENCRYPTED_COLUMNS])
+        if after is not None:
+            query = query.where(table.c.billing_info_id > after)
+        with db.engine.connect() as conn:
+            rows = [tuple(r) for r in conn.execute(query.order_by(table.c.billing_info_id).limit(chunk_size))]
+        if not rows:
+            return
+        yield rows
+        after = rows[-1][0]
+
+
+def reencrypt_billing_info(workers: int = 2, chunk_size: int = 1000, after=None,
+                           report=print, report_every_seconds: float = 5.0) -> dict:
+    """Rotate every encrypted card field to the current ENCRYPTION_KEY. Returns the totals."""
+    keys = get_card_encryption().keys
+    stats = {"scanned": 0, "rotated": 0, "skipped": 0, "conflicts": 0, "failed": 0, "last_id": after}
+    started = time.perf_counter()
+    next_report = started + report_every_seconds
+
+    def _progress(final=False):
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        report(
+            f"{'done' if final else 'progress'}: scanned={stats['scanned']} rotated={stats['rotated']} "
+            f"skipped={stats['skipped']} conflicts={stats['conflicts']} failed={stats['failed']} "
+            f"| {stats['scanned'] / elapsed:,.0f} rows/s, {stats['rotated'] / elapsed:,.0f} rotated/s "
+            f"| through id {stats['last_id']}"
+        )
+
+    def _finish(rows, future):
+        updates, skipped, failed = future.result()
+        written = 0
+        if updates:
+            with db.engine.begin() as conn:
+                written = _write_batch(conn, updates)
+        stats["scanned"] += len(rows)
+        stats["rotated"] += written
+        stats["conflicts"] += len(updates) - written
+        stats["skipped"] += skipped
+        stats["failed"] += failed
+        stats["last_id"] = rows[-1][0]
+
+    with ProcessPoolExecutor(
+        max_workers=max(workers, 1),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(keys,),
+    ) as pool:
+        in_flight = deque()
+        for rows in _chunks(chunk_size, after):
+            in_flight.append((rows, pool.submit(_rotate_rows, rows)))
+            # keep every worker busy, but write back strictly in id order so last_id is a safe resume point
+            while len(in_flight) > workers * 2 or (in_flight and in_flight[0][1].done()):
+                _finish(*in_flight.popleft())
+            if time.perf_counter() >= next_report:
+                next_report = time.perf_counter() + report_every_seconds
+                _progress()
+        while in_flight:
+            _finish(*in_flight.popleft())
+
+    stats["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    _progress(final=True)
+    return stats
+
+
+def backfill_display_fields(chunk_size: int = 1000, report=print) -> dict:
+    """
+    Fill card_last4 / card_exp_month / card_exp_year where they are still NULL (rows the
+    f8b0d2e4a6c9 migration could not backfill). One chunk per transaction; rows that do not
+    decrypt with any configured key are counted and left NULL. Safe to re-run.
+    """
+    table = BillingInfo.__table__
+    cipher = get_card_encryption()
+    stats = {"scanned": 0, "filled": 0, "failed": 0}
+    after = None
+    while True:
+        query = (
+            select(table.c.billing_info_id, table.c.card_number, table.c.card_exp)
+            .where(or_(table.c.card_last4.is_(None), table.c.card_exp_month.is_(None),
+                       table.c.card_exp_year.is_(None)))
+        )
+        if after is not None:
+            query = query.where(table.c.billing_info_id > after)
+        with db.engine.connect() as conn:
+            rows = conn.execute(query.order_by(table.c.billing_info_id).limit(chunk_size)).fetchall()
+        if not rows:
+            break
+        params = []
+        for b_id, card_number, card_exp in rows:
+            try:
+                mm, yy = cipher.decrypt(card_exp).split("/")
+                params.append({"b_id": b_id, "last4": cipher.decrypt(card_number)[-4:],
+                               "month": int(mm), "year": 2000 + int(yy)})
+            except Exception:
+                stats["failed"] += 1
+        if params:
+            with db.engine.begin() as conn:
+                conn.execute(
+                    table.update()
+                    .where(table.c.billing_info_id == bindparam("b_id"))
+                    .values(card_last4=bindparam("last4"), card_exp_month=bindparam("month"),
+                            card_exp_year=bindparam("year")),
+                    params,
+                )
+        stats["scanned"] += len(rows)
+        stats["filled"] += len(params)
+        after = rows[-1][0]
+        report(f"progress: scanned={stats['scanned']} filled={stats['filled']} failed={stats['failed']} "
+               f"| through id {after}")
+    return stats
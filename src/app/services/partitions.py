@@ -0,0 +1,167 @@
+"""Monthly range partitions for `bookings`, `tickets` and `seat_holds` (Postgres).
+
+Each table is declared `PARTITION BY RANGE` on a timestamp: bookings and
+seat_holds on `created_at`, tickets on `booking_created_at` (a copy of their
+booking's `created_at`, so a booking and its tickets land in the same month).
+The partitions are `<table>_pYYYY_MM`, covering one UTC month each, plus
+`<table>_default` for anything outside them. The default partition should
+stay empty: Postgres refuses to create a month while the default holds rows
+for it, so `ensure_partitions` reports that instead of failing.
+
+An insert only touches the current month's (small, cache-resident) indexes,
+and lookups that carry the timestamp are pruned to one partition. Retention
+detaches or drops whole months, a catalog change instead of a DELETE that
+rewrites indexes and leaves bloat behind.
+
+The `maintain_partitions` job (jobs/tasks.py) keeps PARTITION_MONTHS_AHEAD
+months created ahead of time and applies the retention settings daily.
+"""
+import re
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+
+# table -> partition key column
+PARTITIONED = {
+    "bookings": "created_at",
+    "tickets": "booking_created_at",
+    "seat_holds": "created_at",
+}
+
+# tickets reference bookings, so their partitions are always removed first
+_RETENTION_ORDER = ("tickets", "bookings", "seat_holds")
+
+RETENTION_MODES = ("detach", "drop")
+
+_MONTH_SUFFIX = re.compile(r"_p(\d{4})_(\d{2})$")
+
+
+def month_start(ts: datetime = None) -> datetime:
+    ts = ts or datetime.now(timezone.utc)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, n: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + n
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_p{month.year:04d}_{month.month:02d}"
+
+
+def create_partition_sql(table: str, month: datetime) -> str:
+    lo, hi = month, add_months(month, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{lo.isoformat()}') TO ('{hi.isoformat()}')"
+    )
+
+
+def create_default_sql(table: str) -> str:
+    return f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"
+
+
+def list_partitions(conn, table: str):
+    """[(partition name, its month or None for the default)] of `table`, oldest first."""
+    names = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :table"
+    ), {"table": table}).scalars().all()
+    parts = []
+    for name in names:
+        m = _MONTH_SUFFIX.search(name)
+        parts.append((name, datetime(int(m[1]), int(m[2]), 1, tzinfo=timezone.utc) if m else None))
+    return sorted(parts, key=lambda p: (p[1] is not None, p[1] or datetime.min.replace(tzinfo=timezone.utc)))
+
+
+def _lock_timeout(conn, ms: int):
+    # DDL on a parent waits behind long queries, and inserts queue behind the DDL;
+    # give up quickly and retry on the next run rather than stall an on-sale
+    conn.execute(text(f"SET LOCAL lock_timeout = '{int(ms)}ms'"))
+
+
+def ensure_partitions(engine, months_ahead: int = 3, now: datetime = None, lock_timeout_ms: int = 5000,
+                      report=print) -> list:
+    """
+    Create the current month and the next `months_ahead` for every partitioned
+    table (each in its own short transaction), plus the default partitions.
+    Returns the names created.
+    """
+    first = month_start(now)
+    created = []
+    for table, column in PARTITIONED.items():
+        with engine.begin() as conn:
+            existing = {name for name, _ in list_partitions(conn, table)}
+        if f"{table}_default" not in existing:
+            with engine.begin() as conn:
+                _lock_timeout(conn, lock_timeout_ms)
+                conn.execute(text(create_default_sql(table)))
+            created.append(f"{table}_default")
+        for i in range(months_ahead + 1):
+            month = add_months(first, i)
+            name = partition_name(table, month)
+            if name in existing:
+                continue
+            with engine.begin() as conn:
+                stray = conn.execute(text(
+                    f"SELECT count(*) FROM {table}_default WHERE {column} >= :lo AND {column} < :hi"
+                ), {"lo": month, "hi": add_months(month, 1)}).scalar()
+                if stray:
+                    report(f"WARNING: {table}_default holds {stray} rows for {month:%Y-%m}; "
+                           f"move them out before {name} can be created")
+                    continue
+                _lock_timeout(conn, lock_timeout_ms)
+                conn.execute(text(create_partition_sql(table, month)))
+            created.append(name)
+            report(f"created {name}")
+    return created
+
+
+def expired_partitions(conn, table: str, keep_months: int, now: datetime = None) -> list:
+    """Month partitions of `table` entirely older than the current month minus `keep_months`."""
+    cutoff = add_months(month_start(now), -keep_months)
+    return [name for name, month in list_partitions(conn, table) if month is not None and month < cutoff]
+
+
+def apply_retention(engine, keep_months: dict, mode: str = "detach", now: datetime = None,
+                    lock_timeout_ms: int = 5000, report=print) -> list:
+    """
+    Detach (mode="detach": the table stays, for archiving and a manual DROP)
+    or drop the expired month partitions. `keep_months` maps table -> months
+    to keep; tables missing from it, or mapped to 0/None, are kept forever.
+    Bookings and tickets must share one setting, or the foreign key would
+    block removing a bookings month whose tickets are still attached.
+    Returns the partitions removed.
+    """
+    if mode not in RETENTION_MODES:
+        raise ValueError(f"retention mode must be one of {', '.join(RETENTION_MODES)}")
+    if (keep_months.get("tickets") or 0) != (keep_months.get("bookings") or 0):
+        raise ValueError("tickets and bookings need the same retention")
+
+    removed = []
+    for table in _RETENTION_ORDER:
+        keep = keep_months.get(table)
+        if not keep:
+            continue
+        with engine.begin() as conn:
+            expired = expired_partitions(conn, table, keep, now)
+        for name in expired:
+            with engine.begin() as conn:
+                _lock_timeout(conn, lock_timeout_ms)
+                # detached first in both modes: a bookings month can't be dropped
+                # while it is still a partition the tickets foreign key points at
+                conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                if table == "tickets":
+                    # the detached table keeps a copy of the foreign key, which
+                    # would stop the matching bookings month from being detached
+                    conn.execute(text(f"ALTER TABLE {name} DROP CONSTRAINT IF EXISTS fk_tickets_booking"))
+                if mode == "drop":
+                    conn.execute(text(f"DROP TABLE {name}"))
+            removed.append(name)
+            report(f"{'dropped' if mode == 'drop' else 'detached'} {name}")
+    return removed
@@ -0,0 +1,102 @@
+"""Password hashing on a bounded process pool.
+
+Hashing is deliberately CPU-heavy. Running it inline pins a request worker
+for the whole computation, so a burst of logins starves every other endpoint.
+`password_hasher` hands the work to a small pool of processes sized by
+`PASSWORD_HASH_WORKERS`. At most `PASSWORD_HASH_MAX_PENDING` hashes may be
+queued or running at once; beyond that `HashingOverloaded` is raised, which the
+app turns into a 503 so clients back off instead of piling up.
+
+`PASSWORD_HASH_METHOD` is any werkzeug method string, e.g. "scrypt:32768:8:1"
+or "pbkdf2:sha256:600000". Stored hashes made with different parameters are
+upgraded on the next successful login (see `needs_rehash`).
+
+Pool processes are started with "spawn" (never a fork of a threaded web
+worker), so scripts that hash passwords need the usual
+`if __name__ == "__main__":` guard.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class HashingOverloaded(Exception):
+    """Too many hashes in flight (or one took too long); the request should be retried later."""
+
+
+class PasswordHasher:
+    def __init__(self, method: str = "scrypt", workers: int = 0, max_pending: int = 0, timeout_seconds: float = 10.0):
+        self.method = method
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout_seconds = timeout_seconds
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(max_pending or workers * 4, 1))
+        self._method_prefix = None
+
+    def init_app(self, app):
+        self.shutdown()
+        self.method = app.config.get("PASSWORD_HASH_METHOD", self.method)
+        self.workers = app.config.get("PASSWORD_HASH_WORKERS", self.workers)
+        self.max_pending = app.config.get("PASSWORD_HASH_MAX_PENDING", self.max_pending) or self.workers * 4
+        self.timeout_seconds = app.config.get("PASSWORD_HASH_TIMEOUT_SECONDS", self.timeout_seconds)
+        self._slots = threading.BoundedSemaphore(max(self.max_pending, 1))
+        self._method_prefix = None
+
+    def _pool(self):
+        # (re)create lazily so every forked web worker gets its own pool
+        if self._executor is None or self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._executor_pid != os.getpid():
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                    self._executor_pid = os.getpid()
+        return self._executor
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise HashingOverloaded("password hashing queue is full")
+        try:
+            future = self._pool().submit(fn, *args)
+        except BaseException:
+            slots.release()
+            raise
+        # the slot frees when the hash does: a timed-out hash that is already running keeps its process busy
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout_seconds)
+        except FutureTimeoutError:
+            future.cancel()
+            raise HashingOverloaded("password hashing timed out")
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash: str, password: str) -> bool:
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash: str) -> bool:
+        """True if `pwhash` was made with different parameters than the configured method."""
+        if self._method_prefix is None:
+            # werkzeug fills in defaults ("scrypt" -> "scrypt:32768:8:1"); hash once to learn them
+            self._method_prefix = generate_password_hash("", self.method).split("$", 1)[0]
+        return pwhash.split("$", 1)[0] != self._method_prefix
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._executor_pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._executor_pid = None
+
+
+password_hasher = PasswordHasher()
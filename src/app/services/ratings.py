@@ -0,0 +1,65 @@
+"""Incremental maintenance of `movie_rating_summary`.
+
+Every review write calls `apply_rating_change` inside the same session
+transaction, so the aggregate commits (or rolls back) together with the review.
+The upsert is a single atomic statement, so concurrent reviews of the same
+movie never lose updates.
+"""
+from sqlalchemy.dialects.postgresql import insert
+
+from .. import db
+from ..models.movie_rating_summary import MovieRatingSummary
+
+RATING_VALUES = (1, 2, 3, 4, 5)
+
+
+def _bucket(rating: int) -> str:
+    return f"count_{rating}"
+
+
+def apply_rating_change(movie_id: int, old_rating: int | None = None, new_rating: int | None = None):
+    """
+    Fold one review write into the summary row for `movie_id`.
+      create: old_rating=None, new_rating=r
+      update: old_rating=a,    new_rating=b
+      delete: old_rating=r,    new_rating=None
+    """
+    if old_rating == new_rating:
+        return
+
+    deltas = {"rating_count": 0, "rating_sum": 0}
+    if old_rating is not None:
+        deltas["rating_count"] -= 1
+        deltas["rating_sum"] -= old_rating
+        deltas[_bucket(old_rating)] = deltas.get(_bucket(old_rating), 0) - 1
+    if new_rating is not None:
+        deltas["rating_count"] += 1
+        deltas["rating_sum"] += new_rating
+        deltas[_bucket(new_rating)] = deltas.get(_bucket(new_rating), 0) + 1
+
+    table = MovieRatingSummary.__table__
+    stmt = insert(table).values(movie_id=movie_id, **{k: max(v, 0) for k, v in deltas.items()})
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.movie_id],
+        set_={k: table.c[k] + v for k, v in deltas.items() if v},
+    )
+    db.session.execute(stmt)
+
+    # keep an already-loaded summary in the identity map consistent with the row
+    summary = db.session.identity_map.get(db.session.identity_key(MovieRatingSummary, (movie_id,)))
+    if summary is not None:
+        db.session.expire(summary)
+
+
+def summary_to_dict(summary: MovieRatingSummary | None):
+    if summary is None or not summary.rating_count:
+        return {
+            "count": 0,
+            "average": None,
+            "histogram": {str(r): 0 for r in RATING_VALUES},
+        }
+    return {
+        "count": summary.rating_count,
+        "average": summary.average,
+        "histogram": summary.histogram,
+    }
@@ -0,0 +1,209 @@
+"""Read replicas for read-only request handlers.
+
+With DATABASE_REPLICA_URIS set, each replica gets its own engine (the bind
+`replica_<n>`) and its own pool (REPLICA_POOL_SIZE / REPLICA_MAX_OVERFLOW,
+pre-ping on checkout). Views wrapped in `@read_only` (middleware/read_only.py)
+run their ORM reads on a healthy replica, round-robin. Everything else goes
+to the primary, including any flush, even one made inside a read-only view.
+
+Health is tracked per replica, per worker process. A checker thread asks
+each replica for its replay lag every REPLICA_CHECK_SECONDS. A replica that
+fails, or is more than REPLICA_MAX_LAG_SECONDS behind, is skipped until a
+later check passes. A connection error while serving a request takes it out
+at once. Replicas start out unchecked and unused, and with none healthy,
+reads go to the primary.
+
+Read-your-writes: a request that writes (a successful non-GET, or any flush)
+sets the REPLICA_PIN_COOKIE cookie for REPLICA_PIN_SECONDS, and read-only
+requests that carry it stay on the primary. A user therefore sees their own
+review or booking at once, on any worker, however far (within the lag
+limit) the replicas are behind. Keep the pin longer than the lag limit plus
+the check interval.
+"""
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, exc, text
+
+log = logging.getLogger(__name__)
+
+_SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# seconds of WAL not yet replayed; 0 when fully caught up (an idle primary writes
+# no new transactions, so the replay timestamp alone would look ever older)
+_LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
+class RoutingSession(Session):
+    """`db.session` class: default-bind reads go to the replica chosen for the request."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is None and not self._flushing and has_request_context():
+            key = g.get("db_replica")
+            if key is not None and engine is self._db.engine:
+                return self._db.engines[key]
+        return engine
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_write(session, flush_context):
+    if has_request_context():
+        g.db_wrote = True
+
+
+class ReplicaSet:
+    def __init__(self):
+        self.keys = []
+        self.check_seconds = 5.0
+        self.max_lag_seconds = 5.0
+        self.pin_seconds = 10.0
+        self.pin_cookie = "db_pin"
+        self.cookie_secure = False
+        self._engines = {}
+        self._state = {}       # key -> (healthy, lag seconds or None, checked at)
+        self._next = 0
+        self._lock = threading.Lock()
+        self._checker_pid = None
+
+    def configure(self, app):
+        """Add a bind per replica URI. Runs before db.init_app, which creates the engines."""
+        binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+        self.keys = []
+        for n, uri in enumerate(app.config.get("DATABASE_REPLICA_URIS") or []):
+            options = {
+                "url": uri,
+                "pool_size": app.config.get("REPLICA_POOL_SIZE", 5),
+                "max_overflow": app.config.get("REPLICA_MAX_OVERFLOW", 5),
+                "pool_pre_ping": True,
+            }
+            if uri.startswith("postgresql"):
+                # a replica that is down should fail fast, not hold the request
+                options["connect_args"] = {"connect_timeout": app.config.get("REPLICA_CONNECT_TIMEOUT", 3)}
+            binds[f"replica_{n}"] = options
+            self.keys.append(f"replica_{n}")
+        app.config["SQLALCHEMY_BINDS"] = binds
+
+    def init_app(self, app):
+        from .. import db
+        self.check_seconds = app.config.get("REPLICA_CHECK_SECONDS", self.check_seconds)
+        self.max_lag_seconds = app.config.get("REPLICA_MAX_LAG_SECONDS", self.max_lag_seconds)
+        self.pin_seconds = app.config.get("REPLICA_PIN_SECONDS", self.pin_seconds)
+        self.pin_cookie = app.config.get("REPLICA_PIN_COOKIE", self.pin_cookie)
+        self.cookie_secure = app.config.get("JWT_COOKIE_SECURE", False)
+        self._state = {}
+        if not self.keys:
+            return
+        with app.app_context():
+            self._engines = {key: db.engines[key] for key in self.keys}
+        for key, engine in self._engines.items():
+            event.listen(engine, "handle_error", self._on_error(key))
+        app.after_request(self._pin_writer)
+
+    # routing
+
+    def choose(self):
+        """Bind key of the replica for this request, or None for the primary."""
+        if not self.keys:
+            return None
+        self._ensure_checker()
+        pinned = request.cookies.get(self.pin_cookie)
+        if pinned:
+            try:
+                if float(pinned) > time.time():
+                    return None
+            except ValueError:
+                pass
+        healthy = [k for k in self.keys if self._state.get(k, (False,))[0]]
+        if not healthy:
+            return None
+        with self._lock:
+            self._next += 1
+            return healthy[self._next % len(healthy)]
+
+    def read_engine(self):
+        """Engine for Core reads in this request: its replica if it has one, else the primary."""
+        from .. import db
+        key = g.get("db_replica") if has_request_context() else None
+        return db.engines[key] if key is not None else db.engine
+
+    @contextmanager
+    def primary(self):
+        """Send the reads inside the block to the primary, even in a read-only view."""
+        if not has_request_context():
+            yield
+            return
+        key = g.pop("db_replica", None)
+        try:
+            yield
+        finally:
+            if key is not None:
+                g.db_replica = key
+
+    def _pin_writer(self, response):
+        wrote = g.pop("db_wrote", False) or (request.method not in _SAFE_METHODS and response.status_code < 400)
+        if wrote:
+            response.set_cookie(
+                self.pin_cookie, f"{time.time() + self.pin_seconds:.0f}", max_age=int(self.pin_seconds) + 1,
+                httponly=True, secure=self.cookie_secure, samesite="Lax",
+            )
+        return response
+
+    # health
+
+    def status(self):
+        return {key: {"healthy": s[0], "lag_seconds": s[1]} for key, s in self._state.items()}
+
+    def check(self, key: str) -> bool:
+        engine = self._engines[key]
+        try:
+            with engine.connect() as conn:
+                sql = _LAG_SQL if engine.dialect.name == "postgresql" else "SELECT 0"
+                lag = float(conn.execute(text(sql)).scalar() or 0)
+            healthy = lag <= self.max_lag_seconds
+        except Exception as e:
+            lag, healthy = None, False
+            log.debug("replica %s check failed: %r", key, e)
+        previous = self._state.get(key)
+        if previous is None or previous[0] != healthy:
+            log.warning("replica %s is %s (lag %s s)", key, "healthy" if healthy else "unavailable", lag)
+        self._state[key] = (healthy, lag, time.monotonic())
+        return healthy
+
+    def _on_error(self, key):
+        def handle(context):
+            if context.is_disconnect or isinstance(context.sqlalchemy_exception, exc.OperationalError):
+                if self._state.get(key, (False,))[0]:
+                    log.warning("replica %s taken out after %r", key, context.original_exception)
+                self._state[key] = (False, None, time.monotonic())
+        return handle
+
+    def _ensure_checker(self):
+        # started lazily, so each forked worker runs its own
+        if self._checker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._checker_pid == os.getpid():
+                return
+            self._checker_pid = os.getpid()
+            threading.Thread(target=self._check_forever, name="replica-health", daemon=True).start()
+
+    def _check_forever(self):
+        while True:
+            for key in self.keys:
+                self.check(key)
+            time.sleep(self.check_seconds)
+
+
+replicas = ReplicaSet()
@@ -0,0 +1,208 @@
+"""Revenue and attendance rollups behind `GET /api/v1/admin/reports/*`.
+
+`revenue_hourly` and `revenue_daily` hold net confirmed bookings, tickets and
+`total_cents` per showtime hour/day (UTC), movie and auditorium. They are
+maintained the same way as `movie_rating_summary`: whatever code moves a
+booking into or out of CONFIRMED calls `apply_booking_status_change` in the
+same transaction, and each table gets one atomic upsert of the deltas. The
+reports only ever read these tables, so their cost depends on the number of
+days x movies x auditoriums in the range, not on how many tickets were sold.
+
+`rebuild_rollups` recomputes a range of days from `bookings`/`tickets` (first
+load, or repair after a bug). Old showtimes are deleted by
+`jobs/showtimes_jobs.py`, and their bookings go with them, but rows already
+in the rollups stay. So rebuild only ranges whose showtimes still exist.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import Date, cast, func, literal_column, select, text
+from sqlalchemy.dialects.postgresql import insert
+
+from .. import db
+from ..models.auditorium import Auditorium
+from ..models.bookings import Booking
+from ..models.movie import Movie
+from ..models.revenue_rollups import RevenueDaily, RevenueHourly
+from ..models.showtimes import Showtime
+from ..models.tickets import Ticket
+
+COUNTED_STATUS = "CONFIRMED"
+MEASURES = ("bookings", "tickets", "revenue_cents")
+
+
+def _hour(ts: datetime) -> datetime:
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def _upsert(model, key: dict, deltas: dict):
+    table = model.__table__
+    stmt = insert(table).values(**key, **deltas)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c[k] for k in key],
+        set_={**{k: table.c[k] + v for k, v in deltas.items()}, "updated_at": func.now()},
+    )
+    db.session.execute(stmt)
+
+
+def apply_booking_status_change(booking: Booking, old_status: str | None, new_status: str | None):
+    """
+    Fold one booking status change into the rollups. Call it in the session
+    transaction that changes the status, once the booking's tickets are
+    added, e.g.
+      confirm: old_status="PENDING",   new_status="CONFIRMED"
+      cancel:  old_status="CONFIRMED", new_status="CANCELLED"
+      delete:  old_status=<status>,    new_status=None
+    Changes that don't cross CONFIRMED are ignored.
+    """
+    was, now = old_status == COUNTED_STATUS, new_status == COUNTED_STATUS
+    if was == now:
+        return
+    sign = 1 if now else -1
+
+    ticket_count = (
+        select(func.count(Ticket.ticket_id))
+        # the partition key too, so only the booking's own month is searched
+        .where(Ticket.booking_id == booking.booking_id, Ticket.booking_created_at == booking.created_at)
+        .scalar_subquery()
+    )
+    row = db.session.execute(
+        select(Showtime.movie_id, Showtime.auditorium_id, Showtime.starts_at, ticket_count)
+        .where(Showtime.showtime_id == booking.showtime_id)
+    ).one_or_none()
+    if row is None:
+        return
+    movie_id, auditorium_id, starts_at, tickets = row
+
+    deltas = {"bookings": sign, "tickets": sign * tickets, "revenue_cents": sign * booking.total_cents}
+    hour = _hour(starts_at)
+    _upsert(RevenueHourly, {"bucket_start": hour, "movie_id": movie_id, "auditorium_id": auditorium_id}, deltas)
+    _upsert(RevenueDaily, {"day": hour.date(), "movie_id": movie_id, "auditorium_id": auditorium_id}, deltas)
+
+
+# rebuild from the source tables
+
+def _utc_midnight(d: date) -> datetime:
+    return datetime.combine(d, time.min, tzinfo=timezone.utc)
+
+
+def _rebuild_window(conn, lo: datetime, hi: datetime):
+    hourly, daily = RevenueHourly.__table__, RevenueDaily.__table__
+    # live upserts for these rows wait until the window is rebuilt instead of being lost
+    conn.execute(text("LOCK TABLE revenue_hourly, revenue_daily IN SHARE ROW EXCLUSIVE MODE"))
+    conn.execute(hourly.delete().where(hourly.c.bucket_start >= lo, hourly.c.bucket_start < hi))
+    conn.execute(daily.delete().where(daily.c.day >= lo.date(), daily.c.day < hi.date()))
+
+    in_window = (Showtime.starts_at >= lo, Showtime.starts_at < hi)
+    # tickets reached through their own showtime_id index, not a scan of every ticket
+    ticket_counts = (
+        select(Ticket.booking_id, Ticket.booking_created_at, func.count(Ticket.ticket_id).label("n"))
+        .join(Showtime, Showtime.showtime_id == Ticket.showtime_id)
+        .where(*in_window)
+        .group_by(Ticket.booking_id, Ticket.booking_created_at)
+        .subquery()
+    )
+    # literals rather than bind parameters, so the SELECT and GROUP BY expressions match
+    utc, hour_unit = literal_column("'UTC'"), literal_column("'hour'")
+    hour = func.timezone(utc, func.date_trunc(hour_unit, func.timezone(utc, Showtime.starts_at)))
+    conn.execute(hourly.insert().from_select(
+        ["bucket_start", "movie_id", "auditorium_id", *MEASURES],
+        select(
+            hour, Showtime.movie_id, Showtime.auditorium_id,
+            func.count(Booking.booking_id),
+            func.coalesce(func.sum(ticket_counts.c.n), 0),
+            func.coalesce(func.sum(Booking.total_cents), 0),
+        )
+        .select_from(Booking)
+        .join(Showtime, Showtime.showtime_id == Booking.showtime_id)
+        .outerjoin(ticket_counts, (ticket_counts.c.booking_id == Booking.booking_id)
+                   & (ticket_counts.c.booking_created_at == Booking.created_at))
+        .where(Booking.status == COUNTED_STATUS, *in_window)
+        .group_by(hour, Showtime.movie_id, Showtime.auditorium_id),
+    ))
+
+    day = cast(func.timezone(utc, hourly.c.bucket_start), Date)
+    conn.execute(daily.insert().from_select(
+        ["day", "movie_id", "auditorium_id", *MEASURES],
+        select(day, hourly.c.movie_id, hourly.c.auditorium_id, *[func.sum(hourly.c[m]) for m in MEASURES])
+        .where(hourly.c.bucket_start >= lo, hourly.c.bucket_start < hi)
+        .group_by(day, hourly.c.movie_id, hourly.c.auditorium_id),
+    ))
+
+
+def rebuild_rollups(start: date = None, end: date = None, days_per_batch: int = 7, report=print) -> int:
+    """
+    Recompute both rollups for showtime days [start, end) (UTC), replacing what
+    is there. Defaults to the span of the existing showtimes. Each batch of
+    days is its own short transaction. Returns the number of days rebuilt.
+    """
+    if start is None or end is None:
+        first, last = db.session.query(func.min(Showtime.starts_at), func.max(Showtime.starts_at)).one()
+        db.session.rollback()
+        if first is None:
+            report("no showtimes; nothing to rebuild")
+            return 0
+        start = start or _hour(first).date()
+        end = end or _hour(last).date() + timedelta(days=1)
+
+    cursor = start
+    while cursor < end:
+        stop = min(cursor + timedelta(days=days_per_batch), end)
+        with db.engine.begin() as conn:
+            _rebuild_window(conn, _utc_midnight(cursor), _utc_midnight(stop))
+        report(f"rebuilt {cursor.isoformat()} .. {stop.isoformat()}")
+        cursor = stop
+    return (end - start).days
+
+
+# report queries (rollups only)
+
+def _totals(rows):
+    return {m: sum(r[m] for r in rows) for m in MEASURES}
+
+
+def _measures(row):
+    return {m: int(getattr(row, m) or 0) for m in MEASURES}
+
+
+def revenue_series(granularity: str, start: datetime, end: datetime, movie_id=None, auditorium_id=None):
+    """Per-hour or per-day totals over [start, end), optionally for one movie and/or auditorium."""
+    if granularity == "hour":
+        model, bucket = RevenueHourly, RevenueHourly.bucket_start
+        where = [bucket >= start, bucket < end]
+    else:
+        model, bucket = RevenueDaily, RevenueDaily.day
+        where = [bucket >= start.date(), bucket < end.date()]
+    if movie_id is not None:
+        where.append(model.movie_id == movie_id)
+    if auditorium_id is not None:
+        where.append(model.auditorium_id == auditorium_id)
+
+    rows = db.session.execute(
+        select(bucket.label("bucket"), *[func.sum(getattr(model, m)).label(m) for m in MEASURES])
+        .where(*where)
+        .group_by(bucket)
+        .order_by(bucket)
+    ).all()
+    data = [{"bucket": r.bucket, **_measures(r)} for r in rows]
+    return data, _totals(data)
+
+
+def revenue_by(dimension: str, start: date, end: date):
+    """Totals per movie or per auditorium over days [start, end), highest revenue first."""
+    if dimension == "movie":
+        key, label, joined = RevenueDaily.movie_id, Movie.title, (Movie, Movie.movie_id == RevenueDaily.movie_id)
+    else:
+        key, label, joined = (RevenueDaily.auditorium_id, Auditorium.name,
+                              (Auditorium, Auditorium.auditorium_id == RevenueDaily.auditorium_id))
+    revenue = func.sum(RevenueDaily.revenue_cents)
+    rows = db.session.execute(
+        select(key.label("id"), label.label("name"), *[func.sum(getattr(RevenueDaily, m)).label(m) for m in MEASURES])
+        .join(*joined)
+        .where(RevenueDaily.day >= start, RevenueDaily.day < end)
+        .group_by(key, label)
+        .order_by(revenue.desc(), key)
+    ).all()
+    data = [{f"{dimension}_id": r.id, "name": r.name, **_measures(r)} for r in rows]
+    return data, _totals(data)
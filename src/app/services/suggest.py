@@ -0,0 +1,304 @@
+"""In-process prefix index behind `GET /api/v1/suggest` (search-box typeahead).
+
+Movie titles, people (directors, producers, cast) and auditorium names are
+normalized (accents stripped, casefolded, punctuation collapsed) and stored
+as one sorted list of keys with a parallel array of entry ids. Every label is indexed under
+its full text and under each later word, so "knight" finds "The Dark Knight".
+A lookup is a `bisect` to the first key >= the query followed by a short
+forward scan, so it never touches the database.
+
+Each worker builds its index on a background thread, started by the first
+lookup and again once it is `SUGGEST_REFRESH_SECONDS` old (that's how writes
+made by other workers show up); lookups never wait for it. Until the first
+build finishes they answer from an empty index. A rebuild holds the old
+index and the new one at once, so a worker's peak is about twice one index.
+Writes in this worker are patched in immediately by the movie/auditorium
+controllers; patches made while a build is reading the tables are also
+replayed onto the new index before it replaces the old one. Memory is bounded by `SUGGEST_MAX_ENTRIES` entries, at most
+`MAX_WORDS` keys per label, keys truncated to `MAX_KEY_LENGTH` characters and
+at most `MAX_PEOPLE_PER_MOVIE` people linked to a movie. A person keeps only
+a role bitmask and a movie count, so no entry grows with the catalogue.
+"""
+import bisect
+import heapq
+from array import array
+import logging
+import re
+import threading
+import time
+import unicodedata
+
+from flask import current_app
+
+from .. import db
+from ..models.auditorium import Auditorium
+from ..models.movie import Movie
+
+log = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 40
+MAX_WORDS = 6
+MAX_SCAN = 512                      # keys examined per lookup, however common the prefix
+MAX_PEOPLE_PER_MOVIE = 32
+BUILD_RETRY_SECONDS = 30            # after a failed build
+KIND_ORDER = {"movie": 0, "person": 1, "auditorium": 2}
+PERSON_FIELDS = ("director", "producer", "cast")
+ROLE_BITS = {role: 1 << i for i, role in enumerate(PERSON_FIELDS)}
+
+_NON_WORD_RE = re.compile(r"[^\w]+")
+
+
+def normalize(text: str) -> str:
+    text = text or ""
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _NON_WORD_RE.sub(" ", text.casefold()).strip()
+
+
+def _split_people(value: str):
+    return [p.strip() for p in (value or "").split(",") if p.strip()]
+
+
+class _Entry:
+    __slots__ = ("kind", "ref", "label", "keys", "roles", "movie_count")
+
+    def __init__(self, kind, ref, label):
+        self.kind = kind
+        self.ref = ref          # movie_id / auditorium_id / normalized person name
+        self.label = label
+        self.keys = ()
+        self.roles = 0          # person only: ROLE_BITS of every role held (until the next rebuild)
+        self.movie_count = 0    # person only: movies linked
+
+
+class SuggestIndex:
+    def __init__(self, max_entries: int = 50_000, refresh_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._keys = []             # sorted keys
+        self._key_ids = array("I")  # entry_id of each key, ties in insertion order
+        self._entries = []          # entry_id -> _Entry (None once removed)
+        self._ids = {}              # (kind, ref) -> entry_id
+        self._movie_people = {}     # movie_id -> tuple of person refs, to unlink a movie without scanning
+        self.dropped = 0        # entries refused because the index was full
+        self._next_build = 0.0  # monotonic time the next background build is due
+        self._bulk = False      # while building: append now, sort once at the end
+        self._pending = None    # while a load runs: patches to replay onto its result
+
+    def init_app(self, app):
+        self.max_entries = app.config.get("SUGGEST_MAX_ENTRIES", self.max_entries)
+        self.refresh_seconds = app.config.get("SUGGEST_REFRESH_SECONDS", self.refresh_seconds)
+        with self._lock:
+            self._reset()
+
+    # building
+
+    def _add_entry(self, kind, ref, label):
+        entry_id = self._ids.get((kind, ref))
+        if entry_id is not None:
+            return self._entries[entry_id]
+        if len(self._ids) >= self.max_entries:
+            self.dropped += 1
+            return None
+        words = normalize(label).split()
+        if not words:
+            return None
+        entry = _Entry(kind, ref, label)
+        entry.keys = tuple(dict.fromkeys(
+            " ".join(words[i:])[:MAX_KEY_LENGTH] for i in range(min(len(words), MAX_WORDS))
+        ))
+        entry_id = len(self._entries)
+        self._entries.append(entry)
+        self._ids[(kind, ref)] = entry_id
+        for key in entry.keys:
+            i = len(self._keys) if self._bulk else bisect.bisect_right(self._keys, key)
+            self._keys.insert(i, key)
+            self._key_ids.insert(i, entry_id)
+        return entry
+
+    def _remove_entry(self, kind, ref):
+        entry_id = self._ids.pop((kind, ref), None)
+        if entry_id is None:
+            return
+        entry, self._entries[entry_id] = self._entries[entry_id], None
+        for key in entry.keys:
+            i = bisect.bisect_left(self._keys, key)
+            while i < len(self._keys) and self._keys[i] == key:
+                if self._key_ids[i] == entry_id:
+                    del self._keys[i], self._key_ids[i]
+                    break
+                i += 1
+
+    def _add_movie(self, movie_id, title, people):
+        self._add_entry("movie", movie_id, title)
+        linked = {}             # person ref -> entry, one link per person however many roles
+        for role, names in people.items():
+            for name in _split_people(names):
+                ref = normalize(name)
+                if ref not in linked and len(linked) >= MAX_PEOPLE_PER_MOVIE:
+                    continue
+                person = linked.get(ref) or self._add_entry("person", ref, name)
+                if person is not None:
+                    person.roles |= ROLE_BITS[role]
+                    linked[ref] = person
+        for person in linked.values():
+            person.movie_count += 1
+        if linked:
+            # the entries' own ref strings, not the equal copies normalize() just made
+            self._movie_people[movie_id] = tuple(person.ref for person in linked.values())
+
+    def _remove_movie(self, movie_id):
+        self._remove_entry("movie", movie_id)
+        for ref in self._movie_people.pop(movie_id, ()):
+            entry_id = self._ids.get(("person", ref))
+            if entry_id is None:
+                continue
+            entry = self._entries[entry_id]
+            entry.movie_count -= 1
+            if entry.movie_count <= 0:
+                self._remove_entry("person", ref)
+
+    def build(self):
+        """(Re)load the whole index from the database; lookups keep using the old one meanwhile."""
+        self.load(
+            db.session.query(Movie.movie_id, Movie.title, Movie.director, Movie.producer, Movie.cast).yield_per(2000),
+            db.session.query(Auditorium.auditorium_id, Auditorium.name),
+        )
+
+    def load(self, movies, auditoriums):
+        """
+        Replace the index contents. movies: (movie_id, title, director, producer, cast) rows;
+        auditoriums: (auditorium_id, name) rows.
+        """
+        with self._lock:
+            # from here on the rows read may or may not include this worker's writes; keep them to replay
+            self._pending = []
+        fresh = SuggestIndex(self.max_entries, self.refresh_seconds)
+        fresh._bulk = True
+        try:
+            for movie_id, title, director, producer, cast in movies:
+                fresh._add_movie(movie_id, title, {"director": director, "producer": producer, "cast": cast})
+            for auditorium_id, name in auditoriums:
+                fresh._add_entry("auditorium", auditorium_id, name)
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+        order = sorted(range(len(fresh._keys)), key=fresh._keys.__getitem__)
+        fresh._keys = [fresh._keys[i] for i in order]
+        fresh._key_ids = array("I", (fresh._key_ids[i] for i in order))
+        del order
+        fresh._bulk = False
+        with self._lock:
+            for patch in self._pending or ():
+                fresh._apply(*patch)
+            self._pending = None
+            self._keys, self._key_ids = fresh._keys, fresh._key_ids
+            self._entries, self._ids, self._movie_people = fresh._entries, fresh._ids, fresh._movie_people
+            self.dropped = fresh.dropped
+        if fresh.dropped:
+            log.warning("suggest index full (SUGGEST_MAX_ENTRIES=%s); %s entries left out", self.max_entries, fresh.dropped)
+
+    def _ensure_fresh(self):
+        if time.monotonic() < self._next_build:
+            return
+        # one build at a time, on its own thread; requests keep answering from the current index
+        if not self._build_lock.acquire(blocking=False):
+            return
+        if time.monotonic() < self._next_build:
+            self._build_lock.release()
+            return
+        app = current_app._get_current_object()
+        threading.Thread(target=self._build_in_background, args=(app,), name="suggest-index-build", daemon=True).start()
+
+    def _build_in_background(self, app):
+        try:
+            with app.app_context():
+                self.build()
+            self._next_build = time.monotonic() + self.refresh_seconds
+        except Exception:
+            log.exception("suggest index build failed; retrying in %ss", BUILD_RETRY_SECONDS)
+            self._next_build = time.monotonic() + min(BUILD_RETRY_SECONDS, self.refresh_seconds)
+        finally:
+            self._build_lock.release()
+
+    # patches from this worker's writes
+
+    def _apply(self, op, *args):
+        if op == "movie":
+            movie_id, title, people = args
+            self._remove_movie(movie_id)
+            self._add_movie(movie_id, title, people)
+        elif op == "remove_movie":
+            self._remove_movie(*args)
+        elif op == "auditorium":
+            auditorium_id, name = args
+            self._remove_entry("auditorium", auditorium_id)
+            self._add_entry("auditorium", auditorium_id, name)
+
+    def _patch(self, *patch):
+        with self._lock:
+            self._apply(*patch)
+            if self._pending is not None:
+                self._pending.append(patch)
+
+    def upsert_movie(self, movie: Movie):
+        # read the (possibly expired) attributes before taking the lock
+        people = {"director": movie.director, "producer": movie.producer, "cast": movie.cast}
+        self._patch("movie", movie.movie_id, movie.title, people)
+
+    def remove_movie(self, movie_id):
+        self._patch("remove_movie", movie_id)
+
+    def upsert_auditorium(self, auditorium: Auditorium):
+        self._patch("auditorium", auditorium.auditorium_id, auditorium.name)
+
+    # lookups
+
+    def lookup(self, query: str, limit: int = 10, kinds=None):
+        """Best `limit` entries whose label (or a later word of it) starts with `query`."""
+        prefix = normalize(query)[:MAX_KEY_LENGTH]
+        if not prefix:
+            return []
+        with self._lock:
+            keys = self._keys
+            i = bisect.bisect_left(keys, prefix)
+            seen = {}
+            end = min(i + MAX_SCAN, len(keys))
+            while i < end and keys[i].startswith(prefix):
+                key, entry_id = keys[i], self._key_ids[i]
+                entry = self._entries[entry_id]
+                if kinds is None or entry.kind in kinds:
+                    # a match on the label's first word outranks one on a later word
+                    rank = 0 if key == entry.keys[0] else 1
+                    if rank < seen.get(entry_id, (2,))[0]:
+                        seen[entry_id] = (rank, entry)
+                i += 1
+            ranked = heapq.nsmallest(
+                limit, seen.values(),
+                key=lambda r: (r[0], KIND_ORDER[r[1].kind], len(r[1].label), r[1].label),
+            )
+            return [self._to_dict(entry) for _, entry in ranked]
+
+    @staticmethod
+    def _to_dict(entry: _Entry):
+        if entry.kind == "person":
+            roles = [role for role in PERSON_FIELDS if entry.roles & ROLE_BITS[role]]
+            return {"type": "person", "label": entry.label, "roles": roles, "movie_count": entry.movie_count}
+        return {"type": entry.kind, "id": entry.ref, "label": entry.label}
+
+    def suggest(self, query: str, limit: int = 10, kinds=None):
+        self._ensure_fresh()
+        return self.lookup(query, limit, kinds)
+
+    def __len__(self):
+        return len(self._ids)
+
+
+suggest_index = SuggestIndex()
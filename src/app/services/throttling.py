@@ -0,0 +1,162 @@
+"""Sliding-window rate counters for throttling abuse-prone endpoints.
+
+A sliding window is approximated from two fixed windows: the count so far in
+the current window plus the previous window's count, weighted by how much of it
+still overlaps the sliding interval. That costs two integers per key.
+
+Two backends share the `ThrottleBackend.hit` contract:
+  MemoryThrottleBackend  - in-process, per worker; the default.
+  SharedThrottleBackend  - counts in a `CounterStore` visible to every worker.
+                           Anything with `get`/`incr` (e.g. a Redis client
+                           adapter) can be plugged in; `LocalCounterStore` is
+                           the in-process stand-in for dev and tests.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class ThrottleBackend:
+    def hit(self, key: str, limit: int, window_seconds: int, now: float | None = None):
+        """
+        Count one attempt against `key`. Returns (allowed, retry_after_seconds).
+        Rejected attempts are not counted.
+        """
+        raise NotImplementedError
+
+    def reset(self):
+        raise NotImplementedError
+
+
+def _estimate(prev: int, cur: int, now: float, window_seconds: int) -> float:
+    elapsed = (now % window_seconds) / window_seconds
+    return prev * (1.0 - elapsed) + cur
+
+
+def _retry_after(prev: int, cur: int, limit: int, now: float, window_seconds: int) -> int:
+    """Seconds until one more attempt fits, assuming no other attempts arrive meanwhile."""
+    elapsed = now % window_seconds
+    if prev and cur + 1 <= limit:
+        # the previous window decays out within the current one
+        wait = (1.0 - (limit - 1 - cur) / prev) * window_seconds - elapsed
+    else:
+        # after rollover the current count becomes the decaying previous window
+        wait = window_seconds - elapsed
+        if cur:
+            wait += max(0.0, 1.0 - (limit - 1) / cur) * window_seconds
+    return max(1, math.ceil(wait))
+
+
+class MemoryThrottleBackend(ThrottleBackend):
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._counters = OrderedDict()  # key -> [window_index, current, previous]
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, window_seconds, now=None):
+        now = time.time() if now is None else now
+        index = int(now // window_seconds)
+        with self._lock:
+            entry = self._counters.get(key)
+            if entry is None or entry[0] < index - 1:
+                entry = [index, 0, 0]
+            elif entry[0] == index - 1:
+                entry = [index, 0, entry[1]]
+            self._counters[key] = entry
+            self._counters.move_to_end(key)
+
+            _, cur, prev = entry
+            if _estimate(prev, cur, now, window_seconds) + 1 > limit:
+                return False, _retry_after(prev, cur, limit, now, window_seconds)
+            entry[1] += 1
+
+            while len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+        return True, 0
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+
+class CounterStore:
+    """Minimal shared counter interface (the subset of Redis INCR/EXPIRE/GET we need)."""
+
+    def get(self, key: str) -> int:
+        raise NotImplementedError
+
+    def incr(self, key: str, ttl_seconds: int) -> int:
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class LocalCounterStore(CounterStore):
+    """In-process stand-in for a shared store."""
+
+    def __init__(self):
+        self._values = {}  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._values.get(key)
+            if item is None or item[1] <= time.time():
+                return 0
+            return item[0]
+
+    def incr(self, key, ttl_seconds):
+        now = time.time()
+        with self._lock:
+            value, expires_at = self._values.get(key, (0, 0))
+            if expires_at <= now:
+                value, expires_at = 0, now + ttl_seconds
+            value += 1
+            self._values[key] = (value, expires_at)
+            if len(self._values) > 10_000:
+                self._values = {k: v for k, v in self._values.items() if v[1] > now}
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class SharedThrottleBackend(ThrottleBackend):
+    def __init__(self, store: CounterStore, prefix: str = "throttle:"):
+        self.store = store
+        self.prefix = prefix
+
+    def hit(self, key, limit, window_seconds, now=None):
+        now = time.time() if now is None else now
+        index = int(now // window_seconds)
+        base = f"{self.prefix}{key}:{window_seconds}:"
+        cur = self.store.get(f"{base}{index}")
+        prev = self.store.get(f"{base}{index - 1}")
+        if _estimate(prev, cur, now, window_seconds) + 1 > limit:
+            return False, _retry_after(prev, cur, limit, now, window_seconds)
+        # not atomic with the read above; a race can admit a few extra attempts, never fewer
+        self.store.incr(f"{base}{index}", window_seconds * 2)
+        return True, 0
+
+    def reset(self):
+        self.store.clear()
+
+
+class Throttler:
+    def __init__(self):
+        self.enabled = True
+        self.backend: ThrottleBackend = MemoryThrottleBackend()
+
+    def init_app(self, app):
+        self.enabled = app.config.get("THROTTLE_ENABLED", True)
+        kind = app.config.get("THROTTLE_BACKEND", "memory")
+        if kind == "shared":
+            self.backend = SharedThrottleBackend(app.config.get("THROTTLE_SHARED_STORE") or LocalCounterStore())
+        else:
+            self.backend = MemoryThrottleBackend(app.config.get("THROTTLE_MAX_KEYS", 100_000))
+
+
+throttler = Throttler()
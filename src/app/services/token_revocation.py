@@ -0,0 +1,166 @@
+"""JWT revocation backed by `jwt_blacklist`, checked against an in-memory deny set.
+
+Each worker keeps the unexpired revoked jtis (plus per-user "issued before"
+cutoffs) in memory and pulls new rows from the table at most once every
+`JWT_REVOCATION_REFRESH_SECONDS`, so checking a token is a set lookup. The
+pull runs on a request thread: the first check after the interval issues
+one indexed SELECT on the primary (and the worker's very first check waits
+for the initial load), while concurrent checks keep answering from the
+current set instead of waiting. Rows are read with an overlap window behind
+the newest `created_at` seen, which covers transactions that commit late.
+Expired rows are dropped from memory on every refresh; the
+`purge_revoked_tokens` job deletes them from the table.
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from .. import db
+from ..models.jwt_blacklist import JWTBlacklist, USER_WIDE_JTI_PREFIX
+from .replicas import replicas
+
+
+def _now_utc():
+    return datetime.now(timezone.utc)
+
+
+class RevocationFilter:
+    def __init__(self, refresh_seconds: float = 5.0, overlap_seconds: float = 30.0):
+        self.refresh_seconds = refresh_seconds
+        self.overlap_seconds = overlap_seconds
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._jtis = {}           # jti -> expires_at (epoch seconds)
+        self._user_cutoffs = {}   # user_id (str) -> (revoked_before, expires_at) epoch seconds
+        self._watermark = None    # newest created_at read from the table
+        self._next_refresh = 0.0
+        self._loaded = False      # the first refresh has run
+
+    def init_app(self, app):
+        self.refresh_seconds = app.config.get("JWT_REVOCATION_REFRESH_SECONDS", self.refresh_seconds)
+        with self._lock:
+            self._reset()
+
+    # in-memory state
+
+    def _remember(self, jti, expires_at: datetime, created_at: datetime):
+        exp = expires_at.timestamp()
+        if jti.startswith(USER_WIDE_JTI_PREFIX):
+            key = jti[len(USER_WIDE_JTI_PREFIX):]
+            cutoff = created_at.timestamp()
+            current = self._user_cutoffs.get(key)
+            if current is None or current[0] < cutoff:
+                self._user_cutoffs[key] = (cutoff, exp)
+        else:
+            self._jtis[jti] = exp
+
+    def _drop_expired(self, now: float):
+        self._jtis = {j: exp for j, exp in self._jtis.items() if exp > now}
+        self._user_cutoffs = {u: v for u, v in self._user_cutoffs.items() if v[1] > now}
+
+    def refresh(self, force: bool = False):
+        """Pull revocations written since the last refresh (by any worker)."""
+        mono = time.monotonic()
+        if not force and mono < self._next_refresh:
+            return
+        # one thread queries; the others keep answering from the current set (until the first load is in)
+        if not self._refresh_lock.acquire(blocking=force or not self._loaded):
+            return
+        try:
+            if not force and mono < self._next_refresh:
+                return
+            self._next_refresh = mono + self.refresh_seconds
+
+            query = db.session.query(
+                JWTBlacklist.jti, JWTBlacklist.expires_at, JWTBlacklist.created_at
+            ).filter(JWTBlacklist.expires_at > _now_utc())
+            if self._watermark is not None:
+                query = query.filter(
+                    JWTBlacklist.created_at > self._watermark - timedelta(seconds=self.overlap_seconds)
+                )
+            # always the primary: a replica a few seconds behind would miss fresh revocations
+            with replicas.primary():
+                rows = query.all()
+            with self._lock:
+                for jti, expires_at, created_at in rows:
+                    self._remember(jti, expires_at, created_at)
+                    if self._watermark is None or created_at > self._watermark:
+                        self._watermark = created_at
+                self._drop_expired(time.time())
+                self._loaded = True
+        finally:
+            self._refresh_lock.release()
+
+    def is_revoked(self, claims: dict) -> bool:
+        self.refresh()
+        jti = claims.get("jti")
+        if jti and jti in self._jtis:
+            return True
+        cutoff = self._user_cutoffs.get(str(claims.get("user_id")))
+        if cutoff is not None:
+            # tokens without iat predate revocation support; treat them as issued at epoch
+            return float(claims.get("iat") or 0) <= cutoff[0]
+        return False
+
+    def add_local(self, jti, expires_at: datetime, created_at: datetime):
+        with self._lock:
+            self._remember(jti, expires_at, created_at)
+
+    def __len__(self):
+        return len(self._jtis) + len(self._user_cutoffs)
+
+
+revocation_filter = RevocationFilter()
+
+
+def revoke_token(jti: str, user_id, expires_at: datetime):
+    """Revoke a single token by its jti. Stages the row on the session; the caller commits."""
+    now = _now_utc()
+    db.session.merge(JWTBlacklist(jti=jti, user_id=user_id, expires_at=expires_at, created_at=now))
+    revocation_filter.add_local(jti, expires_at, now)
+
+
+def revoke_user_tokens(user_id, lifetime: timedelta):
+    """
+    Revoke every token issued to `user_id` up to now. `lifetime` is the longest
+    a token can live, which is how long the cutoff row has to be kept.
+    Stages the row on the session; the caller commits.
+    """
+    now = _now_utc()
+    jti = f"{USER_WIDE_JTI_PREFIX}{user_id}"
+    db.session.merge(JWTBlacklist(jti=jti, user_id=user_id, expires_at=now + lifetime, created_at=now))
+    revocation_filter.add_local(jti, now + lifetime, now)
+
+
+def revoke_users_tokens(user_ids, lifetime: timedelta, chunk_size: int = 1000):
+    """
+    Bulk `revoke_user_tokens`: one DELETE + one multi-row INSERT per chunk of
+    users instead of a merge (SELECT + write) per user. Runs on the session's
+    connection; the caller commits.
+    """
+    table = JWTBlacklist.__table__
+    now = _now_utc()
+    expires_at = now + lifetime
+    user_ids = list(user_ids)
+    for i in range(0, len(user_ids), chunk_size):
+        chunk = user_ids[i:i + chunk_size]
+        jtis = [f"{USER_WIDE_JTI_PREFIX}{u}" for u in chunk]
+        db.session.execute(table.delete().where(table.c.jti.in_(jtis)))
+        db.session.execute(table.insert(), [
+            {"jti": jti, "user_id": u, "expires_at": expires_at, "created_at": now}
+            for jti, u in zip(jtis, chunk)
+        ])
+    for u in user_ids:
+        revocation_filter.add_local(f"{USER_WIDE_JTI_PREFIX}{u}", expires_at, now)
+
+
+def purge_expired() -> int:
+    """Delete revocation rows whose tokens can no longer be presented anyway."""
+    # own transaction, so it never commits whatever the request session has pending
+    table = JWTBlacklist.__table__
+    with db.engine.begin() as conn:
+        result = conn.execute(table.delete().where(table.c.expires_at <= _now_utc()))
+    return result.rowcount
@@ -0,0 +1,86 @@
+"""Process-local cache of authenticated principals, keyed by user_id.
+
+Auth checks read the few fields in `middleware.auth.Principal`; caching them
+lets steady-state requests skip the users query entirely. Entries are bounded
+by count (LRU eviction) and by age (TTL). Code that changes any of those fields
+must call `invalidate_user` / `invalidate_users` after committing. Other worker
+processes only see the change once their own entry expires, so the TTL is the
+upper bound on cross-worker staleness.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class PrincipalCache:
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # user_id -> (expires_at, principal)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        self.max_entries = app.config.get("AUTH_CACHE_MAX_ENTRIES", self.max_entries)
+        self.ttl_seconds = app.config.get("AUTH_CACHE_TTL_SECONDS", self.ttl_seconds)
+        self.clear()
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, principal = entry
+            if expires_at <= now:
+                del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return principal
+
+    def put(self, user_id, principal):
+        if not self.enabled:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[user_id] = (expires_at, principal)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def invalidate_many(self, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+principal_cache = PrincipalCache()
+
+
+def invalidate_user(user_id):
+    """Drop one user's cached principal; call after committing a change to auth fields."""
+    principal_cache.invalidate(user_id)
+
+
+def invalidate_users(user_ids):
+    """Bulk variant of `invalidate_user`."""
+    principal_cache.invalidate_many(user_ids)
@@ -0,0 +1,150 @@
+"""Production HTTP serving: gunicorn with preforked workers.
+
+    poetry run python -m src.app.serving [--print-config]
+
+The master builds the app once (`preload_app`), before any worker exists,
+and closes whatever database connections that opened. Right before each fork
+it calls `gc.freeze()`, so the objects built so far sit in the permanent
+generation: a collection in the worker never writes to their headers, and
+the pages holding them stay shared copy-on-write instead of being copied
+into every worker. The collector is off while the app is built and back on,
+in the master too, once the load is frozen. After the fork each worker calls
+`engine.dispose(close=False)`, so it opens connections of its own and never
+uses, or closes, a socket inherited from the master.
+
+SERVE_WORKER_CLASS picks `sync` (one request at a time per process,
+2 x CPUs + 1 processes) or `gthread` (SERVE_THREADS threads per process,
+CPUs + 1 processes); SERVE_WORKERS overrides the count. CPUs means the ones
+this process may use: its affinity mask, capped by a cgroup (container) quota.
+
+Signals to the master:
+  HUP          graceful reload: fresh workers start, old ones finish their
+               requests; config is re-read but the preloaded app is not
+               re-imported
+  USR2, TERM   new code without downtime: USR2 starts a second master
+               (re-imported app) next to the old one, then TERM the old one
+  TTIN / TTOU  one worker more / fewer
+  TERM         graceful stop, waiting up to SERVE_GRACEFUL_TIMEOUT
+"""
+import argparse
+import gc
+import math
+import os
+
+from gunicorn.app.base import BaseApplication
+
+from .config import Config
+
+WORKER_CLASSES = ("sync", "gthread")
+
+
+def available_cpus() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    # cgroup v2 quota, e.g. docker run --cpus=2: "200000 100000"
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def default_workers(worker_class: str, cpus: int) -> int:
+    if worker_class == "gthread":
+        return cpus + 1
+    return 2 * cpus + 1
+
+
+def settings(config=Config) -> dict:
+    """gunicorn settings from the SERVE_* config."""
+    worker_class = config.SERVE_WORKER_CLASS
+    if worker_class not in WORKER_CLASSES:
+        raise ValueError(f"SERVE_WORKER_CLASS must be one of {', '.join(WORKER_CLASSES)}")
+    options = {
+        "bind": config.SERVE_BIND,
+        "worker_class": worker_class,
+        "workers": config.SERVE_WORKERS or default_workers(worker_class, available_cpus()),
+        "threads": config.SERVE_THREADS if worker_class == "gthread" else 1,
+        "preload_app": True,
+        "timeout": config.SERVE_TIMEOUT,
+        "graceful_timeout": config.SERVE_GRACEFUL_TIMEOUT,
+        "keepalive": config.SERVE_KEEPALIVE,
+        "max_requests": config.SERVE_MAX_REQUESTS,
+        "max_requests_jitter": config.SERVE_MAX_REQUESTS // 10,
+        "accesslog": "-" if config.SERVE_ACCESS_LOG else None,
+        "errorlog": "-",
+        "pre_fork": pre_fork,
+        "post_fork": post_fork,
+    }
+    # worker heartbeat files on tmpfs; a disk-backed /tmp can stall them under I/O load
+    if os.path.isdir("/dev/shm"):
+        options["worker_tmp_dir"] = "/dev/shm"
+    return options
+
+
+def _engines(app):
+    from . import db
+    with app.app_context():
+        return list(db.engines.values())
+
+
+_app = None
+
+
+def pre_fork(server, worker):
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # the pool's connections (none, normally) belong to the master; leave them alone
+    for engine in _engines(_app):
+        engine.dispose(close=False)
+
+
+class Server(BaseApplication):
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if value is not None:
+                self.cfg.set(key, value)
+
+    def load(self):
+        global _app
+        if _app is None:
+            from . import create_app
+            # no collections while the app is built, so the objects it leaves
+            # behind are packed together rather than scattered over freed holes
+            gc.disable()
+            _app = create_app()
+            for engine in _engines(_app):
+                engine.dispose()
+            # the master lives through every HUP reload: it needs its collector back
+            gc.freeze()
+            gc.enable()
+        return _app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the API with gunicorn (SERVE_* settings)")
+    parser.add_argument("--print-config", action="store_true", help="show the effective settings and exit")
+    args = parser.parse_args()
+
+    options = settings()
+    if args.print_config:
+        for key, value in options.items():
+            if not callable(value):
+                print(f"{key} = {value}")
+        return
+    Server(options).run()
+
+
+if __name__ == "__main__":
+    main()
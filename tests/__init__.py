@@ -0,0 +1,10 @@
+"""
+    python -m unittest discover -s tests -t .
+
+Runs against an in-memory SQLite database unless SQLALCHEMY_DATABASE_URI is set.
+"""
+import os
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", "sqlite://")
+os.environ.setdefault("ENCRYPTION_KEY", "x2TjmiwVK0Cq7b3Y3M3uJ1gW2lOzZk0F0Zk8fL0w0hQ=")
+os.environ.setdefault("THROTTLE_ENABLED", "0")
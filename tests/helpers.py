@@ -0,0 +1,63 @@
+import unittest
+
+from src.app import create_app, db
+from src.app.models.users import User
+from src.app.services.password_hashing import password_hasher
+from src.app.services.suggest import suggest_index
+from src.app.services.token_revocation import revocation_filter
+from src.app.services.user_cache import principal_cache
+
+_app = None
+
+
+def get_app():
+    """The one app of the test run (the blueprints can only be registered once per process)."""
+    global _app
+    if _app is None:
+        _app = create_app()
+        _app.config["TESTING"] = True
+    return _app
+
+
+class AppTestCase(unittest.TestCase):
+    """A fresh schema, in-process caches and test client per test.
+
+    Requests run without an app context pushed around them, as in production:
+    otherwise they would share `g` (and its per-request caches) with each other.
+    Use `with self.app.app_context():` for direct database access.
+    """
+
+    def setUp(self):
+        self.app = get_app()
+        for service in (principal_cache, revocation_filter, suggest_index):
+            service.init_app(self.app)
+        with self.app.app_context():
+            db.create_all()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def make_user(self, email="user@example.com", password="old-password", **fields):
+        with self.app.app_context():
+            user = User(first_name="Test", last_name="User", email=email,
+                        password_hash=password_hasher.hash(password), is_verified=True, **fields)
+            db.session.add(user)
+            db.session.commit()
+            return user.user_id
+
+    def login(self, email, password):
+        """POST /auth/login; returns the issued token."""
+        resp = self.client.post("/api/v1/auth/login", json={"email": email, "password": password})
+        self.assertEqual(resp.status_code, 200, resp.get_data(as_text=True))
+        name = self.app.config["JWT_COOKIE_NAME"]
+        token = self.client.get_cookie(name).value
+        # requests pick which token they present (the cookie would win over the header)
+        self.client.delete_cookie(name)
+        return token
+
+    def get(self, path, token=None):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        return self.client.get(path, headers=headers)
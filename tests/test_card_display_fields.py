@@ -0,0 +1,34 @@
+from src.app import db
+from src.app.models.billing_info import BillingInfo
+from src.app.services.encryption import get_card_encryption
+from src.app.services.key_rotation import backfill_display_fields
+
+from .helpers import AppTestCase
+
+EMAIL = "user@example.com"
+
+
+class BackfillTest(AppTestCase):
+    def test_cards_written_before_the_columns_existed_are_filled_by_the_job(self):
+        user_id = self.make_user(EMAIL, "password")
+        with self.app.app_context():
+            cipher = get_card_encryption()
+            # as left by the migration without ENCRYPTION_KEY: display columns NULL
+            db.session.add(BillingInfo(
+                user_id=user_id, first_name="Test", last_name="User", card_type="credit",
+                card_number=cipher.encrypt("4111111111111111"), card_exp=cipher.encrypt("07/29"),
+                cardholder_name=cipher.encrypt("Test User"), billing_street="1 Main St",
+                billing_city="Athens", billing_state="GA", billing_zip_code="30602",
+            ))
+            db.session.commit()
+        token = self.login(EMAIL, "password")
+
+        card = self.get("/api/v1/users/profile", token).get_json()["payment_cards"][0]
+        self.assertEqual((card["card_last4"], card["card_exp"]), ("XXXX", "••/••"))
+
+        with self.app.app_context():
+            stats = backfill_display_fields(chunk_size=1, report=lambda line: None)
+        self.assertEqual(stats, {"scanned": 1, "filled": 1, "failed": 0})
+
+        card = self.get("/api/v1/users/profile", token).get_json()["payment_cards"][0]
+        self.assertEqual((card["card_last4"], card["card_exp"]), ("1111", "07/29"))
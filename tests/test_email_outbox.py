@@ -0,0 +1,35 @@
+import threading
+import unittest
+from unittest import mock
+
+from src.app.services.email_outbox import CircuitBreaker, OutboxWorkerPool
+
+from .helpers import get_app
+
+
+class HalfOpenProbeTest(unittest.TestCase):
+    def test_claim_error_during_the_probe_releases_it(self):
+        pool = OutboxWorkerPool()
+        pool.poll_seconds = 0.01
+        pool.breaker = CircuitBreaker(threshold=1, cooldown_seconds=0)
+        pool.breaker.record_failure()
+        self.assertEqual(pool.breaker.state, "half-open")
+
+        claims = []
+        second_claim = threading.Event()
+
+        def claim_batch():
+            claims.append(1)
+            if len(claims) == 1:
+                raise RuntimeError("lock timeout")
+            second_claim.set()
+            return []
+
+        with mock.patch.object(pool, "claim_batch", claim_batch), \
+                self.assertLogs("src.app.services.email_outbox", "ERROR"):
+            pool.start(get_app())
+            try:
+                self.assertTrue(second_claim.wait(2), "the worker never probed again")
+            finally:
+                pool.stop(timeout=2)
+        self.assertTrue(pool.breaker.allow())
@@ -0,0 +1,25 @@
+import time
+import unittest
+
+from src.app.services.password_hashing import HashingOverloaded, PasswordHasher
+
+
+class TimeoutTest(unittest.TestCase):
+    def setUp(self):
+        self.hasher = PasswordHasher(workers=1, max_pending=1, timeout_seconds=0.05)
+        self.addCleanup(self.hasher.shutdown)
+
+    def test_a_timed_out_hash_keeps_its_slot_until_it_finishes(self):
+        with self.assertRaisesRegex(HashingOverloaded, "timed out"):
+            self.hasher._run(time.sleep, 1.0)
+        # still running in the pool process, so the queue is still full
+        with self.assertRaisesRegex(HashingOverloaded, "queue is full"):
+            self.hasher._run(time.sleep, 0)
+
+        deadline = time.monotonic() + 30
+        while not self.hasher._slots.acquire(blocking=False):
+            self.assertLess(time.monotonic(), deadline, "slot never released")
+            time.sleep(0.05)
+        self.hasher._slots.release()
+        self.hasher.timeout_seconds = 10
+        self.assertIsNone(self.hasher._run(time.sleep, 0))
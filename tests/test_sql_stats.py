@@ -0,0 +1,41 @@
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from src.app import db
+from src.app.middleware.sql_stats import assert_statement_budget
+
+from .helpers import AppTestCase
+
+ADMIN = "admin@example.com"
+
+
+class StatementBudgetTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.make_user(ADMIN, "pw", is_admin=True)
+        self.token = self.login(ADMIN, "pw")
+        # warm the per-worker revocation set and principal cache, as on any busy worker
+        self.get("/api/v1/users/profile", self.token)
+
+    def test_get_user_profile(self):
+        with assert_statement_budget(2):
+            resp = self.get("/api/v1/users/profile", self.token)
+        self.assertEqual(resp.status_code, 200)
+
+    def test_create_movie(self):
+        body = {"title": "Oppenheimer", "categories": ["Drama", "History"]}
+        self.client.post("/api/v1/movies", json={"title": "Dunkirk", "categories": body["categories"]},
+                         headers={"Authorization": f"Bearer {self.token}"})
+        # one lookup per category name, the inserts, and the reloads for the response
+        with assert_statement_budget(7, max_repeats=2):
+            resp = self.client.post("/api/v1/movies", json=body, headers={"Authorization": f"Bearer {self.token}"})
+        self.assertEqual(resp.status_code, 201)
+
+
+class FailedStatementTest(AppTestCase):
+    def test_failed_statement_leaves_nothing_on_the_connection(self):
+        with self.app.app_context():
+            conn = db.session.connection()
+            with self.assertRaises(OperationalError):
+                conn.execute(text("SELECT * FROM no_such_table"))
+            self.assertEqual(conn.info.get("sql_stats_start"), [])
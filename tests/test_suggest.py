@@ -0,0 +1,87 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from src.app import db
+from src.app.models.auditorium import Auditorium
+from src.app.models.movie import Movie
+from src.app.services.suggest import MAX_PEOPLE_PER_MOVIE, SuggestIndex, suggest_index
+
+from .helpers import AppTestCase
+
+
+class SuggestIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = SuggestIndex(max_entries=1000)
+        self.index.load(
+            [
+                (1, "The Dark Knight", "Christopher Nolan", "Emma Thomas", "Christian Bale"),
+                (2, "Oppenheimer", "Christopher Nolan", "Christopher Nolan", "Cillian Murphy"),
+            ],
+            [(1, "Auditorium Nolan")],
+        )
+
+    def test_person_roles_and_movie_count(self):
+        self.assertEqual(
+            self.index.lookup("nolan", kinds={"person"}),
+            [{"type": "person", "label": "Christopher Nolan", "roles": ["director", "producer"], "movie_count": 2}],
+        )
+        self.assertEqual([r["label"] for r in self.index.lookup("knight")], ["The Dark Knight"])
+
+    def test_removing_a_movie_unlinks_its_people(self):
+        self.index.remove_movie(2)
+        self.assertEqual(self.index.lookup("nolan", kinds={"person"})[0]["movie_count"], 1)
+        self.assertEqual(self.index.lookup("cillian"), [])
+        self.index.remove_movie(1)
+        self.assertEqual(self.index.lookup("christ"), [])
+        self.assertEqual(len(self.index), 1)   # the auditorium
+
+    def test_people_linked_per_movie_are_capped(self):
+        cast = ", ".join(f"Actor {i}" for i in range(MAX_PEOPLE_PER_MOVIE + 10))
+        self.index.load([(1, "Crowd Scene", "", "", cast)], [])
+        self.assertEqual(len(self.index), 1 + MAX_PEOPLE_PER_MOVIE)
+
+
+class BackgroundBuildTest(AppTestCase):
+    def test_lookups_do_not_wait_for_the_build(self):
+        with self.app.app_context():
+            db.session.add(Movie(title="Oppenheimer", director="Christopher Nolan"))
+            db.session.commit()
+        release = threading.Event()
+        build = suggest_index.build
+
+        def slow_build():
+            release.wait(5)
+            build()
+
+        with mock.patch.object(suggest_index, "build", slow_build):
+            start = time.monotonic()
+            resp = self.client.get("/api/v1/suggest?q=oppen")
+            self.assertLess(time.monotonic() - start, 1)
+            self.assertEqual(resp.get_json(), {"data": []})
+            release.set()
+            with suggest_index._build_lock:     # held until the build is in
+                pass
+        resp = self.client.get("/api/v1/suggest?q=oppen")
+        self.assertEqual([r["label"] for r in resp.get_json()["data"]], ["Oppenheimer"])
+
+
+class PatchDuringBuildTest(unittest.TestCase):
+    def test_writes_made_while_the_tables_are_read_survive_the_swap(self):
+        index = SuggestIndex(max_entries=1000)
+        index.load([(1, "Oppenheimer", "Christopher Nolan", "", "")], [])
+
+        def movies():
+            # the snapshot was taken before these writes
+            yield (1, "Oppenheimer", "Christopher Nolan", "", "")
+            yield (2, "Tenet", "Christopher Nolan", "", "")
+            index.upsert_movie(Movie(movie_id=3, title="Memento", director="Christopher Nolan"))
+            index.remove_movie(2)
+            index.upsert_auditorium(Auditorium(auditorium_id=9, name="Imax Hall"))
+
+        index.load(movies(), [])
+        self.assertEqual([r["label"] for r in index.lookup("memento")], ["Memento"])
+        self.assertEqual(index.lookup("tenet"), [])
+        self.assertEqual([r["label"] for r in index.lookup("imax")], ["Imax Hall"])
+        self.assertEqual(index.lookup("nolan", kinds={"person"})[0]["movie_count"], 2)
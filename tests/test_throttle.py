@@ -0,0 +1,30 @@
+from unittest import mock
+
+from src.app.services import codes
+from src.app.services.throttling import throttler
+
+from .helpers import AppTestCase
+
+EMAIL = "user@example.com"
+
+
+class ResetPasswordThrottleTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.app.config["THROTTLE_ENABLED"] = True
+        throttler.init_app(self.app)
+
+    def tearDown(self):
+        self.app.config["THROTTLE_ENABLED"] = False
+        throttler.init_app(self.app)
+        super().tearDown()
+
+    def test_guesses_beyond_the_email_limit_are_rejected_before_the_code_is_checked(self):
+        self.make_user(EMAIL)
+        body = {"email": EMAIL, "code": "000000", "new_password": "guess"}
+        for _ in range(5):
+            self.assertEqual(self.client.post("/api/v1/auth/reset-password", json=body).status_code, 400)
+        with mock.patch.object(codes, "_consume", side_effect=AssertionError("code checked")):
+            resp = self.client.post("/api/v1/auth/reset-password", json=body)
+        self.assertEqual(resp.status_code, 429)
+        self.assertIn("Retry-After", resp.headers)
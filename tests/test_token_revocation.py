@@ -0,0 +1,51 @@
+import threading
+import time
+from datetime import timedelta
+
+import jwt
+
+from src.app.models.password_reset_tokens import PasswordResetToken
+from src.app.services.token_revocation import _now_utc, revocation_filter
+
+from .helpers import AppTestCase
+
+EMAIL = "user@example.com"
+
+
+class ResetThenLoginTest(AppTestCase):
+    def test_token_issued_in_the_reset_second_is_accepted(self):
+        user_id = self.make_user(EMAIL, "old-password")
+        old_token = self.login(EMAIL, "old-password")
+        self.assertEqual(self.get("/api/v1/users/profile", old_token).status_code, 200)
+
+        self.client.post("/api/v1/auth/forgot-password", json={"email": EMAIL})
+        with self.app.app_context():
+            code = PasswordResetToken.query.filter_by(user_id=user_id).one().token
+
+        # start on a fresh second so the reset and the new login share it
+        time.sleep(1 - time.time() % 1)
+        resp = self.client.post("/api/v1/auth/reset-password",
+                                json={"email": EMAIL, "code": code, "new_password": "new-password"})
+        self.assertEqual(resp.status_code, 200, resp.get_data(as_text=True))
+        new_token = self.login(EMAIL, "new-password")
+
+        self.assertEqual(self.get("/api/v1/users/profile", old_token).status_code, 401)
+        self.assertEqual(self.get("/api/v1/users/profile", new_token).status_code, 200)
+        iat = jwt.decode(new_token, options={"verify_signature": False})["iat"]
+        self.assertNotEqual(iat, int(iat), "iat should keep sub-second precision")
+
+
+class RefreshTest(AppTestCase):
+    def test_checks_do_not_wait_for_a_refresh_in_progress(self):
+        with self.app.app_context():
+            revocation_filter.refresh(force=True)
+        revocation_filter.add_local("revoked-jti", _now_utc() + timedelta(hours=1), _now_utc())
+        revocation_filter._next_refresh = 0.0     # due
+        answers = []
+        # another thread is mid-refresh
+        with revocation_filter._refresh_lock:
+            checker = threading.Thread(target=lambda: answers.append(revocation_filter.is_revoked({"jti": "revoked-jti"})))
+            checker.start()
+            checker.join(timeout=2)
+            self.assertFalse(checker.is_alive(), "is_revoked blocked behind the refresh")
+        self.assertEqual(answers, [True])